@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Throughput benchmark for the VLM dataloader image preprocessing.
+
+Encodes random JPEGs of varied sizes, then measures images/s of a single
+dataloader worker for decode + resize + patchify + collate with:
+  - the previous path, which normalizes every image in float64 NumPy before
+    patchifying float32 tensors, and
+  - the uint8 path, which patchifies uint8 pixels and normalizes the whole
+    batch once at collate time (in float32 or bfloat16).
+It also checks that both paths produce the same patches. simplejpeg is used
+for decoding if it is installed.
+
+Example usage:
+    python scripts/benchmarks/image_preprocessing.py
+    python scripts/benchmarks/image_preprocessing.py --num-images 512 --max-patches 1024
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+
+from torchtitan.experiments.vlm.datasets.utils import image as image_utils
+
+
+def _make_jpegs(num_images: int, seed: int = 0) -> list[bytes]:
+    rng = np.random.default_rng(seed)
+    jpegs = []
+    for _ in range(num_images):
+        height, width = rng.integers(128, 1024, size=2)
+        # Smooth random images compress like photos, unlike pure noise
+        small = rng.integers(0, 256, (height // 16, width // 16, 3), dtype=np.uint8)
+        img = Image.fromarray(small).resize((int(width), int(height)))
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=90)
+        jpegs.append(buf.getvalue())
+    return jpegs
+
+
+def _float64_process_image(data: bytes, patch_size: int, max_patches: int):
+    """Reference per-image float64 normalization that the uint8 path replaced."""
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    image = image_utils._resize_image_by_patch_count(
+        image, max_patch_per_image=max_patches, patch_size=patch_size, merge_size=1
+    )
+    img_array = np.array(image) / 255.0
+    mean = np.array(image_utils.CLIP_MEAN)
+    std = np.array(image_utils.CLIP_STD)
+    img_array = (img_array - mean) / std
+    return torch.from_numpy(img_array).float().unsqueeze(0)
+
+
+def _collate(images, patch_size: int, max_patches: int, dtype=None):
+    patch_list, grid_list = [], []
+    for img in images:
+        patches, grids = image_utils.convert_to_patches(img, patch_size=patch_size)
+        patches, grids = image_utils.pad_patches(patches, grids, max_patches)
+        patch_list.append(patches)
+        grid_list.append(grids)
+    patches, grids = torch.stack(patch_list), torch.stack(grid_list)
+    if dtype is not None:
+        patches = image_utils.normalize_patches(patches, grids, dtype)
+    return patches
+
+
+def _run(jpegs, batch_size: int, process_fn, collate_fn) -> tuple[float, list]:
+    start = time.perf_counter()
+    outputs = []
+    for i in range(0, len(jpegs), batch_size):
+        images = [process_fn(data) for data in jpegs[i : i + batch_size]]
+        outputs.append(collate_fn(images))
+    return len(jpegs) / (time.perf_counter() - start), outputs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-images", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--patch-size", type=int, default=16)
+    parser.add_argument("--max-patches", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    # One dataloader worker
+    torch.set_num_threads(1)
+    jpegs = _make_jpegs(args.num_images)
+    ps, max_patches = args.patch_size, args.max_patches
+
+    modes = {
+        "float64 per image": (
+            lambda data: _float64_process_image(data, ps, max_patches),
+            lambda images: _collate(images, ps, max_patches),
+        ),
+        "uint8 + fp32 batch": (
+            lambda data: image_utils.process_image(
+                data, patch_size=ps, max_patch_per_image=max_patches, normalize=False
+            ),
+            lambda images: _collate(images, ps, max_patches, torch.float32),
+        ),
+        "uint8 + bf16 batch": (
+            lambda data: image_utils.process_image(
+                data, patch_size=ps, max_patch_per_image=max_patches, normalize=False
+            ),
+            lambda images: _collate(images, ps, max_patches, torch.bfloat16),
+        ),
+    }
+
+    print(
+        f"images={args.num_images} batch={args.batch_size} "
+        f"max_patches={max_patches} simplejpeg={image_utils._HAS_SIMPLEJPEG}"
+    )
+    print(f"{'mode':>20} {'images/s':>10} {'x':>6}")
+    reference, baseline = None, None
+    for name, (process_fn, collate_fn) in modes.items():
+        throughput = 0.0
+        for _ in range(args.repeats):
+            repeat_throughput, outputs = _run(
+                jpegs, args.batch_size, process_fn, collate_fn
+            )
+            throughput = max(throughput, repeat_throughput)
+        if reference is None:
+            reference, baseline = outputs, throughput
+        elif not image_utils._HAS_SIMPLEJPEG:
+            # Different JPEG decoders may round pixels differently
+            atol = 2e-2 if outputs[0].dtype == torch.bfloat16 else 1e-5
+            for out, ref in zip(outputs, reference):
+                torch.testing.assert_close(out.float(), ref, atol=atol, rtol=1e-2)
+        print(f"{name:>20} {throughput:>10.1f} {throughput / baseline:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
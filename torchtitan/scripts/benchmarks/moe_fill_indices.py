@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Micro-benchmark for the CPU fallback of MoE token permutation, ``fill_indices_cpu``.
+
+Compares the vectorized implementation against the previous nested Python
+loop over (expert, rank) pairs and checks that both produce the same indices.
+
+Example usage:
+    python scripts/benchmarks/moe_fill_indices.py --experts 64 256 --ranks 8 64
+"""
+
+import argparse
+import time
+
+import torch
+
+from torchtitan.models.common.moe.kernels import fill_indices_cpu
+
+ALIGNMENT = 16
+
+
+def _fill_indices_loop(
+    tokens_per_expert_group: torch.Tensor,
+    start_index_values: torch.Tensor,
+    write_offsets: torch.Tensor,
+    experts_per_rank: int,
+    num_ranks: int,
+    max_len: int,
+) -> torch.Tensor:
+    """Reference loop implementation that the vectorized version replaced."""
+    permuted_indices = torch.full((max_len,), -1, dtype=torch.int64)
+    for e in range(experts_per_rank):
+        write_start = write_offsets[e].item()
+        for r in range(num_ranks):
+            i = r * experts_per_rank + e
+            start_index = start_index_values[i].item()
+            length = tokens_per_expert_group[i].item()
+            if length > 0:
+                end_idx = min(write_start + length, max_len)
+                permuted_indices[write_start:end_idx] = torch.arange(
+                    start_index,
+                    start_index + (end_idx - write_start),
+                    dtype=torch.int64,
+                )
+            write_start += length
+    return permuted_indices
+
+
+def _make_inputs(
+    experts_per_rank: int, num_ranks: int, tokens_per_rank: int
+) -> tuple[tuple[torch.Tensor, torch.Tensor, torch.Tensor], int]:
+    # Route tokens_per_rank tokens from every rank uniformly over local experts
+    probs = torch.ones(experts_per_rank * num_ranks)
+    choices = torch.multinomial(probs, tokens_per_rank * num_ranks, replacement=True)
+    tokens_per_expert_group = torch.bincount(
+        choices, minlength=experts_per_rank * num_ranks
+    ).to(torch.int32)
+    start_index_values = (
+        torch.cumsum(tokens_per_expert_group, 0) - tokens_per_expert_group
+    )
+    total = tokens_per_expert_group.view(num_ranks, -1).sum(0)
+    total = torch.clamp_min(total, ALIGNMENT)
+    m_sizes = ((total + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT).to(torch.int32)
+    m_offsets = torch.cumsum(m_sizes, 0)
+    write_offsets = m_offsets - m_sizes
+    max_len = int(m_offsets[-1].item())
+    return (tokens_per_expert_group, start_index_values, write_offsets), max_len
+
+
+def _time(fn, iters: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return (time.perf_counter() - start) / iters * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--experts", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--ranks", type=int, nargs="+", default=[8, 64])
+    parser.add_argument("--tokens-per-rank", type=int, default=8192)
+    parser.add_argument("--iters", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'experts':>8} {'ranks':>6} {'loop (ms)':>10} {'vec (ms)':>9} {'x':>7}")
+    for experts_per_rank in args.experts:
+        for num_ranks in args.ranks:
+            inputs, max_len = _make_inputs(
+                experts_per_rank, num_ranks, args.tokens_per_rank
+            )
+            expected = _fill_indices_loop(*inputs, experts_per_rank, num_ranks, max_len)
+            actual = fill_indices_cpu(*inputs, experts_per_rank, num_ranks, max_len)
+            assert torch.equal(expected, actual)
+
+            loop_ms = _time(
+                lambda: _fill_indices_loop(
+                    *inputs, experts_per_rank, num_ranks, max_len
+                ),
+                args.iters,
+            )
+            vec_ms = _time(
+                lambda: fill_indices_cpu(*inputs, experts_per_rank, num_ranks, max_len),
+                args.iters,
+            )
+            print(
+                f"{experts_per_rank:>8} {num_ranks:>6} {loop_ms:>10.2f} "
+                f"{vec_ms:>9.2f} {loop_ms / vec_ms:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Benchmark for gradient averaging in the RL ``PolicyTrainer``.
+
+Times backward + gradient all-reduce of a stack of transformer-sized MLP
+layers with the per-parameter ``dist.all_reduce`` loop against
+``BucketedGradReducer`` at several bucket sizes, and checks that both produce
+the same gradients.
+
+Example usage:
+    torchrun --nproc_per_node=2 scripts/benchmarks/rl_grad_allreduce.py
+    torchrun --nproc_per_node=8 scripts/benchmarks/rl_grad_allreduce.py \
+        --dim 2048 --layers 28 --bucket-sizes 5 25 100
+"""
+
+import argparse
+import os
+import time
+
+import torch
+import torch.distributed as dist
+import torch.nn as nn
+
+from torchtitan.experiments.rl.actors.grad_reducer import BucketedGradReducer
+
+
+def _build_model(dim: int, layers: int, device: torch.device) -> nn.Module:
+    torch.manual_seed(0)
+    blocks = []
+    for _ in range(layers):
+        blocks += [
+            nn.LayerNorm(dim),
+            nn.Linear(dim, 4 * dim),
+            nn.GELU(),
+            nn.Linear(4 * dim, dim),
+        ]
+    return nn.Sequential(*blocks).to(device)
+
+
+def _per_param_all_reduce(model: nn.Module) -> None:
+    for param in model.parameters():
+        if param.grad is not None:
+            dist.all_reduce(param.grad, op=dist.ReduceOp.AVG)
+
+
+def _time_steps(model, inputs, reduce_fn, iters: int, device: torch.device) -> float:
+    def step():
+        model.zero_grad()
+        model(inputs).float().pow(2).mean().backward()
+        reduce_fn()
+
+    for _ in range(3):
+        step()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    dist.barrier()
+    start = time.perf_counter()
+    for _ in range(iters):
+        step()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / iters * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--layers", type=int, default=16)
+    parser.add_argument("--tokens", type=int, default=512)
+    parser.add_argument(
+        "--bucket-sizes", type=float, nargs="+", default=[1.0, 5.0, 25.0, 100.0]
+    )
+    parser.add_argument("--iters", type=int, default=10)
+    args = parser.parse_args()
+
+    if torch.cuda.is_available():
+        device = torch.device(f"cuda:{int(os.environ.get('LOCAL_RANK', 0))}")
+        torch.cuda.set_device(device)
+        dist.init_process_group("nccl")
+    else:
+        device = torch.device("cpu")
+        dist.init_process_group("gloo")
+    rank = dist.get_rank()
+
+    model = _build_model(args.dim, args.layers, device)
+    num_params = sum(p.numel() for p in model.parameters())
+    num_tensors = len(list(model.parameters()))
+    torch.manual_seed(rank)
+    inputs = torch.randn(args.tokens, args.dim, device=device)
+
+    # Reference gradients from the per-parameter loop
+    model.zero_grad()
+    model(inputs).float().pow(2).mean().backward()
+    _per_param_all_reduce(model)
+    reference = [p.grad.clone() for p in model.parameters()]
+
+    loop_ms = _time_steps(
+        model, inputs, lambda: _per_param_all_reduce(model), args.iters, device
+    )
+    if rank == 0:
+        print(
+            f"world={dist.get_world_size()} device={device.type} "
+            f"params={num_params / 1e6:.1f}M tensors={num_tensors}"
+        )
+        print(f"{'mode':>18} {'buckets':>8} {'step (ms)':>10} {'x':>6}")
+        print(f"{'per-param loop':>18} {num_tensors:>8} {loop_ms:>10.2f} {1.0:>6.2f}")
+
+    for bucket_size_mb in args.bucket_sizes:
+        reducer = BucketedGradReducer(
+            list(model.parameters()), bucket_size_mb=bucket_size_mb
+        )
+        model.zero_grad()
+        model(inputs).float().pow(2).mean().backward()
+        reducer.finish()
+        for ref, p in zip(reference, model.parameters()):
+            torch.testing.assert_close(p.grad, ref)
+
+        bucketed_ms = _time_steps(model, inputs, reducer.finish, args.iters, device)
+        reducer.remove_hooks()
+        if rank == 0:
+            print(
+                f"{f'bucketed {bucket_size_mb:g}MB':>18} {len(reducer.buckets):>8} "
+                f"{bucketed_ms:>10.2f} {loop_ms / bucketed_ms:>6.2f}"
+            )
+
+    dist.destroy_process_group()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Micro-benchmark for ``create_varlen_metadata_for_document``.
+
+Compares the batched implementation against the previous per-row loop
+across batch sizes and numbers of documents per row, and checks that both
+produce the same metadata.
+
+Example usage:
+    python scripts/benchmarks/varlen_metadata.py --device cuda --seq-len 8192
+"""
+
+import argparse
+import time
+
+import torch
+
+from torchtitan.models.common.attention import (
+    create_varlen_metadata_for_document,
+    VarlenMetadata,
+)
+
+EOS_ID = 0
+
+
+def _loop_varlen_metadata(input_batch: torch.Tensor, eos_id: int) -> VarlenMetadata:
+    """Reference per-row implementation that the batched version replaced."""
+    batch_size, seq_len = input_batch.shape
+    device = input_batch.device
+    cu_seqlens_list, all_seq_lengths = [], []
+    offset = 0
+    for b in range(batch_size):
+        eos_positions = (input_batch[b] == eos_id).nonzero(as_tuple=True)[0]
+        sample_cu_seqlens = torch.cat(
+            [
+                torch.tensor([0], dtype=torch.int32, device=device),
+                eos_positions.to(torch.int32) + 1,
+                torch.tensor([seq_len], dtype=torch.int32, device=device),
+            ]
+        )
+        sample_cu_seqlens = torch.unique_consecutive(sample_cu_seqlens)
+        all_seq_lengths.append(torch.diff(sample_cu_seqlens))
+        cu_seqlens_list.append(sample_cu_seqlens[:-1] + offset)
+        offset += seq_len
+    packed = torch.cat(
+        cu_seqlens_list + [torch.tensor([offset], dtype=torch.int32, device=device)]
+    )
+    max_seqlen = torch.cat(all_seq_lengths).max().item() if all_seq_lengths else 0
+    return VarlenMetadata(packed, packed, max_seqlen, max_seqlen)
+
+
+def _make_batch(
+    batch_size: int, seq_len: int, num_docs: int, device: str
+) -> torch.Tensor:
+    tokens = torch.randint(1, 32000, (batch_size, seq_len), device=device)
+    for b in range(batch_size):
+        eos = torch.randperm(seq_len, device=device)[: num_docs - 1]
+        tokens[b, eos] = EOS_ID
+    return tokens
+
+
+def _time(fn, iters: int, device: str) -> float:
+    for _ in range(3):
+        fn()
+    if device == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    if device == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / iters * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--seq-len", type=int, default=8192)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--num-docs", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--iters", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'batch':>6} {'docs':>6} {'loop (ms)':>10} {'batched (ms)':>13} {'x':>6}")
+    for batch_size in args.batch_sizes:
+        for num_docs in args.num_docs:
+            tokens = _make_batch(batch_size, args.seq_len, num_docs, args.device)
+            ref = _loop_varlen_metadata(tokens, EOS_ID)
+            out = create_varlen_metadata_for_document(tokens, EOS_ID)
+            assert torch.equal(ref.cu_seq_q, out.cu_seq_q)
+            assert ref.max_q == out.max_q
+
+            loop_ms = _time(
+                lambda: _loop_varlen_metadata(tokens, EOS_ID), args.iters, args.device
+            )
+            batched_ms = _time(
+                lambda: create_varlen_metadata_for_document(tokens, EOS_ID),
+                args.iters,
+                args.device,
+            )
+            print(
+                f"{batch_size:>6} {num_docs:>6} {loop_ms:>10.3f} "
+                f"{batched_ms:>13.3f} {loop_ms / batched_ms:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Token utilization of the VLM ``SamplePacker``.
+
+Packs a stream of sample lengths with the previous greedy next-fit packer and
+with the best-fit decreasing ``SamplePacker`` at several window settings, and
+reports the fraction of sequence capacity holding tokens.
+
+Sample lengths (caption tokens plus image tokens, as produced by the VLM
+dataset) come from streaming ``--num-samples`` samples of a dataset through
+``HuggingFaceMultiModalDataset``, or from a file with one length per line.
+
+Example usage:
+    python scripts/benchmarks/vlm_packing.py --dataset cc12m \
+        --tokenizer ./assets/hf/Llama-3.1-8B --seq-len 2048
+    python scripts/benchmarks/vlm_packing.py --lengths-file lengths.txt
+"""
+
+import argparse
+import itertools
+
+import torch
+
+from torchtitan.experiments.vlm.datasets.utils.packing import SamplePacker
+
+
+def _dataset_lengths(args) -> list[int]:
+    from torchtitan.components.tokenizer import HuggingFaceTokenizer
+    from torchtitan.experiments.vlm.datasets.mm_datasets import (
+        HuggingFaceMultiModalDataset,
+    )
+    from torchtitan.experiments.vlm.model.args import SpecialTokens
+
+    tokenizer = HuggingFaceTokenizer(tokenizer_path=args.tokenizer)
+    ds = HuggingFaceMultiModalDataset(
+        dataset_name=args.dataset,
+        dataset_path=None,
+        tokenizer=tokenizer,
+        batch_size=args.batch_size,
+        seq_len=args.seq_len,
+        patch_size=args.patch_size,
+        spatial_merge_size=args.spatial_merge_size,
+        max_patches_per_image=args.max_patches_per_image,
+        max_images_per_batch=args.batch_size,
+        packing_buffer_size=0,
+        special_tokens=SpecialTokens.from_tokenizer(tokenizer),
+    )
+    return [
+        len(sample["input_ids"])
+        for sample in itertools.islice(iter(ds), args.num_samples)
+    ]
+
+
+def _next_fit_utilization(lengths: list[int], seq_len: int, buffer_size: int) -> float:
+    """Previous packer: sort each buffer, close a sequence when the next sample does not fit."""
+    num_sequences = 0
+    for start in range(0, len(lengths), buffer_size):
+        current = 0
+        for length in sorted(lengths[start : start + buffer_size], reverse=True):
+            if current and current + length > seq_len:
+                num_sequences += 1
+                current = 0
+            current += length
+        num_sequences += current > 0
+    return sum(lengths) / (num_sequences * seq_len)
+
+
+def _best_fit_utilization(
+    lengths: list[int], seq_len: int, buffer_size: int, max_open: int
+) -> float:
+    packer = SamplePacker(
+        max_seq_length=seq_len,
+        buffer_size=buffer_size,
+        batch_size=1,
+        max_open_sequences=max_open,
+        log_freq=0,
+    )
+    token = torch.zeros(1, dtype=torch.long)
+    for length in lengths:
+        # Only lengths matter for packing, avoid allocating the tokens
+        tokens = token.expand(length)
+        packer.add_sample({"input_ids": tokens, "labels": tokens, "pixel_values": []})
+    while packer.get_next_batch():
+        pass
+    return packer.fill_rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dataset", type=str, default=None)
+    parser.add_argument("--tokenizer", type=str, default="./tests/assets/tokenizer")
+    parser.add_argument("--lengths-file", type=str, default=None)
+    parser.add_argument("--num-samples", type=int, default=5000)
+    parser.add_argument("--seq-len", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--patch-size", type=int, default=16)
+    parser.add_argument("--spatial-merge-size", type=int, default=1)
+    parser.add_argument("--max-patches-per-image", type=int, default=256)
+    parser.add_argument("--buffer-sizes", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    if args.lengths_file is not None:
+        with open(args.lengths_file) as f:
+            lengths = [int(line) for line in f if line.strip()]
+    elif args.dataset is not None:
+        lengths = _dataset_lengths(args)
+    else:
+        parser.error("Pass --dataset or --lengths-file")
+    lengths = [length for length in lengths if length <= args.seq_len]
+
+    t = torch.tensor(lengths, dtype=torch.float)
+    print(
+        f"samples={len(lengths)} seq_len={args.seq_len} length "
+        f"mean={t.mean():.0f} p50={t.median():.0f} max={t.max():.0f}"
+    )
+    print(f"{'packer':>28} {'buffer':>7} {'utilization':>12}")
+    for buffer_size in args.buffer_sizes:
+        util = _next_fit_utilization(lengths, args.seq_len, buffer_size)
+        print(f"{'next-fit (previous)':>28} {buffer_size:>7} {util:>12.1%}")
+        for max_open in (0, args.batch_size):
+            util = _best_fit_utilization(lengths, args.seq_len, buffer_size, max_open)
+            name = f"best-fit, {max_open} kept open"
+            print(f"{name:>28} {buffer_size:>7} {util:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,13 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+
 import torch
 
+from torchtitan.models.common.attention import GQAttention
+
 
 def multinomial_sample_one(
     probs: torch.Tensor, rng: torch.Generator | None = None
@@ -76,3 +81,237 @@ def generate(
         generated_tokens = torch.cat([generated_tokens, next_token], dim=1)
 
     return generated_tokens
+
+
+class _DecodeState:
+    """Shared state of one incremental decode, read by every cached attention."""
+
+    def __init__(self, max_len: int) -> None:
+        self.max_len = max_len
+        # number of tokens already written into the caches
+        self.cache_len = 0
+        # (B, 1, T, cache_len + T) bool mask, None when no padding is involved
+        self.attn_mask: torch.Tensor | None = None
+
+
+class _KVCacheAttention(torch.nn.Module):
+    """Inner attention that appends keys/values to a preallocated cache.
+
+    It stands in for the ``inner_attention`` of a ``GQAttention`` during
+    decoding, so the projections, QK norms and RoPE of the model are reused
+    unchanged. The caches are allocated on the first (prefill) call from the
+    shapes of the local keys/values, which also makes it work under TP.
+    """
+
+    def __init__(self, state: _DecodeState, attn_backend: str) -> None:
+        super().__init__()
+        self.state = state
+        self.attn_backend = attn_backend
+        self.k_cache: torch.Tensor | None = None
+        self.v_cache: torch.Tensor | None = None
+
+    def forward(
+        self,
+        q: torch.Tensor,
+        k: torch.Tensor,
+        v: torch.Tensor,
+        *,
+        scale: float | None = None,
+        **kwargs,
+    ) -> torch.Tensor:
+        # q, k, v are (bs, n_heads, seqlen, head_dim)
+        bs, n_kv_heads, seqlen, head_dim = k.shape
+        if self.k_cache is None or self.v_cache is None:
+            cache_shape = (bs, n_kv_heads, self.state.max_len, head_dim)
+            self.k_cache = k.new_zeros(cache_shape)
+            self.v_cache = v.new_zeros(cache_shape)
+
+        start = self.state.cache_len
+        end = start + seqlen
+        self.k_cache[:, :, start:end] = k
+        self.v_cache[:, :, start:end] = v
+
+        attn_mask = self.state.attn_mask
+        output = torch.nn.functional.scaled_dot_product_attention(
+            q,
+            self.k_cache[:, :, :end],
+            self.v_cache[:, :, :end],
+            attn_mask=attn_mask,
+            # without padding, the prefill is plain causal attention and a
+            # decode step attends to every cached token
+            is_causal=attn_mask is None and start == 0 and seqlen > 1,
+            scale=scale,
+            enable_gqa=q.shape[1] != n_kv_heads,
+        )
+        if self.attn_backend == "varlen":
+            # GQAttention expects the packed varlen layout (bs, seqlen, n_heads, dim)
+            return output.transpose(1, 2)
+        return output
+
+
+@contextmanager
+def _kv_cache_attention(model, state: _DecodeState) -> Generator[None, None, None]:
+    """Swaps the inner attention of every layer for a ``_KVCacheAttention``."""
+    attentions = [layer.attention for layer in model.layers.values()]
+    for attention in attentions:
+        if not isinstance(attention, GQAttention):
+            raise NotImplementedError(
+                f"KV cache decoding only supports GQAttention, got {type(attention)}"
+            )
+    if getattr(model.config.layer, "fixed_attn_block_size", None) is not None:
+        raise NotImplementedError(
+            "KV cache decoding does not support chunked (iRoPE) attention"
+        )
+
+    original = [attention.inner_attention for attention in attentions]
+    for attention in attentions:
+        attention.inner_attention = _KVCacheAttention(state, attention.attn_backend)
+    try:
+        yield
+    finally:
+        for attention, inner_attention in zip(attentions, original):
+            attention.inner_attention = inner_attention
+
+
+def _left_pad(
+    prompts: list[torch.Tensor], pad_id: int
+) -> tuple[torch.Tensor, torch.Tensor]:
+    prompt_lens = torch.tensor([p.numel() for p in prompts])
+    max_prompt_len = int(prompt_lens.max())
+    padded = prompts[0].new_full((len(prompts), max_prompt_len), pad_id)
+    for i, p in enumerate(prompts):
+        padded[i, max_prompt_len - p.numel() :] = p
+    return padded, prompt_lens.to(padded.device)
+
+
+def _batch_prompts(
+    input_ids: torch.Tensor | list[torch.Tensor], pad_id: int
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Returns (B, T) left-padded prompts and the length of every prompt."""
+    if isinstance(input_ids, torch.Tensor):
+        # ensure batch dimension (T,) --> (B, T)
+        if input_ids.ndim == 1:
+            input_ids = input_ids.unsqueeze(0)
+        prompt_lens = torch.full(
+            (input_ids.size(0),), input_ids.size(1), device=input_ids.device
+        )
+        return input_ids, prompt_lens
+    return _left_pad(input_ids, pad_id)
+
+
+@torch.no_grad()
+def stream_with_kv_cache(
+    model,
+    input_ids: torch.Tensor | list[torch.Tensor],
+    *,
+    max_new_tokens: int,
+    temperature: float = 1.0,
+    top_k: int | None = None,
+    rng: torch.Generator | None = None,
+    pad_id: int = 0,
+) -> Iterator[torch.Tensor]:
+    """Incremental decoding with a preallocated KV cache, one step at a time.
+
+    Runs one prefill over the prompts, then feeds a single token per step and
+    yields the (B, 1) tensor of sampled tokens after every step. Closing the
+    generator early stops decoding and restores the model.
+
+    See ``generate_with_kv_cache`` for the arguments.
+    """
+    input_ids, prompt_lens = _batch_prompts(input_ids, pad_id)
+    bs, prompt_len = input_ids.shape
+    total_len = prompt_len + max_new_tokens
+
+    # Per-row RoPE positions and valid keys, shifted by the left padding
+    pad_lens = (prompt_len - prompt_lens).view(bs, 1)
+    arange = torch.arange(total_len, device=input_ids.device).view(1, -1)
+    positions = (arange - pad_lens).clamp_min(0)
+    key_valid = arange >= pad_lens
+    padded = bool((pad_lens > 0).any())
+
+    state = _DecodeState(total_len)
+    with _kv_cache_attention(model, state):
+        # prefill
+        if padded:
+            causal = torch.ones(
+                prompt_len, prompt_len, dtype=torch.bool, device=input_ids.device
+            ).tril()
+            # padding queries attend to themselves to keep their outputs finite
+            eye = torch.eye(prompt_len, dtype=torch.bool, device=input_ids.device)
+            state.attn_mask = (
+                (causal & key_valid[:, None, :prompt_len]) | eye
+            ).unsqueeze(1)
+            logits = model(input_ids, positions=positions[:, :prompt_len])
+        else:
+            logits = model(input_ids)
+        state.cache_len = prompt_len
+
+        for i in range(prompt_len, total_len):
+            probs = logits_to_probs(logits[:, -1, :], temperature, top_k)
+            next_token = multinomial_sample_one(probs, rng=rng)
+            yield next_token
+            if i + 1 == total_len:
+                break
+
+            # decode one token against the cache
+            if padded:
+                state.attn_mask = key_valid[:, None, None, : i + 1]
+            logits = model(next_token, positions=positions[:, i : i + 1])
+            state.cache_len = i + 1
+
+
+@torch.no_grad()
+def generate_with_kv_cache(
+    model,
+    input_ids: torch.Tensor | list[torch.Tensor],
+    *,
+    max_new_tokens: int,
+    temperature: float = 1.0,
+    top_k: int | None = None,
+    seed: int | None = None,
+    pad_id: int = 0,
+) -> torch.Tensor:
+    """Incremental decoding with a preallocated KV cache.
+
+    Runs one prefill over the prompts, then feeds a single token per step, so
+    generation is linear instead of quadratic in the sequence length. Sampling
+    consumes the random generator exactly like ``generate``, so for equal
+    length prompts both functions produce the same tokens under a fixed seed.
+
+    Args:
+        model: A decoder model whose layers use ``GQAttention``.
+        input_ids: A (T,) or (B, T) tensor, or a list of 1-D prompts of
+            different lengths, which are left-padded with ``pad_id``.
+        max_new_tokens: Number of tokens to generate for every prompt.
+        temperature: Sampling temperature.
+        top_k: Optionally sample only from the top_k most likely tokens.
+        seed: Seed of the sampling generator.
+        pad_id: Token used to left-pad prompts of different lengths.
+
+    Returns:
+        A (B, max_prompt_len + max_new_tokens) tensor of left-padded prompts
+        followed by the generated tokens.
+    """
+    prompts, _ = _batch_prompts(input_ids, pad_id)
+
+    rng = None
+    if seed is not None:
+        rng = torch.Generator(prompts.device).manual_seed(seed)
+
+    bs, prompt_len = prompts.shape
+    generated_tokens = prompts.new_full((bs, prompt_len + max_new_tokens), pad_id)
+    generated_tokens[:, :prompt_len] = prompts
+    for i, next_token in enumerate(
+        stream_with_kv_cache(
+            model,
+            input_ids,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_k=top_k,
+            rng=rng,
+            pad_id=pad_id,
+        )
+    ):
+        generated_tokens[:, prompt_len + i : prompt_len + i + 1] = next_token
+
+    return generated_tokens
@@ -0,0 +1,486 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Long-lived local generation server for torchtitan checkpoints.
+
+The checkpoint is loaded once and the warm model serves prompts over HTTP on
+a local port, so evaluation harnesses do not pay model build and checkpoint
+load for every call. Pending requests are grouped by sampling parameters and
+prompt length bucket, and every group is decoded as one batch with the KV
+cache path of ``generate_with_kv_cache``. Requests that arrive while a batch
+is decoding are scheduled into the next batch.
+
+Endpoints:
+    POST /generate  {"prompt": str, "max_new_tokens": int, "temperature": float,
+                     "top_k": int | null, "stream": bool}
+        Returns {"output_text", "output_tokens", "ttft_sec", "latency_sec"}.
+        With "stream": true, the response is newline-delimited JSON with one
+        {"token_id", "text"} object per generated token followed by the
+        final object. If generation fails, the response is a 500 with
+        {"error"}, or, once streaming has started, a final {"error"} object.
+        Requests whose prompt and max_new_tokens exceed the sequence length
+        of the model are rejected with a 400.
+    GET /metrics
+        Returns throughput and latency counters.
+
+Example usage:
+    python scripts/generate/serve.py --module llama3 --config llama3_8b \
+        --checkpoint ./outputs/checkpoint/step-1000 --port 8000
+
+    curl -s localhost:8000/generate -d '{"prompt": "What is the meaning of life?"}'
+"""
+
+import argparse
+import json
+import queue
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import torch
+import torch.distributed.checkpoint as dcp
+from torchtitan.components.tokenizer import BaseTokenizer, HuggingFaceTokenizer
+from torchtitan.config import ConfigManager
+from torchtitan.tools.logging import init_logger, logger
+from torchtitan.tools.utils import device_module, device_type
+
+# support running w/o installing as package
+wd = Path(__file__).parent.parent.resolve()
+sys.path.append(str(wd))
+
+# pyrefly: ignore[missing-import]
+from generate._generation import stream_with_kv_cache
+
+
+@dataclass
+class GenerationRequest:
+    prompt_ids: list[int]
+    max_new_tokens: int
+    temperature: float
+    top_k: int | None
+    created: float = field(default_factory=time.monotonic)
+    first_token: float | None = None
+    # Receives generated token ids, then None once the request is finished,
+    # or the exception if generation failed
+    events: queue.Queue = field(default_factory=queue.Queue)
+
+
+class ServerMetrics:
+    """Thread-safe throughput and latency counters."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.requests_completed = 0
+        self.tokens_generated = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._ttfts: deque[float] = deque(maxlen=window)
+
+    def record_batch(self, batch_size: int) -> None:
+        with self._lock:
+            self.batches += 1
+            self.batched_requests += batch_size
+
+    def record_request(self, request: GenerationRequest, n_tokens: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.requests_completed += 1
+            self.tokens_generated += n_tokens
+            self._latencies.append(now - request.created)
+            if request.first_token is not None:
+                self._ttfts.append(request.first_token - request.created)
+
+    @staticmethod
+    def _percentile(values: list[float], pct: float) -> float:
+        if not values:
+            return 0.0
+        values = sorted(values)
+        return values[min(len(values) - 1, int(pct / 100 * len(values)))]
+
+    def snapshot(self, queue_depth: int) -> dict[str, Any]:
+        with self._lock:
+            elapsed = time.monotonic() - self._start
+            latencies = list(self._latencies)
+            ttfts = list(self._ttfts)
+            return {
+                "uptime_sec": elapsed,
+                "queue_depth": queue_depth,
+                "requests_completed": self.requests_completed,
+                "tokens_generated": self.tokens_generated,
+                "tokens_per_sec": self.tokens_generated / max(elapsed, 1e-9),
+                "batches": self.batches,
+                "avg_batch_size": self.batched_requests / max(self.batches, 1),
+                "latency_sec/mean": statistics.fmean(latencies) if latencies else 0.0,
+                "latency_sec/p50": self._percentile(latencies, 50),
+                "latency_sec/p95": self._percentile(latencies, 95),
+                "ttft_sec/mean": statistics.fmean(ttfts) if ttfts else 0.0,
+                "ttft_sec/p95": self._percentile(ttfts, 95),
+            }
+
+
+class BatchingEngine:
+    """Owns the model and decodes pending requests in length-bucketed batches.
+
+    Args:
+        model: Decoder model in eval mode.
+        device: Device of the model.
+        eos_id: Generation of a request stops after this token, if set.
+        pad_id: Token used to left-pad prompts within a batch.
+        max_batch_size: Maximum number of requests decoded together.
+        bucket_size: Prompts whose lengths fall into the same bucket of this
+            many tokens are batched together, which bounds the padding.
+        max_wait_ms: How long to wait for more requests before starting a
+            batch that is not full.
+        max_seq_len: Maximum length of a left-padded prompt plus its
+            generated tokens, unbounded if None.
+    """
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        device: torch.device,
+        *,
+        eos_id: int | None,
+        pad_id: int,
+        max_batch_size: int = 16,
+        bucket_size: int = 64,
+        max_wait_ms: float = 5.0,
+        max_seq_len: int | None = None,
+    ):
+        self.model = model
+        self.device = device
+        self.eos_id = eos_id
+        self.pad_id = pad_id
+        self.max_batch_size = max_batch_size
+        self.bucket_size = bucket_size
+        self.max_wait_ms = max_wait_ms
+        self.max_seq_len = max_seq_len
+        self.metrics = ServerMetrics()
+        self._incoming: queue.Queue[GenerationRequest | None] = queue.Queue()
+        self._pending: list[GenerationRequest] = []
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Finishes the queued requests and stops the decoding thread."""
+        self._incoming.put(None)
+        self._thread.join()
+
+    def submit(self, request: GenerationRequest) -> None:
+        self._incoming.put(request)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._incoming.qsize() + len(self._pending)
+
+    def _batch_key(self, request: GenerationRequest) -> tuple:
+        bucket = (len(request.prompt_ids) - 1) // self.bucket_size
+        return (request.temperature, request.top_k, bucket)
+
+    def _put_pending(self, request: GenerationRequest | None) -> None:
+        if request is None:
+            self._stopping = True
+        else:
+            self._pending.append(request)
+
+    def _collect(self) -> None:
+        if not self._pending and not self._stopping:
+            self._put_pending(self._incoming.get())
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(self._pending) < self.max_batch_size and not self._stopping:
+            timeout = deadline - time.monotonic()
+            try:
+                self._put_pending(self._incoming.get(timeout=max(timeout, 0)))
+            except queue.Empty:
+                break
+        while True:
+            try:
+                self._put_pending(self._incoming.get_nowait())
+            except queue.Empty:
+                break
+
+    def _next_batch(self) -> list[GenerationRequest]:
+        # Serve the group of the oldest request first to avoid starvation
+        key = self._batch_key(self._pending[0])
+        batch: list[GenerationRequest] = []
+        prompt_len = max_new_tokens = 0
+        for r in self._pending:
+            if len(batch) == self.max_batch_size:
+                break
+            if self._batch_key(r) != key:
+                continue
+            # Prompts are left-padded to the longest one of the batch
+            seq_len = max(prompt_len, len(r.prompt_ids)) + max(
+                max_new_tokens, r.max_new_tokens
+            )
+            if batch and self.max_seq_len is not None and seq_len > self.max_seq_len:
+                continue
+            batch.append(r)
+            prompt_len = max(prompt_len, len(r.prompt_ids))
+            max_new_tokens = max(max_new_tokens, r.max_new_tokens)
+        chosen = set(map(id, batch))
+        self._pending = [r for r in self._pending if id(r) not in chosen]
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            self._collect()
+            if not self._pending:
+                # only reached once shutdown was requested
+                return
+            batch = self._next_batch()
+            try:
+                self._decode(batch)
+            except Exception as e:
+                logger.exception("Generation failed")
+                for request in batch:
+                    request.events.put(e)
+
+    def _decode(self, batch: list[GenerationRequest]) -> None:
+        self.metrics.record_batch(len(batch))
+        prompts = [
+            torch.tensor(r.prompt_ids, dtype=torch.long, device=self.device)
+            for r in batch
+        ]
+        generated = [0] * len(batch)
+        active = [True] * len(batch)
+        steps = stream_with_kv_cache(
+            self.model,
+            prompts,
+            max_new_tokens=max(r.max_new_tokens for r in batch),
+            temperature=batch[0].temperature,
+            top_k=batch[0].top_k,
+            pad_id=self.pad_id,
+        )
+        for next_token in steps:
+            now = time.monotonic()
+            for i, token in enumerate(next_token.view(-1).tolist()):
+                if not active[i]:
+                    continue
+                request = batch[i]
+                if request.first_token is None:
+                    request.first_token = now
+                request.events.put(token)
+                generated[i] += 1
+                if generated[i] >= request.max_new_tokens or token == self.eos_id:
+                    active[i] = False
+                    request.events.put(None)
+                    self.metrics.record_request(request, generated[i])
+            if not any(active):
+                steps.close()
+                break
+
+
+def _make_handler(engine: BatchingEngine, tokenizer: BaseTokenizer):
+    class GenerationHandler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args) -> None:
+            logger.debug(format % args)
+
+        def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path != "/metrics":
+                self._send_json(404, {"error": f"unknown path {self.path}"})
+                return
+            self._send_json(200, engine.metrics.snapshot(engine.queue_depth))
+
+        def do_POST(self) -> None:
+            if self.path != "/generate":
+                self._send_json(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                top_k = body.get("top_k")
+                request = GenerationRequest(
+                    prompt_ids=tokenizer.encode(
+                        body.get("prompt", ""), add_bos=True, add_eos=False
+                    ),
+                    max_new_tokens=int(body.get("max_new_tokens", 32)),
+                    temperature=float(body.get("temperature", 1.0)),
+                    top_k=None if top_k is None else int(top_k),
+                )
+            except (ValueError, TypeError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            if not request.prompt_ids or request.max_new_tokens < 1:
+                self._send_json(400, {"error": "empty prompt or max_new_tokens < 1"})
+                return
+            if request.top_k is not None and request.top_k < 1:
+                self._send_json(400, {"error": "top_k < 1"})
+                return
+            seq_len = len(request.prompt_ids) + request.max_new_tokens
+            if engine.max_seq_len is not None and seq_len > engine.max_seq_len:
+                self._send_json(
+                    400,
+                    {
+                        "error": f"prompt of {len(request.prompt_ids)} tokens plus "
+                        f"max_new_tokens exceeds max_seq_len {engine.max_seq_len}"
+                    },
+                )
+                return
+
+            engine.submit(request)
+            stream = bool(body.get("stream", False))
+            if stream:
+                # HTTP/1.0 response without length, the body ends on close
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+
+            tokens: list[int] = []
+            text = ""
+            while isinstance(event := request.events.get(), int):
+                token = event
+                tokens.append(token)
+                if stream:
+                    new_text = tokenizer.decode(tokens)
+                    line = {"token_id": token, "text": new_text[len(text) :]}
+                    text = new_text
+                    self.wfile.write((json.dumps(line) + "\n").encode())
+                    self.wfile.flush()
+
+            if event is not None:
+                # The decoding thread failed
+                error = {"error": f"generation failed: {event!r}"}
+                if stream:
+                    self.wfile.write((json.dumps(error) + "\n").encode())
+                else:
+                    self._send_json(500, error)
+                return
+
+            result = {
+                "output_text": tokenizer.decode(tokens),
+                "output_tokens": len(tokens),
+                "ttft_sec": (
+                    request.first_token - request.created
+                    if request.first_token is not None
+                    else None
+                ),
+                "latency_sec": time.monotonic() - request.created,
+            }
+            if stream:
+                self.wfile.write((json.dumps(result) + "\n").encode())
+            else:
+                self._send_json(200, result)
+
+    return GenerationHandler
+
+
+def load_model(
+    model_name: str, config_name: str, checkpoint_path: str, device: torch.device
+) -> tuple[torch.nn.Module, BaseTokenizer, int]:
+    """Returns the model, its tokenizer and the sequence length it was built for."""
+    config = ConfigManager().parse_args(
+        ["--module", model_name, "--config", config_name]
+    )
+    tokenizer = HuggingFaceTokenizer.Config().build(
+        # pyrefly: ignore [missing-attribute]
+        tokenizer_path=config.hf_assets_path
+    )
+
+    # pyrefly: ignore [missing-attribute]
+    model_config = config.model_spec.model
+    model_config.update_from_config(trainer_config=config)
+    with torch.device(device):
+        model = model_config.build()
+    with torch.no_grad():
+        model.init_weights(buffer_device=device)
+    model.eval()
+
+    begin = time.monotonic()
+    logger.info(f"Loading chkpt at: {checkpoint_path}")
+    dcp.load(model.state_dict(), checkpoint_id=checkpoint_path)
+    logger.info(f"Finished loading chkpt in {time.monotonic() - begin:.2f} seconds.")
+    # pyrefly: ignore [missing-attribute]
+    return model, tokenizer, config.training.seq_len
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local generation server")
+    parser.add_argument(
+        "--module", type=str, required=True, help="Module name (e.g., llama3)"
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        required=True,
+        help="Config registry function name (e.g., llama3_debugmodel)",
+    )
+    parser.add_argument(
+        "--checkpoint", type=str, required=True, help="Checkpoint path to load"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--max_batch_size", type=int, default=16, help="Max requests per batch"
+    )
+    parser.add_argument(
+        "--bucket_size",
+        type=int,
+        default=64,
+        help="Prompt length bucket width, in tokens, for batching",
+    )
+    parser.add_argument(
+        "--max_wait_ms",
+        type=float,
+        default=5.0,
+        help="Max time to wait for more requests before starting a batch",
+    )
+    args = parser.parse_args()
+
+    init_logger()
+    device = torch.device(f"{device_type}:0")
+    device_module.set_device(device)
+
+    model, tokenizer, max_seq_len = load_model(
+        args.module, args.config, args.checkpoint, device
+    )
+    engine = BatchingEngine(
+        model,
+        device,
+        eos_id=tokenizer.eos_id,
+        pad_id=tokenizer.eos_id or 0,
+        max_batch_size=args.max_batch_size,
+        bucket_size=args.bucket_size,
+        max_wait_ms=args.max_wait_ms,
+        max_seq_len=max_seq_len,
+    )
+    engine.start()
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port), _make_handler(engine, tokenizer)
+    )
+    logger.info(f"Serving generation on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -34,7 +34,7 @@ wd = Path(__file__).parent.parent.resolve()
 sys.path.append(str(wd))
 
 # pyrefly: ignore[missing-import]
-from generate._generation import generate
+from generate._generation import generate, generate_with_kv_cache
 
 
 def apply_tp_minus_sp(model: nn.Module, tp_mesh: DeviceMesh):
@@ -80,6 +80,7 @@ def test_generate(
     top_k: int | None = None,
     seed: int | None = None,
     deterministic: bool = False,
+    kv_cache: bool = True,
 ):
     init_logger()
     color = utils.Color
@@ -195,7 +196,8 @@ def test_generate(
 
     # Run generation
     t0 = time.monotonic()
-    responses = generate(
+    generate_fn = generate_with_kv_cache if kv_cache else generate
+    responses = generate_fn(
         model,
         input_ids,
         temperature=temperature,
@@ -302,6 +304,13 @@ if __name__ == "__main__":
         help="Use deterministic algorithms wherever possible, may be slower",
     )
 
+    parser.add_argument(
+        "--no_kv_cache",
+        action="store_true",
+        help="Re-run the full sequence for every new token instead of decoding "
+        "incrementally with a KV cache",
+    )
+
     parser.add_argument("--prompt", type=str, default="", help="Input prompt")
 
     parser.add_argument(
@@ -324,6 +333,7 @@ if __name__ == "__main__":
         top_k=args.top_k,
         seed=args.seed,
         deterministic=args.deterministic,
+        kv_cache=not args.no_kv_cache,
     )
 
     if torch.distributed.is_initialized():
@@ -0,0 +1,120 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+
+import torch
+
+from torchtitan.hf_datasets.text_datasets import _collate_with_attention_metadata
+from torchtitan.models.common.attention import (
+    create_varlen_metadata_for_document,
+    get_document_ids,
+    get_document_mask_mod,
+    get_document_start_mask,
+)
+
+EOS_ID = 0
+
+
+class TestVarlenMetadata(unittest.TestCase):
+    def test_matches_per_row_boundaries(self):
+        tokens = torch.tensor(
+            [
+                [1, 2, 0, 3, 4, 0, 5, 6],
+                [0, 1, 1, 1, 1, 1, 1, 0],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+            ]
+        )
+        metadata = create_varlen_metadata_for_document(tokens, EOS_ID)
+        expected = torch.tensor([0, 3, 6, 8, 9, 16, 24], dtype=torch.int32)
+        self.assertTrue(torch.equal(metadata.cu_seq_q, expected))
+        self.assertTrue(torch.equal(metadata.cu_seq_k, expected))
+        self.assertEqual(metadata.max_q, 8)
+        self.assertEqual(metadata.max_k, 8)
+
+    def test_random_batches_cover_every_token_once(self):
+        torch.manual_seed(0)
+        tokens = torch.randint(0, 4, (5, 64))
+        metadata = create_varlen_metadata_for_document(tokens, EOS_ID)
+        cu = metadata.cu_seq_q
+        self.assertEqual(cu[0].item(), 0)
+        self.assertEqual(cu[-1].item(), tokens.numel())
+        lengths = torch.diff(cu)
+        self.assertTrue(bool((lengths > 0).all()))
+        self.assertEqual(metadata.max_q, lengths.max().item())
+        # Every document ends with an EOS or at the end of its row.
+        ends = cu[1:] - 1
+        flat = tokens.flatten()
+        self.assertTrue(bool(((flat[ends] == EOS_ID) | ((ends + 1) % 64 == 0)).all()))
+
+    def test_document_start_mask(self):
+        tokens = torch.tensor([[0, 1, 0, 0, 2]])
+        starts = get_document_start_mask(tokens, EOS_ID)
+        self.assertEqual(starts.tolist(), [[True, True, False, True, True]])
+
+    def test_precomputed_metadata_is_used(self):
+        tokens = torch.ones(2, 4, dtype=torch.long)
+        cu_seqlens = torch.tensor([0, 4, 8], dtype=torch.int64)
+        metadata = create_varlen_metadata_for_document(
+            tokens, EOS_ID, cu_seqlens=cu_seqlens, max_seqlen=4
+        )
+        self.assertEqual(metadata.cu_seq_q.dtype, torch.int32)
+        self.assertEqual(metadata.max_q, 4)
+
+    def test_collate_ships_metadata_with_batch(self):
+        samples = [
+            ({"input": torch.tensor([1, 0, 2, 3])}, torch.tensor([0, 2, 3, 4])),
+            ({"input": torch.tensor([1, 2, 3, 0])}, torch.tensor([2, 3, 0, 5])),
+        ]
+        input_dict, labels = _collate_with_attention_metadata(
+            samples, eos_id=EOS_ID, varlen_metadata=True
+        )
+        self.assertEqual(labels.shape, (2, 4))
+        expected = create_varlen_metadata_for_document(input_dict["input"], EOS_ID)
+        self.assertTrue(torch.equal(input_dict["cu_seqlens"], expected.cu_seq_q))
+        self.assertIsInstance(input_dict["max_seqlen"], int)
+        self.assertEqual(input_dict["max_seqlen"], 4)
+
+
+class TestDocumentIds(unittest.TestCase):
+    def test_document_ids(self):
+        tokens = torch.tensor([[1, 0, 2, 2, 0, 0], [0, 1, 1, 1, 1, 0]])
+        self.assertEqual(
+            get_document_ids(tokens, EOS_ID).tolist(),
+            [[0, 0, 1, 1, 1, 2], [0, 1, 1, 1, 1, 1]],
+        )
+
+    def test_document_mask_from_precomputed_ids(self):
+        torch.manual_seed(0)
+        tokens = torch.randint(0, 3, (2, 16))
+        from_tokens = get_document_mask_mod(tokens, EOS_ID)
+        from_ids = get_document_mask_mod(
+            tokens, EOS_ID, get_document_ids(tokens, EOS_ID)
+        )
+        b = torch.arange(2).view(2, 1, 1)
+        q_idx = torch.arange(16).view(1, 16, 1)
+        kv_idx = torch.arange(16).view(1, 1, 16)
+        h = torch.zeros(1, dtype=torch.long)
+        self.assertTrue(
+            torch.equal(from_tokens(b, h, q_idx, kv_idx), from_ids(b, h, q_idx, kv_idx))
+        )
+
+    def test_collate_ships_document_ids(self):
+        samples = [
+            ({"input": torch.tensor([1, 0, 2, 3])}, torch.tensor([0, 2, 3, 4])),
+            ({"input": torch.tensor([0, 2, 3, 0])}, torch.tensor([2, 3, 0, 5])),
+        ]
+        input_dict, _ = _collate_with_attention_metadata(
+            samples, eos_id=EOS_ID, document_ids=True
+        )
+        self.assertNotIn("cu_seqlens", input_dict)
+        self.assertEqual(
+            input_dict["document_ids"].tolist(), [[0, 0, 1, 1], [0, 1, 1, 1]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,224 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import Future
+
+import torch
+import torch.distributed as dist
+import torch.distributed.checkpoint as dcp
+import torch.nn as nn
+from torchtitan.components.checkpoint import (
+    _rank_checkpoint_bytes,
+    CheckpointCatalog,
+    CheckpointManager,
+    CheckpointTelemetry,
+    purge_thread,
+    Terminate,
+)
+from torchtitan.components.lr_scheduler import LRSchedulersContainer
+from torchtitan.components.optimizer import OptimizersContainer
+
+
+def _write_checkpoint(folder: str, step: int, complete: bool = True) -> str:
+    path = os.path.join(folder, f"step-{step}")
+    os.makedirs(path)
+    with open(os.path.join(path, "__0_0.distcp"), "wb") as f:
+        f.write(b"x" * 100)
+    if complete:
+        open(os.path.join(path, ".metadata"), "w").close()
+    return path
+
+
+class TestCheckpointCatalog(unittest.TestCase):
+    def test_bootstraps_from_existing_folder(self):
+        with tempfile.TemporaryDirectory() as folder:
+            _write_checkpoint(folder, 10)
+            _write_checkpoint(folder, 20)
+            _write_checkpoint(folder, 30, complete=False)
+
+            catalog = CheckpointCatalog(folder)
+            self.assertEqual(catalog.steps(), [10, 20, 30])
+            self.assertEqual(catalog.latest_complete_step(), 20)
+            self.assertFalse(os.path.exists(catalog.path))
+
+    def test_save_lifecycle(self):
+        with tempfile.TemporaryDirectory() as folder:
+            catalog = CheckpointCatalog(folder)
+            catalog.add(10)
+            _write_checkpoint(folder, 10)
+            catalog.mark_complete(10, save_seconds=1.5)
+            catalog.add(20)
+
+            # A fresh reader only sees the catalog file
+            reader = CheckpointCatalog(folder)
+            self.assertEqual(reader.steps(), [10, 20])
+            self.assertEqual(reader.latest_complete_step(), 10)
+
+            catalog.remove([10])
+            reader.reload()
+            self.assertEqual(reader.steps(), [20])
+            self.assertEqual(reader.latest_complete_step(), -1)
+
+    def test_records_size_and_timing(self):
+        with tempfile.TemporaryDirectory() as folder:
+            catalog = CheckpointCatalog(folder)
+            catalog.add(5)
+            path = os.path.join(folder, "step-5")
+            dcp.save({"w": torch.zeros(25)}, checkpoint_id=path)
+            catalog.mark_complete(5, save_seconds=2.0)
+
+            reader = CheckpointCatalog(folder)
+            reader.reload()
+            entry = reader._get_entries()[5]
+            self.assertTrue(entry["complete"])
+            self.assertEqual(
+                entry["size_bytes"],
+                sum(
+                    os.path.getsize(os.path.join(path, f))
+                    for f in os.listdir(path)
+                    if f.endswith(".distcp")
+                ),
+            )
+            self.assertEqual(entry["save_seconds"], 2.0)
+
+    def test_writers_keep_each_others_entries(self):
+        with tempfile.TemporaryDirectory() as folder:
+            # e.g. the replica groups of torchft
+            writers = [CheckpointCatalog(folder) for _ in range(2)]
+            writers[0].add(10)
+            writers[1].add(10)
+            writers[0].add(20)
+            writers[1].mark_complete(10, save_seconds=1.0)
+
+            reader = CheckpointCatalog(folder)
+            self.assertEqual(reader.steps(), [10, 20])
+            self.assertEqual(reader.latest_complete_step(), 10)
+
+    def test_stale_with_newer_step_directories(self):
+        with tempfile.TemporaryDirectory() as folder:
+            catalog = CheckpointCatalog(folder)
+            catalog.add(10)
+            _write_checkpoint(folder, 10)
+            catalog.mark_complete(10, save_seconds=1.0)
+            self.assertFalse(catalog.is_stale())
+
+            # Written by a job that did not update the catalog
+            _write_checkpoint(folder, 20)
+            self.assertTrue(catalog.is_stale())
+            catalog.reload(scan=True)
+            self.assertEqual(catalog.latest_complete_step(), 20)
+
+            shutil.rmtree(os.path.join(folder, "step-20"))
+            self.assertTrue(catalog.is_stale())
+
+    def test_purge_thread_deletes_all(self):
+        with tempfile.TemporaryDirectory() as folder:
+            paths = [_write_checkpoint(folder, step) for step in range(8)]
+            purge_queue = queue.Queue()
+            thread = threading.Thread(target=purge_thread, args=(purge_queue, 3))
+            thread.start()
+            for path in paths:
+                purge_queue.put(path)
+            purge_queue.put(Terminate())
+            thread.join()
+            self.assertEqual(os.listdir(folder), [])
+
+
+class TestCheckpointTelemetry(unittest.TestCase):
+    def test_async_phases_and_summary(self):
+        telemetry = CheckpointTelemetry("save", 10, "async", "step-10")
+        with telemetry.phase("stage"):
+            pass
+        future = Future()
+        telemetry.time_future("write", future, begin=0.0)
+        self.assertNotIn("write", telemetry.phases)
+
+        future.set_result(None)
+        telemetry.wait()
+        telemetry.num_bytes = 2 * 10**9
+        telemetry.phases["write"] = 4.0
+        summary = telemetry.summarize()
+        self.assertEqual(summary["bytes_total"], 2 * 10**9)
+        self.assertEqual(summary["gbps_min"], 0.5)
+        self.assertEqual(summary["gbps_max"], 0.5)
+        self.assertEqual(summary["slowest_rank"], 0)
+        self.assertIn("stage", summary["phases"])
+
+    def test_rank_checkpoint_bytes(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for rank, file_idx, size in [(0, 0, 10), (0, 1, 5), (1, 0, 7)]:
+                with open(
+                    os.path.join(folder, f"__{rank}_{file_idx}.distcp"), "wb"
+                ) as f:
+                    f.write(b"x" * size)
+            self.assertEqual(_rank_checkpoint_bytes(folder, 0), 15)
+            self.assertEqual(_rank_checkpoint_bytes(folder, 1), 7)
+            self.assertEqual(_rank_checkpoint_bytes(folder, 2), 0)
+
+    def test_async_telemetry_logged_at_current_step(self):
+        logged = []
+
+        class _Logger:
+            def log(self, metrics, step):
+                logged.append((metrics, step))
+
+        class _MetricsProcessor:
+            logger = _Logger()
+
+            def flush(self):
+                pass
+
+        dist.init_process_group("gloo", store=dist.HashStore(), rank=0, world_size=1)
+        self.addCleanup(dist.destroy_process_group)
+        with tempfile.TemporaryDirectory() as folder:
+            model = nn.Linear(4, 4)
+            optimizers = OptimizersContainer(
+                OptimizersContainer.Config(), model_parts=[model]
+            )
+            manager = CheckpointManager(
+                CheckpointManager.Config(
+                    enable=True,
+                    async_mode="async",
+                    interval=10,
+                    enable_telemetry=True,
+                ),
+                dataloader=None,
+                model_parts=[model],
+                optimizers=optimizers,
+                lr_schedulers=LRSchedulersContainer(optimizers, lambda step: 1.0),
+                states={},
+                sd_adapter=None,
+                base_folder=folder,
+                metrics_processor=_MetricsProcessor(),
+            )
+            manager.save(curr_step=10)
+            self.assertEqual(logged, [])
+
+            # Reported when the save at step 20 waits for the one at step 10
+            manager.save(curr_step=20)
+            [(metrics, step)] = logged
+            self.assertEqual(step, 20)
+            self.assertEqual(metrics["checkpoint_metrics/save/step"], 10)
+            self.assertGreater(metrics["checkpoint_metrics/save/bytes(GB)"], 0)
+
+            # The final save is reported on close
+            manager.close()
+            self.assertEqual(len(logged), 2)
+            self.assertEqual(logged[1][0]["checkpoint_metrics/save/step"], 20)
+            self.assertEqual(
+                sorted(os.listdir(os.path.join(folder, "checkpoint_telemetry"))),
+                ["save-step-10.json", "save-step-20.json"],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import tempfile
+import unittest
+
+import torch
+
+try:
+    from torchtitan.models.flux.flux_datasets import FluxCachedDataset
+    from torchtitan.models.flux.latent_cache import (
+        LatentCache,
+        LatentCacheWriter,
+        save_empty_encodings,
+    )
+except ImportError:
+    # The flux package requires transformers
+    FluxCachedDataset = None
+
+
+def _encodings(values: list[int]) -> dict[str, torch.Tensor]:
+    """Encodings of a batch whose sample ``i`` is filled with ``values[i]``."""
+    v = torch.tensor(values, dtype=torch.float32)
+    return {
+        "t5_encodings": v.view(-1, 1, 1).expand(-1, 4, 8).clone(),
+        "clip_encodings": v.view(-1, 1).expand(-1, 8).clone(),
+        "img_moments": v.view(-1, 1, 1, 1).expand(-1, 6, 2, 2).clone(),
+    }
+
+
+def _write(path: str, rank: int, values: list[int], batch_size: int, shard_size: int):
+    writer = LatentCacheWriter(path, rank=rank, shard_size=shard_size)
+    for start in range(0, len(values), batch_size):
+        batch = values[start : start + batch_size]
+        writer.add([f"sample-{v}" for v in batch], _encodings(batch))
+    writer.close()
+
+
+@unittest.skipIf(FluxCachedDataset is None, "transformers is not installed")
+class TestLatentCache(unittest.TestCase):
+    def test_round_trip_across_shards(self):
+        with tempfile.TemporaryDirectory() as path:
+            # Batches of 2 into shards of 3: shards straddle batches
+            _write(path, rank=0, values=list(range(8)), batch_size=2, shard_size=3)
+            shards = sorted(f for f in os.listdir(path) if f.startswith("shard-"))
+            self.assertEqual(len(shards), 3)
+
+            cache = LatentCache(path)
+            self.assertEqual(len(cache), 8)
+            self.assertEqual(cache.sample_ids, [f"sample-{v}" for v in range(8)])
+            for v in range(8):
+                sample = cache[f"sample-{v}"]
+                expected = _encodings([v])
+                for name, tensor in sample.items():
+                    self.assertTrue(torch.equal(tensor, expected[name][0]), name)
+
+    def test_merges_rank_indices(self):
+        with tempfile.TemporaryDirectory() as path:
+            _write(path, rank=1, values=[10, 11, 12], batch_size=2, shard_size=2)
+            _write(path, rank=0, values=[0, 1, 2], batch_size=3, shard_size=2)
+
+            cache = LatentCache(path)
+            # Ranks in order, each in write order
+            self.assertEqual(
+                cache.sample_ids,
+                [f"sample-{v}" for v in (0, 1, 2, 10, 11, 12)],
+            )
+            self.assertEqual(cache["sample-11"]["clip_encodings"][0].item(), 11)
+            self.assertEqual(cache.get(2)["img_moments"][0, 0, 0].item(), 2)
+
+    def test_missing_cache_raises(self):
+        with tempfile.TemporaryDirectory() as path:
+            with self.assertRaises(FileNotFoundError):
+                LatentCache(path)
+
+
+@unittest.skipIf(FluxCachedDataset is None, "transformers is not installed")
+class TestFluxCachedDataset(unittest.TestCase):
+    def _values(self, dataset, num_samples: int) -> list[int]:
+        it = iter(dataset)
+        values = []
+        for _ in range(num_samples):
+            inputs, moments = next(it)
+            self.assertEqual(inputs["t5_encodings"][0, 0], moments[0, 0, 0])
+            values.append(int(moments[0, 0, 0].item()))
+        return values
+
+    def test_dp_split_and_resume(self):
+        with tempfile.TemporaryDirectory() as path:
+            _write(path, rank=0, values=list(range(10)), batch_size=4, shard_size=3)
+
+            def build():
+                return FluxCachedDataset(
+                    path, prompt_dropout_prob=0.0, dp_rank=1, dp_world_size=2
+                )
+
+            self.assertEqual(self._values(build(), 5), [1, 3, 5, 7, 9])
+
+            dataset = build()
+            self.assertEqual(self._values(dataset, 2), [1, 3])
+            resumed = build()
+            resumed.load_state_dict(dataset.state_dict())
+            self.assertEqual(self._values(resumed, 3), [5, 7, 9])
+
+    def test_prompt_dropout_uses_empty_encodings(self):
+        with tempfile.TemporaryDirectory() as path:
+            _write(path, rank=0, values=[3], batch_size=1, shard_size=1)
+            empty = _encodings([-1])
+            save_empty_encodings(
+                path, empty["t5_encodings"][0], empty["clip_encodings"][0]
+            )
+            dataset = FluxCachedDataset(path, prompt_dropout_prob=1.0)
+            inputs, moments = next(iter(dataset))
+            self.assertTrue(
+                torch.equal(inputs["t5_encodings"], empty["t5_encodings"][0])
+            )
+            self.assertTrue(
+                torch.equal(inputs["clip_encodings"], empty["clip_encodings"][0])
+            )
+            self.assertEqual(moments[0, 0, 0].item(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
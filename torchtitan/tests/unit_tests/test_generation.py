@@ -0,0 +1,203 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import json
+import sys
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import torch
+
+from torchtitan.models.llama3 import model_registry
+
+# support importing the generate scripts, which are not part of the package
+sys.path.append(str(Path(__file__).parents[2] / "scripts"))
+
+# pyrefly: ignore[missing-import]
+from generate._generation import generate, generate_with_kv_cache  # noqa: E402
+
+# pyrefly: ignore[missing-import]
+from generate.serve import (  # noqa: E402
+    _make_handler,
+    BatchingEngine,
+    GenerationRequest,
+)
+
+
+def _build_model(flavor: str) -> torch.nn.Module:
+    torch.manual_seed(0)
+    model = model_registry(flavor).model.build()
+    model.init_weights(buffer_device=torch.device("cpu"))
+    model.eval()
+    return model
+
+
+class TestGenerateWithKVCache(unittest.TestCase):
+    def test_matches_full_recompute(self):
+        model = _build_model("debugmodel")
+        input_ids = torch.randint(0, 2048, (3, 7))
+        expected = generate(model, input_ids, max_new_tokens=10, seed=3)
+        actual = generate_with_kv_cache(model, input_ids, max_new_tokens=10, seed=3)
+        self.assertTrue(torch.equal(actual, expected))
+
+    def test_restores_inner_attention(self):
+        model = _build_model("debugmodel")
+        inner = [layer.attention.inner_attention for layer in model.layers.values()]
+        generate_with_kv_cache(model, torch.randint(0, 2048, (5,)), max_new_tokens=2)
+        for layer, expected in zip(model.layers.values(), inner):
+            self.assertIs(layer.attention.inner_attention, expected)
+
+    def test_prompts_of_different_lengths(self):
+        for flavor in ("debugmodel", "debugmodel_varlen_attn"):
+            model = _build_model(flavor)
+            prompts = [torch.randint(0, 2048, (n,)) for n in (3, 7, 5)]
+            batched = generate_with_kv_cache(
+                model, prompts, max_new_tokens=6, top_k=1, pad_id=0
+            )
+            self.assertEqual(batched.shape, (3, 7 + 6))
+            for i, prompt in enumerate(prompts):
+                # varlen attention cannot run the full recompute without masks
+                reference = (
+                    generate if flavor == "debugmodel" else generate_with_kv_cache
+                )
+                single = reference(model, prompt, max_new_tokens=6, top_k=1)
+                self.assertTrue(torch.equal(batched[i, -6:], single[0, -6:]))
+                self.assertTrue(torch.equal(batched[i, 7 - prompt.numel() : 7], prompt))
+
+
+class TestBatchingEngine(unittest.TestCase):
+    def test_batched_requests_match_single_generation(self):
+        model = _build_model("debugmodel")
+        engine = BatchingEngine(
+            model,
+            torch.device("cpu"),
+            eos_id=None,
+            pad_id=0,
+            bucket_size=16,
+            max_wait_ms=50,
+        )
+        requests = [
+            GenerationRequest(
+                prompt_ids=torch.randint(1, 2048, (n,)).tolist(),
+                max_new_tokens=k,
+                temperature=1.0,
+                top_k=1,
+            )
+            for n, k in ((5, 4), (9, 7), (40, 3))
+        ]
+        for request in requests:
+            engine.submit(request)
+        engine.start()
+
+        # shutdown drains the queue and restores the model before returning
+        engine.shutdown()
+        outputs = []
+        for request in requests:
+            tokens = []
+            while (token := request.events.get()) is not None:
+                tokens.append(token)
+            outputs.append(tokens)
+        # the first two prompts share a length bucket, the third does not
+        self.assertEqual(engine.metrics.batches, 2)
+        self.assertEqual(engine.metrics.tokens_generated, 14)
+        for request, tokens in zip(requests, outputs):
+            prompt = torch.tensor(request.prompt_ids)
+            single = generate(
+                model, prompt, max_new_tokens=request.max_new_tokens, top_k=1
+            )
+            self.assertEqual(tokens, single[0, prompt.numel() :].tolist())
+
+    def test_batches_fit_max_seq_len(self):
+        engine = BatchingEngine(
+            torch.nn.Identity(),
+            torch.device("cpu"),
+            eos_id=None,
+            pad_id=0,
+            bucket_size=16,
+            max_seq_len=16,
+        )
+        # Each fits on its own, but padded together they take 10 + 12 tokens
+        short = GenerationRequest(
+            prompt_ids=[1] * 3, max_new_tokens=12, temperature=1.0, top_k=None
+        )
+        long = GenerationRequest(
+            prompt_ids=[1] * 10, max_new_tokens=6, temperature=1.0, top_k=None
+        )
+        engine._pending = [short, long]
+        self.assertEqual(engine._next_batch(), [short])
+        self.assertEqual(engine._next_batch(), [long])
+
+
+class _CharTokenizer:
+    def encode(self, text, add_bos=True, add_eos=False):
+        return [ord(c) for c in text]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+class _FailingEngine(BatchingEngine):
+    def _decode(self, batch):
+        raise RuntimeError("device lost")
+
+
+class TestGenerationHandler(unittest.TestCase):
+    def setUp(self):
+        self.engine = _FailingEngine(
+            torch.nn.Identity(),
+            torch.device("cpu"),
+            eos_id=None,
+            pad_id=0,
+            max_seq_len=64,
+        )
+        self.engine.start()
+        self.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), _make_handler(self.engine, _CharTokenizer())
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.engine.shutdown()
+
+    def _post(self, body: dict) -> tuple[int, dict]:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{self.server.server_port}/generate",
+            data=json.dumps(body).encode(),
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_generation_failure_returns_500(self):
+        status, payload = self._post({"prompt": "hi"})
+        self.assertEqual(status, 500)
+        self.assertIn("device lost", payload["error"])
+
+    def test_invalid_top_k_returns_400(self):
+        for top_k in (0, -1, "many"):
+            status, payload = self._post({"prompt": "hi", "top_k": top_k})
+            self.assertEqual(status, 400)
+            self.assertIn("error", payload)
+
+    def test_exceeding_max_seq_len_returns_400(self):
+        status, payload = self._post({"prompt": "hi", "max_new_tokens": 63})
+        self.assertEqual(status, 400)
+        self.assertIn("max_seq_len 64", payload["error"])
+        # Fits, and reaches the failing engine
+        status, _ = self._post({"prompt": "hi", "max_new_tokens": 62})
+        self.assertEqual(status, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from torchtitan.experiments.vlm.datasets.utils.image_fetch import ImageFetcher
+
+# Local stand-in for image hosts: /img/<name> serves bytes, /slow/<name> sleeps
+# first, anything else is a 404
+IMAGES = {"a": b"image-a", "b": b"image-b", "same-as-a": b"image-a"}
+SLOW_SECONDS = 0.3
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests_served = 0
+
+    def do_GET(self):
+        type(self).requests_served += 1
+        _, kind, name = self.path.split("?")[0].split("/")
+        if kind == "slow":
+            time.sleep(SLOW_SECONDS)
+        if kind not in ("img", "slow") or name not in IMAGES:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(IMAGES[name])))
+        self.end_headers()
+        self.wfile.write(IMAGES[name])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestImageFetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _Handler.requests_served = 0
+
+    def test_prefetch_replaces_urls(self):
+        fetcher = ImageFetcher(max_workers=4, log_freq=0)
+        samples = [
+            {
+                "texts": [f"{self.url}/img/a", None],
+                "images": [None, f"{self.url}/img/a"],
+            },
+            {"jpg": f"{self.url}/img/b", "txt": "caption"},
+            {"images": [f"{self.url}/img/missing"]},
+        ]
+        out = list(fetcher.prefetch(iter(samples), window=2))
+        # Text fields are never fetched
+        self.assertEqual(out[0]["texts"], samples[0]["texts"])
+        self.assertEqual(out[0]["images"], [None, b"image-a"])
+        self.assertEqual(out[1], {"jpg": b"image-b", "txt": "caption"})
+        # Failed fetches become empty bytes, which fail image processing
+        self.assertEqual(out[2]["images"], [b""])
+        self.assertEqual(fetcher.stats["fetches"], 3)
+        self.assertEqual(fetcher.stats["failures"], 1)
+
+    def test_fetches_window_concurrently(self):
+        fetcher = ImageFetcher(max_workers=8, log_freq=0)
+        samples = [{"jpg": f"{self.url}/slow/a?{i}"} for i in range(8)]
+        start = time.perf_counter()
+        out = list(fetcher.prefetch(iter(samples), window=8))
+        elapsed = time.perf_counter() - start
+        self.assertEqual([s["jpg"] for s in out], [b"image-a"] * 8)
+        self.assertLess(elapsed, 4 * SLOW_SECONDS)
+
+    def test_cache_is_shared_and_content_addressed(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            urls = [f"{self.url}/img/{name}" for name in ("a", "b", "same-as-a")]
+            fetcher = ImageFetcher(max_workers=2, cache_dir=cache_dir, log_freq=0)
+            self.assertEqual(
+                [fetcher.fetch(u) for u in urls],
+                [IMAGES["a"], IMAGES["b"], IMAGES["a"]],
+            )
+            self.assertEqual(_Handler.requests_served, 3)
+            # Identical content is stored once
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, "blobs"))), 2)
+
+            # Another process (e.g. another rank, or a dataloader worker) hits the cache
+            other = pickle.loads(pickle.dumps(fetcher))
+            other.stats = dict.fromkeys(other.stats, 0)
+            out = list(other.prefetch(({"jpg": u} for u in urls), window=4))
+            self.assertEqual(
+                [s["jpg"] for s in out], [IMAGES["a"], IMAGES["b"], IMAGES["a"]]
+            )
+            self.assertEqual(_Handler.requests_served, 3)
+            self.assertEqual(other.stats["cache_hits"], 3)
+            self.assertIn("cache hit rate 100.0%", other.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
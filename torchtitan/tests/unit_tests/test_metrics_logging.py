@@ -0,0 +1,326 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import json
+import os
+import tempfile
+import threading
+import time
+import types
+import unittest
+
+import torch
+
+from torchtitan.components.metrics import (
+    AsyncLogger,
+    BaseLogger,
+    JSONLLogger,
+    MetricsProcessor,
+    ParquetLogger,
+    StepTimeline,
+    STRAGGLER_PHASES,
+    straggler_phases,
+    StragglerDetector,
+    TIMELINE_PHASES,
+)
+
+
+class _RecordingLogger(BaseLogger):
+    """Records log calls, optionally blocking each until released."""
+
+    def __init__(self, block: bool = False):
+        self.logged: list[tuple[dict, int]] = []
+        self.flushes = 0
+        self.closed = False
+        self.release = threading.Event()
+        self.started = threading.Event()
+        if not block:
+            self.release.set()
+
+    def log(self, metrics, step):
+        self.started.set()
+        self.release.wait()
+        self.logged.append((metrics, step))
+
+    def flush(self):
+        self.flushes += 1
+
+    def close(self):
+        self.closed = True
+
+
+class TestAsyncLogger(unittest.TestCase):
+    def test_logs_in_order_and_flushes(self):
+        inner = _RecordingLogger()
+        async_logger = AsyncLogger(inner)
+        metrics = {"loss": 1.0}
+        for step in range(1, 6):
+            async_logger.log(metrics, step)
+        # The caller may reuse the dict once log returns
+        metrics["loss"] = 2.0
+        async_logger.flush()
+        self.assertEqual([step for _, step in inner.logged], [1, 2, 3, 4, 5])
+        self.assertEqual(inner.logged[0][0], {"loss": 1.0})
+        self.assertEqual(inner.flushes, 1)
+
+        async_logger.close()
+        self.assertTrue(inner.closed)
+        self.assertEqual(inner.flushes, 2)
+
+    def _fill(self, drop_policy):
+        inner = _RecordingLogger(block=True)
+        async_logger = AsyncLogger(inner, queue_size=2, drop_policy=drop_policy)
+        async_logger.log({}, 1)
+        # Step 1 is being logged, steps 2 and 3 fill the queue
+        inner.started.wait()
+        for step in range(2, 6):
+            async_logger.log({}, step)
+        inner.release.set()
+        async_logger.close()
+        return async_logger, [step for _, step in inner.logged]
+
+    def test_drop_oldest(self):
+        async_logger, steps = self._fill("drop_oldest")
+        self.assertEqual(steps, [1, 4, 5])
+        self.assertEqual(async_logger.num_dropped, 2)
+
+    def test_drop_newest(self):
+        async_logger, steps = self._fill("drop_newest")
+        self.assertEqual(steps, [1, 2, 3])
+        self.assertEqual(async_logger.num_dropped, 2)
+
+    def test_unknown_drop_policy_raises(self):
+        with self.assertRaises(ValueError):
+            AsyncLogger(BaseLogger(), drop_policy="drop_all")
+
+    def test_logger_errors_do_not_stop_logging(self):
+        class _FailingLogger(_RecordingLogger):
+            def log(self, metrics, step):
+                if step == 1:
+                    raise RuntimeError("backend unavailable")
+                super().log(metrics, step)
+
+        inner = _FailingLogger()
+        async_logger = AsyncLogger(inner)
+        async_logger.log({}, 1)
+        async_logger.log({}, 2)
+        async_logger.close()
+        self.assertEqual([step for _, step in inner.logged], [2])
+
+
+class TestLocalStepLoggers(unittest.TestCase):
+    def test_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "step_metrics", "rank_0.jsonl")
+            jsonl_logger = JSONLLogger(path)
+            jsonl_logger.log({"time_metrics/step(s)": 0.5}, 1)
+            jsonl_logger.log({"time_metrics/step(s)": 0.25, "lr": 1e-3}, 2)
+            jsonl_logger.close()
+            with open(path) as f:
+                rows = [json.loads(line) for line in f]
+            self.assertEqual(
+                rows,
+                [
+                    {"step": 1, "time_metrics/step(s)": 0.5},
+                    {"step": 2, "time_metrics/step(s)": 0.25, "lr": 1e-3},
+                ],
+            )
+
+    def test_parquet(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            prefix = os.path.join(tmpdir, "step_metrics", "rank_0")
+            parquet_logger = ParquetLogger(prefix, rows_per_file=2)
+            for step in range(1, 6):
+                parquet_logger.log({"time_metrics/step(s)": step / 10}, step)
+            parquet_logger.close()
+            files = sorted(os.listdir(os.path.dirname(prefix)))
+            self.assertEqual(
+                files,
+                [
+                    "rank_0-00000.parquet",
+                    "rank_0-00001.parquet",
+                    "rank_0-00002.parquet",
+                ],
+            )
+            steps = [
+                step
+                for name in files
+                for step in pq.read_table(
+                    os.path.join(os.path.dirname(prefix), name)
+                ).column("step")
+            ]
+            self.assertEqual([s.as_py() for s in steps], [1, 2, 3, 4, 5])
+
+
+class TestStepTimeline(unittest.TestCase):
+    def test_mean_phase_times_per_step(self):
+        timeline = StepTimeline()
+        for _ in range(2):
+            with timeline.phase("forward"):
+                time.sleep(0.02)
+            with timeline.phase("optimizer"):
+                pass
+            timeline.step()
+        means = dict(zip(TIMELINE_PHASES, timeline.collect()))
+        self.assertGreaterEqual(means["forward"], 0.02)
+        self.assertLess(means["optimizer"], 0.01)
+        self.assertEqual(means["backward"], 0.0)
+        # Collecting resets the interval
+        self.assertEqual(timeline.collect(), [0.0] * len(TIMELINE_PHASES))
+
+    def test_phases_reported_once_step_closes(self):
+        timeline = StepTimeline()
+        with timeline.phase("forward"):
+            time.sleep(0.01)
+        # A log step collects before the checkpoint of the step
+        self.assertEqual(timeline.collect(), [0.0] * len(TIMELINE_PHASES))
+        with timeline.phase("checkpoint"):
+            time.sleep(0.01)
+        timeline.step()
+        means = dict(zip(TIMELINE_PHASES, timeline.collect()))
+        self.assertGreaterEqual(means["forward"], 0.01)
+        self.assertGreaterEqual(means["checkpoint"], 0.01)
+
+    def test_disabled_is_noop(self):
+        timeline = StepTimeline(enable=False)
+        with timeline.phase("forward"):
+            time.sleep(0.01)
+        timeline.step()
+        self.assertEqual(timeline.collect(), [0.0] * len(TIMELINE_PHASES))
+
+    def test_unknown_phase_raises(self):
+        with self.assertRaises(KeyError):
+            StepTimeline().phase("warmup")
+
+    def test_timeline_metrics(self):
+        processor = MetricsProcessor.__new__(MetricsProcessor)
+        processor.step_timeline = StepTimeline()
+        with processor.step_timeline.phase("data"):
+            time.sleep(0.01)
+        processor.step_timeline.step()
+        metrics = processor._timeline_metrics()
+        # Phases that did not run are not reported
+        self.assertEqual(
+            set(metrics),
+            {"timeline/data(s)", "timeline/data_max(s)", "timeline/data_slowest_rank"},
+        )
+        self.assertEqual(metrics["timeline/data_slowest_rank"], 0)
+        self.assertEqual(
+            tuple(processor.rank_phase_times.shape), (1, len(TIMELINE_PHASES))
+        )
+
+
+def _phase_times(step_times: list[float], phase: str = "forward") -> torch.Tensor:
+    """[num_ranks, len(TIMELINE_PHASES)] times with ``step_times`` in ``phase``."""
+    times = torch.zeros(len(step_times), len(TIMELINE_PHASES))
+    times[:, TIMELINE_PHASES.index(phase)] = torch.tensor(step_times)
+    # Waiting at collectives does not count towards the step time
+    times[:, TIMELINE_PHASES.index("comm")] = 10.0
+    return times
+
+
+class TestStragglerDetector(unittest.TestCase):
+    def test_flags_rank_after_patience(self):
+        detector = StragglerDetector(threshold=1.2, patience=2)
+        detector.hostnames = [f"node{rank}" for rank in range(4)]
+        reports = []
+        detector.register_callback(reports.append)
+
+        times = _phase_times([1.0, 1.0, 1.0, 1.0])
+        times[2, TIMELINE_PHASES.index("optimizer")] = 0.5
+        metrics = detector.update(10, times)
+        self.assertEqual(reports, [])
+        self.assertEqual(metrics["straggler/slowest_rank"], 2)
+        self.assertEqual(metrics["straggler/step_time_p50(s)"], 1.0)
+        self.assertAlmostEqual(metrics["straggler/slowest_ratio"], 1.5)
+        self.assertEqual(metrics["straggler/num_stragglers"], 0)
+
+        metrics = detector.update(20, times)
+        self.assertEqual(len(reports), 1)
+        report = reports[0]
+        self.assertEqual((report.step, report.rank), (20, 2))
+        self.assertEqual(report.phase, "optimizer")
+        self.assertAlmostEqual(report.phase_excess, 0.5)
+        self.assertEqual(report.num_intervals, 2)
+        self.assertEqual(report.hostname, "node2")
+        self.assertEqual(metrics["straggler/num_stragglers"], 1)
+        # Ratio 1.5 falls in the [1.5, 2.0) bin
+        self.assertEqual(detector.histogram(2), [0, 0, 0, 0, 2, 0])
+        self.assertEqual(detector.histogram(0), [2, 0, 0, 0, 0, 0])
+
+        # Reported again every patience intervals while it stays slow
+        detector.update(30, times)
+        self.assertEqual(len(reports), 1)
+        detector.update(40, times)
+        self.assertEqual(len(reports), 2)
+
+    def test_recovered_rank_resets(self):
+        detector = StragglerDetector(patience=2)
+        detector.hostnames = [f"node{rank}" for rank in range(3)]
+        reports = []
+        detector.register_callback(reports.append)
+        detector.update(10, _phase_times([1.0, 2.0, 1.0]))
+        detector.update(20, _phase_times([1.0, 1.0, 1.0]))
+        detector.update(30, _phase_times([1.0, 2.0, 1.0]))
+        self.assertEqual(reports, [])
+
+    def test_percentile_reference(self):
+        detector = StragglerDetector(percentile=0, threshold=1.5, patience=1)
+        detector.hostnames = [f"node{rank}" for rank in range(4)]
+        reports = []
+        detector.register_callback(reports.append)
+        detector.update(10, _phase_times([1.0, 1.4, 1.6, 2.0], phase="data"))
+        self.assertEqual([report.rank for report in reports], [2, 3])
+        self.assertTrue(all(report.phase == "data" for report in reports))
+        self.assertTrue(all(report.reference_time == 1.0 for report in reports))
+
+    def test_invalid_arguments_raise(self):
+        with self.assertRaises(ValueError):
+            StragglerDetector(percentile=101)
+        with self.assertRaises(ValueError):
+            StragglerDetector(patience=0)
+
+    def test_phases_without_collectives(self):
+        def parallel_dims(**enabled):
+            names = ("fsdp", "tp", "cp", "ep", "pp", "dp_replicate")
+            return types.SimpleNamespace(
+                **{f"{name}_enabled": enabled.get(name, False) for name in names}
+            )
+
+        self.assertEqual(
+            straggler_phases(parallel_dims()),
+            (*STRAGGLER_PHASES, "forward", "backward"),
+        )
+        # DDP all-reduces gradients in backward
+        self.assertEqual(
+            straggler_phases(parallel_dims(dp_replicate=True)),
+            (*STRAGGLER_PHASES, "forward"),
+        )
+        for name in ("fsdp", "tp", "pp"):
+            self.assertEqual(
+                straggler_phases(parallel_dims(**{name: True})), STRAGGLER_PHASES
+            )
+        self.assertTrue(set(STRAGGLER_PHASES) <= set(TIMELINE_PHASES))
+
+    def test_compares_only_given_phases(self):
+        detector = StragglerDetector(patience=1, phases=STRAGGLER_PHASES)
+        detector.hostnames = [f"node{rank}" for rank in range(3)]
+        reports = []
+        detector.register_callback(reports.append)
+        # Under FSDP, the fast ranks wait for the straggler inside forward
+        times = _phase_times([2.0, 2.0, 2.0], phase="forward")
+        times[:, TIMELINE_PHASES.index("optimizer")] = torch.tensor([0.1, 0.1, 0.3])
+        detector.update(10, times)
+        self.assertEqual([(r.rank, r.phase) for r in reports], [(2, "optimizer")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+
+import torch
+
+from torchtitan.models.common.moe.kernels import (
+    fill_indices_cpu,
+    generate_permute_indices,
+)
+
+
+def _fill_indices_loop(
+    tokens_per_expert_group: torch.Tensor,
+    start_index_values: torch.Tensor,
+    write_offsets: torch.Tensor,
+    experts_per_rank: int,
+    num_ranks: int,
+    max_len: int,
+) -> torch.Tensor:
+    """Per-(expert, rank) loop that fill_indices_cpu replaced."""
+    permuted_indices = torch.full((max_len,), -1, dtype=torch.int64)
+    for e in range(experts_per_rank):
+        write_start = write_offsets[e].item()
+        for r in range(num_ranks):
+            i = r * experts_per_rank + e
+            start_index = start_index_values[i].item()
+            length = tokens_per_expert_group[i].item()
+            if length > 0:
+                end_idx = min(write_start + length, max_len)
+                permuted_indices[write_start:end_idx] = torch.arange(
+                    start_index,
+                    start_index + (end_idx - write_start),
+                    dtype=torch.int64,
+                )
+            write_start += length
+    return permuted_indices
+
+
+def _permute_inputs(
+    experts_per_rank: int, num_ranks: int, alignment: int, max_tokens: int, seed: int
+) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    generator = torch.Generator().manual_seed(seed)
+    tokens_per_expert_group = torch.randint(
+        0, max_tokens, (experts_per_rank * num_ranks,), generator=generator
+    ).to(torch.int32)
+    start_index_values = (
+        torch.cumsum(tokens_per_expert_group, 0) - tokens_per_expert_group
+    )
+    total = tokens_per_expert_group.view(num_ranks, -1).sum(0)
+    total = torch.clamp_min(total, alignment)
+    m_sizes = ((total + alignment - 1) // alignment * alignment).to(torch.int32)
+    write_offsets = torch.cumsum(m_sizes, 0) - m_sizes
+    return tokens_per_expert_group, start_index_values, write_offsets
+
+
+class TestFillIndicesCpu(unittest.TestCase):
+    def _check(self, experts_per_rank, num_ranks, alignment, max_tokens, max_len):
+        for seed in range(3):
+            inputs = _permute_inputs(
+                experts_per_rank, num_ranks, alignment, max_tokens, seed
+            )
+            expected = _fill_indices_loop(*inputs, experts_per_rank, num_ranks, max_len)
+            actual = fill_indices_cpu(*inputs, experts_per_rank, num_ranks, max_len)
+            self.assertEqual(actual.dtype, torch.int64)
+            self.assertTrue(torch.equal(actual, expected))
+
+    def test_matches_loop(self):
+        self._check(
+            experts_per_rank=8, num_ranks=4, alignment=16, max_tokens=40, max_len=2048
+        )
+
+    def test_matches_loop_single_rank(self):
+        self._check(
+            experts_per_rank=4, num_ranks=1, alignment=8, max_tokens=10, max_len=128
+        )
+
+    def test_matches_loop_with_empty_experts(self):
+        self._check(
+            experts_per_rank=16, num_ranks=2, alignment=8, max_tokens=2, max_len=512
+        )
+
+    def test_truncated_to_max_len(self):
+        # The loop cannot start a segment past max_len, so compare against a
+        # truncated full-length result instead.
+        inputs = _permute_inputs(
+            experts_per_rank=8, num_ranks=4, alignment=16, max_tokens=40, seed=0
+        )
+        expected = _fill_indices_loop(*inputs, 8, 4, 2048)[:100]
+        actual = fill_indices_cpu(*inputs, 8, 4, 100)
+        self.assertTrue(torch.equal(actual, expected))
+
+    def test_generate_permute_indices_cpu(self):
+        tokens_per_expert_group = torch.tensor([4, 2, 1, 3, 1, 2, 3, 4])
+        permuted_indices, m_sizes, m_offsets = generate_permute_indices(
+            tokens_per_expert_group,
+            experts_per_rank=4,
+            num_ranks=2,
+            max_len=32,
+            alignment=8,
+            use_cpu=True,
+        )
+        self.assertEqual(m_sizes.tolist(), [8, 8, 8, 8])
+        self.assertEqual(m_offsets.tolist(), [8, 16, 24, 32])
+        self.assertEqual(permuted_indices[:8].tolist(), [0, 1, 2, 3, 10, -1, -1, -1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import subprocess
+import sys
+import time
+import unittest
+
+from torchtitan.tools.startup import STARTUP_PHASES, StartupProfiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_phases_accumulate_and_summarize(self):
+        profiler = StartupProfiler()
+        profiler.start_time -= 10.0
+        profiler.record("imports", 2.0)
+        with profiler.phase("parallelize"):
+            time.sleep(0.01)
+        with profiler.phase("parallelize"):
+            time.sleep(0.01)
+        self.assertGreaterEqual(profiler.phase_times["parallelize"], 0.02)
+
+        metrics = profiler.summarize()
+        self.assertTrue(profiler.summarized)
+        self.assertEqual(
+            set(metrics),
+            {f"startup/{name}(s)" for name in (*STARTUP_PHASES, "other")}
+            | {"startup/time_to_first_step(s)"},
+        )
+        self.assertEqual(metrics["startup/imports(s)"], 2.0)
+        total = metrics["startup/time_to_first_step(s)"]
+        self.assertGreaterEqual(total, 10.0)
+        phases = sum(metrics[f"startup/{name}(s)"] for name in STARTUP_PHASES)
+        self.assertAlmostEqual(metrics["startup/other(s)"], total - phases)
+
+    def test_unknown_phase_raises(self):
+        with self.assertRaises(ValueError):
+            StartupProfiler().record("warmup", 1.0)
+
+    def test_trainer_import_skips_optional_subsystems(self):
+        # Optional subsystems are imported only once they are used
+        code = (
+            "import sys, torchtitan.trainer, torchtitan.models.llama3.config_registry;"
+            "print(sorted({'datasets', 'tensorboard', 'wandb', "
+            "'torchtitan.models.flux', 'torchtitan.experiments.vlm'} & set(sys.modules)))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(out.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import tempfile
+import unittest
+
+import torch
+import torch.distributed as dist
+from torch.distributed.device_mesh import init_device_mesh
+from torch.distributed.tensor import distribute_tensor, Replicate
+
+from torchtitan.components.validate import _local_loss_sum
+
+
+class TestLocalLossSum(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.store_file = tempfile.NamedTemporaryFile(delete=False)
+        dist.init_process_group(
+            "gloo",
+            init_method=f"file://{cls.store_file.name}",
+            rank=0,
+            world_size=1,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        dist.destroy_process_group()
+
+    def test_dtensor_loss_accumulates(self):
+        # loss_parallel makes the loss function return a Replicate DTensor
+        mesh = init_device_mesh("cpu", (1,))
+        loss_sum = distribute_tensor(torch.tensor(3.5), mesh, [Replicate()])
+        local_totals = torch.zeros(2, dtype=torch.float32)
+        local_totals[0] += _local_loss_sum(loss_sum)
+        local_totals[0] += _local_loss_sum(torch.tensor([1.0, 0.5]))
+        self.assertEqual(local_totals.tolist(), [5.0, 0.0])
+
+    def test_detaches(self):
+        loss_sum = torch.tensor(2.0, requires_grad=True) * 2
+        self.assertFalse(_local_loss_sum(loss_sum).requires_grad)
+
+
+if __name__ == "__main__":
+    unittest.main()
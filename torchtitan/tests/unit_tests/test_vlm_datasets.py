@@ -0,0 +1,148 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+
+import torch
+
+from torchtitan.experiments.vlm.datasets.mm_collator_nld import MultiModalCollatorNLD
+from torchtitan.experiments.vlm.datasets.utils.image import (
+    collate_image_patches,
+    convert_to_patches,
+    pad_empty_images_to_target_batch_size,
+    pad_patches,
+)
+from torchtitan.experiments.vlm.datasets.utils.packing import SamplePacker
+from torchtitan.experiments.vlm.model.args import SpecialTokens
+
+SPECIAL_TOKENS = SpecialTokens(
+    img_token="<|image|>",
+    img_id=1,
+    boi_token="<|begin_of_image|>",
+    boi_id=2,
+    eoi_token="<|end_of_image|>",
+    eoi_id=3,
+    pad_token="<|pad|>",
+    pad_id=0,
+)
+
+
+def _sample(length: int, token: int = 7) -> dict:
+    return {
+        "input_ids": torch.full((length,), token),
+        "labels": torch.full((length,), token),
+        "pixel_values": [],
+    }
+
+
+def _drain(packer: SamplePacker) -> list[dict]:
+    packed = []
+    while batch := packer.get_next_batch():
+        packed.extend(batch)
+    return packed
+
+
+class TestSamplePacker(unittest.TestCase):
+    def test_best_fit_fills_tail_space(self):
+        # Next-fit over the sorted lengths would need 4 sequences
+        lengths = [6, 5, 4, 3, 2, 2, 1, 1]
+        packer = SamplePacker(max_seq_length=8, buffer_size=100, batch_size=1)
+        for length in lengths:
+            packer.add_sample(_sample(length))
+        packed = _drain(packer)
+
+        self.assertEqual(len(packed), 3)
+        self.assertEqual(packer.fill_rate, sum(lengths) / (3 * 8))
+        self.assertEqual(
+            sorted(n for p in packed for n in p["sample_lengths"]), sorted(lengths)
+        )
+        for p in packed:
+            self.assertLessEqual(len(p["input_ids"]), 8)
+            self.assertEqual(sum(p["sample_lengths"]), len(p["input_ids"]))
+
+    def test_open_sequences_carry_over_windows(self):
+        torch.manual_seed(0)
+        lengths = torch.randint(1, 32, (400,)).tolist()
+        packer = SamplePacker(max_seq_length=64, buffer_size=20, batch_size=4)
+        for i, length in enumerate(lengths):
+            packer.add_sample(_sample(length, token=i))
+        self.assertGreater(len(packer.open_sequences), 0)
+
+        state = packer.state_dict()
+        restored = SamplePacker(max_seq_length=64, buffer_size=20, batch_size=4)
+        restored.load_state_dict(state)
+
+        packed = _drain(packer)
+        self.assertEqual(len(_drain(restored)), len(packed))
+        # Every sample is emitted exactly once, up to a final partial batch
+        tokens = torch.cat([p["input_ids"] for p in packed]).unique().tolist()
+        self.assertGreater(len(tokens), len(lengths) - 4 * 64)
+        self.assertGreater(packer.fill_rate, 0.9)
+
+    def test_collator_sample_boundaries(self):
+        collator = MultiModalCollatorNLD(
+            batch_size=3,
+            seq_len=8,
+            patch_size=16,
+            max_images_per_batch=1,
+            max_patches_per_image=1,
+            special_tokens=SPECIAL_TOKENS,
+        )
+        batch = [
+            {**_sample(9), "sample_lengths": [3, 4, 2]},
+            {**_sample(5), "sample_lengths": [5]},
+        ]
+        input_dict, _ = collator(batch)
+
+        expected = torch.tensor(
+            [
+                [0, 0, 0, 1, 1, 1, 1, 2],
+                [0, 0, 0, 0, 0, 1, 1, 1],
+                [0, 0, 0, 0, 0, 0, 0, 0],
+            ],
+            dtype=torch.int32,
+        )
+        self.assertTrue(torch.equal(input_dict["document_ids"], expected))
+        self.assertEqual(input_dict["cu_seqlens"].tolist(), [0, 3, 7, 8, 13, 16, 24])
+        self.assertEqual(input_dict["max_seqlen"], 8)
+
+
+class TestCollateImagePatches(unittest.TestCase):
+    def _reference(self, images, patch_size, max_patches, max_images):
+        patch_list, grid_list = [], []
+        for img in images:
+            patches, grids = convert_to_patches(img, patch_size=patch_size)
+            patches, grids = pad_patches(patches, grids, max_patches)
+            patch_list.append(patches)
+            grid_list.append(grids)
+        return pad_empty_images_to_target_batch_size(
+            torch.stack(patch_list), torch.stack(grid_list), max_images
+        )
+
+    def test_matches_per_image_collate(self):
+        torch.manual_seed(0)
+        shapes = [(32, 48), (16, 16), (32, 48), (64, 16), (16, 16), (32, 48)]
+        for dtype in (torch.uint8, torch.float32):
+            images = [(torch.rand(1, h, w, 3) * 255).to(dtype) for h, w in shapes]
+            for max_images in (2, 10):
+                patches, grids = collate_image_patches(
+                    images, patch_size=16, max_patches=8, max_images=max_images
+                )
+                ref_patches, ref_grids = self._reference(images, 16, 8, max_images)
+                self.assertEqual(patches.dtype, ref_patches.dtype)
+                self.assertEqual(grids.dtype, ref_grids.dtype)
+                self.assertTrue(torch.equal(patches, ref_patches))
+                self.assertTrue(torch.equal(grids, ref_grids))
+
+    def test_too_many_patches(self):
+        with self.assertRaises(ValueError):
+            collate_image_patches(
+                [torch.zeros(1, 48, 48, 3)], patch_size=16, max_patches=8, max_images=1
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,15 +6,20 @@
 
 from __future__ import annotations
 
+import contextlib
 import enum
+import fcntl
 import functools
+import json
 import os
 import queue
 import re
 import shutil
+import statistics
+import tempfile
 import threading
 import time
-from concurrent.futures import Future
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any, cast, Literal, TYPE_CHECKING
 
@@ -22,7 +27,7 @@ import torch
 import torch.distributed as dist
 import torch.distributed.checkpoint as dcp
 import torch.nn as nn
-from torch.distributed.checkpoint import HuggingFaceStorageWriter
+from torch.distributed.checkpoint import FileSystemReader, HuggingFaceStorageWriter
 from torch.distributed.checkpoint._consolidate_hf_safetensors import (
     consolidate_safetensors_files_on_every_rank,
 )
@@ -37,6 +42,7 @@ from torch.distributed.checkpoint.state_dict_saver import (
     AsyncSaveResponse,
 )
 from torch.distributed.checkpoint.stateful import Stateful
+from torch.distributed.tensor import DTensor
 from torchtitan.components.dataloader import BaseDataLoader
 from torchtitan.components.lr_scheduler import LRSchedulersContainer
 from torchtitan.components.optimizer import OptimizersContainer
@@ -46,6 +52,7 @@ from torchtitan.tools.logging import logger
 from torchtitan.tools.utils import GarbageCollection
 
 if TYPE_CHECKING:
+    from torchtitan.components.metrics import MetricsProcessor
     from torchtitan.experiments.ft.manager import FTManager
 
 
@@ -96,32 +103,341 @@ class SaveDone:
     pass
 
 
-def purge_thread(purge_queue: queue.Queue):
+def _delete_checkpoint(path: str) -> None:
+    logger.info("Checkpointer is deleting %s.", path)
+    begin = time.monotonic()
+    shutil.rmtree(path, ignore_errors=True)
+    logger.info(
+        "Checkpointer deleted %s in %.2f seconds.",
+        path,
+        time.monotonic() - begin,
+    )
+
+
+def purge_thread(purge_queue: queue.Queue, num_workers: int = 4):
     """Thread to purge the old checkpoints.
 
-    This is only used when keep_latest_k > 0.
+    This is only used when keep_latest_k > 0. Checkpoints are deleted by a pool
+    of ``num_workers`` threads, so several trees are removed concurrently, which
+    matters on metadata-bound filesystems.
 
     Args:
         purge_queue (queue.Queue): The queue to receive the path to purge and Terminate signal.
+        num_workers (int): Number of checkpoints deleted in parallel.
     """
     try:
-        while True:
-            path = purge_queue.get()
-            if isinstance(path, Terminate):
-                return
-            assert isinstance(path, str)
-            logger.info("Checkpointer is deleting %s.", path)
-            begin = time.monotonic()
-            shutil.rmtree(path, ignore_errors=True)
-            logger.info(
-                "Checkpointer deleted %s in %.2f seconds.",
-                path,
-                time.monotonic() - begin,
-            )
+        with ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="checkpoint_purge"
+        ) as executor:
+            while True:
+                path = purge_queue.get()
+                if isinstance(path, Terminate):
+                    # Leaving the executor waits for the pending deletions
+                    return
+                assert isinstance(path, str)
+                executor.submit(_delete_checkpoint, path)
     finally:
         logger.info("Destroying the purge thread.")
 
 
+def _is_complete_checkpoint(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, ".metadata")) or os.path.isfile(
+        os.path.join(path, "model.safetensors.index.json")
+    )
+
+
+def _checkpoint_size(path: str) -> int | None:
+    """Bytes of the checkpoint data, as recorded in its metadata file."""
+    try:
+        if os.path.isfile(os.path.join(path, ".metadata")):
+            metadata = FileSystemReader(path).read_metadata()
+            return sum(info.length for info in metadata.storage_data.values())
+        with open(os.path.join(path, "model.safetensors.index.json")) as f:
+            return int(json.load(f)["metadata"]["total_size"])
+    except Exception as e:
+        logger.warning(f"Could not read the size of checkpoint {path}: {e}")
+        return None
+
+
+def _step_dirnames(folder: str) -> dict[int, str]:
+    """The ``step-N`` entries of ``folder`` by step."""
+    dirnames = {}
+    for filename in os.listdir(folder):
+        match = re.search(r"step-(\d+)", filename)
+        if match:
+            dirnames[int(match.group(1))] = filename
+    return dirnames
+
+
+class CheckpointCatalog:
+    """Index of the ``step-N`` checkpoints of one folder.
+
+    The catalog is a small JSON file in the folder, rewritten atomically by the
+    saving rank whenever a checkpoint is started, completed or purged. It
+    records the step, completion state, size and save time of every
+    checkpoint, so finding the latest checkpoint or the stale ones reads one
+    file instead of listing and probing every step directory.
+
+    When the catalog file is missing or unreadable, e.g. for a folder written
+    before it existed, the folder is scanned once to rebuild it.
+
+    Every update re-reads the file under an exclusive file lock, so that
+    several writers, e.g. the replica groups of torchft, keep each other's
+    entries.
+
+    Args:
+        folder (str): The checkpoint folder.
+    """
+
+    FILENAME = "catalog.json"
+
+    def __init__(self, folder: str) -> None:
+        self.folder = folder
+        self.path = os.path.join(folder, self.FILENAME)
+        self._lock = threading.Lock()
+        self._entries: dict[int, dict[str, Any]] | None = None
+
+    def _read(self) -> dict[int, dict[str, Any]] | None:
+        try:
+            with open(self.path) as f:
+                catalog = json.load(f)
+            return {int(e["step"]): e for e in catalog["checkpoints"]}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint catalog {self.path}: {e}")
+            return None
+
+    def _scan(self) -> dict[int, dict[str, Any]]:
+        if not os.path.isdir(self.folder):
+            return {}
+        return {
+            step: {
+                "step": step,
+                "dirname": dirname,
+                "complete": _is_complete_checkpoint(os.path.join(self.folder, dirname)),
+            }
+            for step, dirname in _step_dirnames(self.folder).items()
+        }
+
+    def reload(self, scan: bool = False) -> None:
+        """Drops the in-memory entries, so they are re-read from the catalog
+        file, or rebuilt by scanning the folder if ``scan`` is True."""
+        with self._lock:
+            self._entries = self._scan() if scan else None
+
+    def _get_entries(self) -> dict[int, dict[str, Any]]:
+        if self._entries is None:
+            entries = self._read()
+            self._entries = entries if entries is not None else self._scan()
+        return self._entries
+
+    def is_stale(self) -> bool:
+        """Whether the folder has step directories newer than every cataloged
+        step, or the latest complete checkpoint has been removed."""
+        if not os.path.isdir(self.folder):
+            return False
+        with self._lock:
+            entries = self._get_entries()
+            newest = max(_step_dirnames(self.folder), default=-1)
+            if newest > max(entries, default=-1):
+                return True
+            complete = [step for step, e in entries.items() if e["complete"]]
+            if not complete:
+                return False
+            dirname = entries[max(complete)]["dirname"]
+        return not os.path.isdir(os.path.join(self.folder, dirname))
+
+    @contextlib.contextmanager
+    def _update(self):
+        """Read-modify-write of the catalog file, yielding its entries."""
+        os.makedirs(self.folder, exist_ok=True)
+        with self._lock, open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._entries = None
+            yield self._get_entries()
+            self._write()
+
+    def _write(self) -> None:
+        entries = self._get_entries()
+        catalog = {"checkpoints": [entries[step] for step in sorted(entries)]}
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix=".catalog")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(catalog, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def steps(self) -> list[int]:
+        """All cataloged steps, complete or not, in increasing order."""
+        with self._lock:
+            return sorted(self._get_entries())
+
+    def dirname(self, step: int) -> str:
+        with self._lock:
+            return self._get_entries()[step]["dirname"]
+
+    def latest_complete_step(self) -> int:
+        """The latest complete step, or -1 if there is none."""
+        with self._lock:
+            complete = [
+                step for step, e in self._get_entries().items() if e["complete"]
+            ]
+        return max(complete, default=-1)
+
+    def add(self, step: int) -> None:
+        """Records that the checkpoint for ``step`` is being saved."""
+        with self._update() as entries:
+            entries[step] = {
+                "step": step,
+                "dirname": f"step-{step}",
+                "complete": False,
+                "start_time": time.time(),
+            }
+
+    def mark_complete(self, step: int, save_seconds: float) -> None:
+        """Records that the checkpoint for ``step`` is fully written."""
+        size = _checkpoint_size(os.path.join(self.folder, f"step-{step}"))
+        with self._update() as entries:
+            entry = entries.setdefault(step, {"step": step, "dirname": f"step-{step}"})
+            entry.update(
+                complete=True,
+                size_bytes=size,
+                save_seconds=round(save_seconds, 3),
+                end_time=time.time(),
+            )
+
+    def remove(self, steps: list[int]) -> None:
+        with self._update() as entries:
+            for step in steps:
+                entries.pop(step, None)
+
+
+def _tensor_nbytes(state_dict: dict[str, Any]) -> int:
+    """Bytes of the local tensors (or DTensor shards) in a flat state dict."""
+    nbytes = 0
+    for value in state_dict.values():
+        if isinstance(value, DTensor):
+            value = value.to_local()
+        if isinstance(value, torch.Tensor):
+            nbytes += value.numel() * value.element_size()
+    return nbytes
+
+
+def _rank_checkpoint_bytes(checkpoint_id: str, rank: int) -> int:
+    """Bytes of the DCP data files ``__{rank}_{i}.distcp`` written by ``rank``."""
+    nbytes = 0
+    for file_idx in range(1 << 16):
+        try:
+            nbytes += os.stat(
+                os.path.join(checkpoint_id, f"__{rank}_{file_idx}.distcp")
+            ).st_size
+        except (FileNotFoundError, NotADirectoryError):
+            break
+    return nbytes
+
+
+class _CountingFileSystemReader(FileSystemReader):
+    """FileSystemReader that counts the bytes this rank reads."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.bytes_read = 0
+
+    def read_data(self, plan, planner):
+        self.bytes_read += sum(
+            self.storage_data[item.storage_index].length for item in plan.items
+        )
+        return super().read_data(plan, planner)
+
+
+class CheckpointTelemetry:
+    """Timings and byte counts of one checkpoint save or load on this rank.
+
+    Phases are wall-clock seconds on this rank. For saves, ``write`` spans
+    from the start of serialization until the data is on storage, which for
+    async saves completes in the background; ``stage`` is the part that
+    blocks training in async modes and ``staging`` the time until the pinned
+    memory copy is done. For loads, ``read`` covers ``dcp.load``. The per-rank
+    bandwidth is computed from the bytes and the ``io_phase`` duration.
+
+    Args:
+        kind (str): "save" or "load".
+        step (int): The checkpoint step.
+        async_mode (str): The checkpoint async mode.
+        checkpoint_id (str): The checkpoint path.
+    """
+
+    def __init__(self, kind: str, step: int, async_mode: str, checkpoint_id: str):
+        self.kind = kind
+        self.step = step
+        self.async_mode = async_mode
+        self.checkpoint_id = checkpoint_id
+        self.io_phase = "write" if kind == "save" else "read"
+        self.phases: dict[str, float] = {}
+        self.num_bytes = 0
+        self._pending: list[threading.Event] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        begin = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.monotonic() - begin
+
+    def time_future(self, name: str, future: Future, begin: float) -> None:
+        """Records the seconds from ``begin`` until ``future`` completes."""
+        done = threading.Event()
+
+        def on_done(_: Future) -> None:
+            self.phases[name] = time.monotonic() - begin
+            done.set()
+
+        self._pending.append(done)
+        future.add_done_callback(on_done)
+
+    def wait(self) -> None:
+        """Waits until the phases timed by futures are recorded."""
+        for done in self._pending:
+            done.wait()
+
+    def summarize(self, process_group: dist.ProcessGroup | None = None) -> dict:
+        """Gathers the per-rank bytes and bandwidth into a cross-rank summary.
+
+        This is a collective over ``process_group`` when the default process
+        group is initialized.
+        """
+        seconds = self.phases.get(self.io_phase, 0.0)
+        record = {
+            "rank": dist.get_rank() if dist.is_initialized() else 0,
+            "bytes": self.num_bytes,
+            "seconds": round(seconds, 4),
+            "gbps": self.num_bytes / seconds / 1e9 if seconds > 0 else 0.0,
+        }
+        records = [record]
+        if dist.is_initialized():
+            records = [None] * dist.get_world_size(process_group)
+            dist.all_gather_object(records, record, group=process_group)
+
+        gbps = [r["gbps"] for r in records]
+        return {
+            "kind": self.kind,
+            "step": self.step,
+            "async_mode": self.async_mode,
+            "checkpoint_id": self.checkpoint_id,
+            "phases": {k: round(v, 4) for k, v in self.phases.items()},
+            "bytes_total": sum(r["bytes"] for r in records),
+            "gbps_min": min(gbps),
+            "gbps_median": statistics.median(gbps),
+            "gbps_max": max(gbps),
+            "slowest_rank": min(records, key=lambda r: r["gbps"])["rank"],
+            "ranks": records,
+        }
+
+
 class CheckpointManager(Configurable):
     """This class manages the checkpointing logic for the TorchTitan trainer.
 
@@ -344,6 +660,17 @@ class CheckpointManager(Configurable):
         without saving any during the training.
         """
 
+        enable_telemetry: bool = False
+        """
+        Record per-phase timings, bytes and per-rank bandwidth of checkpoint saves and
+        loads. A cross-rank min/median/max summary is logged through the metrics loggers
+        and written, with the per-rank numbers, to a JSON file per checkpoint in
+        {--dump_folder}/checkpoint_telemetry. Async saves are reported once their
+        upload has completed, at the next checkpoint, and logged at that training
+        step with the checkpoint step in checkpoint_metrics/save/step. Adds an
+        all_gather_object to every save and load.
+        """
+
     mp_queue_send: queue.Queue
     pg: dist.ProcessGroup
     purge_thread: threading.Thread | None
@@ -360,6 +687,7 @@ class CheckpointManager(Configurable):
         sd_adapter: BaseStateDictAdapter | None,
         base_folder: str = "",
         ft_manager: FTManager | None = None,
+        metrics_processor: MetricsProcessor | None = None,
     ) -> None:
         self.enable = config.enable
         self.load_only = config.load_only
@@ -430,6 +758,7 @@ class CheckpointManager(Configurable):
         self.stager = None
 
         self.folder = os.path.join(base_folder, config.folder)
+        self._catalogs: dict[str, CheckpointCatalog] = {}
 
         # Checkpoint policy related fields.
         self.initial_load_model_only = config.initial_load_model_only
@@ -447,6 +776,10 @@ class CheckpointManager(Configurable):
         self.exclude_from_loading = config.exclude_from_loading
         self.interval = config.interval
         self.enable_first_step_checkpoint = config.enable_first_step_checkpoint
+        self.enable_telemetry = config.enable_telemetry
+        self.telemetry_folder = os.path.join(base_folder, "checkpoint_telemetry")
+        self.metrics_processor = metrics_processor
+        self._pending_telemetry: CheckpointTelemetry | None = None
 
         # Async checkpoint related fields.
         async_mode = config.async_mode.lower()
@@ -493,6 +826,9 @@ class CheckpointManager(Configurable):
 
     def close(self):
         if hasattr(self, "enable") and self.enable:
+            # Wait for the final async save, and report its telemetry
+            if getattr(self, "_pending_telemetry", None) is not None:
+                self._async_wait()
             if hasattr(self, "mp") and self.mp and self.mp.is_alive():
                 self.mp_queue_send.put(Terminate())
                 self.mp.join()
@@ -603,13 +939,17 @@ class CheckpointManager(Configurable):
         checkpoint_id: str,
         from_hf: bool,
         from_quantized: bool,
-    ) -> None:
+    ) -> int:
         """Load the checkpoint with dcp.
         Args:
             state_dict (dict): The state dict to load.
             checkpoint_id (str): The checkpoint id to load.
             from_hf (bool): Whether to load from HuggingFace checkpoint with
                 its own model definition and safetensors format.
+
+        Returns:
+            int: The number of bytes this rank read. For HF checkpoints and
+            non-local paths this is the size of the loaded local tensors.
         """
 
         if from_hf:
@@ -628,13 +968,26 @@ class CheckpointManager(Configurable):
 
             state_dict = self.sd_adapter.from_hf(hf_state_dict)
             self.states[MODEL].load_state_dict(state_dict)
+            return _tensor_nbytes(hf_state_dict)
         else:
-            dcp.load(state_dict, checkpoint_id=checkpoint_id)
+            if "://" in checkpoint_id:
+                # Leave remote storage to dcp's own reader selection
+                dcp.load(state_dict, checkpoint_id=checkpoint_id)
+                bytes_read = _tensor_nbytes(state_dict)
+            else:
+                storage_reader = _CountingFileSystemReader(checkpoint_id)
+                dcp.load(
+                    state_dict,
+                    checkpoint_id=checkpoint_id,
+                    storage_reader=storage_reader,
+                )
+                bytes_read = storage_reader.bytes_read
 
             # TODO: Since we flatten the model states in state_dict, we need to
             # manually call load_state_dict() for the model. Need to fix this.
             if MODEL in self.states:
                 self.states[MODEL].load_state_dict(state_dict)
+            return bytes_read
 
     @torch.no_grad()
     def save(self, curr_step: int, last_step: bool = False) -> None:
@@ -659,6 +1012,11 @@ class CheckpointManager(Configurable):
         if not self._should_save(curr_step, last_step):
             return
 
+        # Make the metrics up to this checkpoint durable before saving it, so
+        # that they are not lost if the job fails and resumes from it
+        if self.metrics_processor is not None:
+            self.metrics_processor.flush()
+
         begin = time.monotonic()
         if not self.enable_ft_dataloader_checkpoints or (
             self.ft_manager
@@ -667,42 +1025,67 @@ class CheckpointManager(Configurable):
         ):
             logger.info("Saving the checkpoint (or staging if async is enabled).")
             checkpoint_id = self._create_checkpoint_id(curr_step)
-            self._async_wait()
+            self._async_wait(curr_step)
+            telemetry = CheckpointTelemetry(
+                "save", curr_step, self.async_mode.value, checkpoint_id
+            )
+            telemetry.phases["wait_previous"] = time.monotonic() - begin
             # This GC is called for async checkpoint as it is useless to do
             # GC right after async_save -- the CPU memory is not able to be
             # freed until _async_wait()
             if last_step:
-                self._save_last_step(curr_step)
+                self._save_last_step(curr_step, telemetry)
+                telemetry.phases["blocking"] = time.monotonic() - begin
+                self._finish_telemetry(telemetry)
                 return
 
             states = self._flattened_model_states_sd()
+            self._catalog_add(curr_step)
+            write_begin = time.monotonic()
             if self.async_mode == AsyncMode.ASYNC_WITH_PINNED_MEM:
-                GarbageCollection.collect("GC collection invoked by checkpointer.")
+                with telemetry.phase("gc"):
+                    GarbageCollection.collect("GC collection invoked by checkpointer.")
                 if self.stager is None:
                     self.stager = DefaultStager(StagingOptions(True, True, True, True))
-                result = self.dcp_save(
-                    states,
-                    checkpoint_id=checkpoint_id,
-                    async_mode=self.async_mode,
-                )
+                write_begin = time.monotonic()
+                with telemetry.phase("stage"):
+                    result = self.dcp_save(
+                        states,
+                        checkpoint_id=checkpoint_id,
+                        async_mode=self.async_mode,
+                    )
                 assert isinstance(result, AsyncSaveResponse)
                 self.save_future = result.upload_completion
                 self.staging_future = result.staging_completion
                 self.staging = True
+                telemetry.time_future("staging", result.staging_completion, write_begin)
             elif self.async_mode == AsyncMode.ASYNC:
-                GarbageCollection.collect("GC collection invoked by checkpointer.")
-                self.save_future = self.dcp_save(
-                    states, checkpoint_id=checkpoint_id, async_mode=self.async_mode
-                )
-                GarbageCollection.collect("GC collection invoked by checkpointer.")
+                with telemetry.phase("gc"):
+                    GarbageCollection.collect("GC collection invoked by checkpointer.")
+                write_begin = time.monotonic()
+                with telemetry.phase("stage"):
+                    self.save_future = self.dcp_save(
+                        states, checkpoint_id=checkpoint_id, async_mode=self.async_mode
+                    )
+                with telemetry.phase("gc"):
+                    GarbageCollection.collect("GC collection invoked by checkpointer.")
             else:
-                self.dcp_save(
-                    states,
-                    checkpoint_id=checkpoint_id,
-                    async_mode=AsyncMode.DISABLED,
-                    enable_garbage_collection=True,
-                )
+                with telemetry.phase("write"):
+                    self.dcp_save(
+                        states,
+                        checkpoint_id=checkpoint_id,
+                        async_mode=AsyncMode.DISABLED,
+                        enable_garbage_collection=True,
+                    )
+            self._catalog_complete(curr_step, begin, self.save_future)
             self._purge_stale_checkpoints()
+            telemetry.phases["blocking"] = time.monotonic() - begin
+            if self.save_future is None:
+                self._finish_telemetry(telemetry)
+            else:
+                # Reported by the next _async_wait, once the upload is done
+                telemetry.time_future("write", self.save_future, write_begin)
+                self._pending_telemetry = telemetry
 
             logger.info(
                 "Finished saving the checkpoint (or staging if async is enabled)"
@@ -740,6 +1123,7 @@ class CheckpointManager(Configurable):
         model_only = False
         from_hf = False
         from_quantized = False
+        find_seconds = None
         if not os.path.exists(self.folder):
             model_only = self.initial_load_model_only
             from_hf = self.initial_load_in_hf
@@ -792,7 +1176,9 @@ class CheckpointManager(Configurable):
                     "checkpoint.initial_load_in_hf is True but the checkpoint.folder exists. "
                     "Checkpointer will not load from HF safetensors"
                 )
+            find_begin = time.monotonic()
             step = self._find_load_step() if step == -1 else step
+            find_seconds = time.monotonic() - find_begin
             if step == -1:
                 return False
             model_only = step == 0
@@ -805,17 +1191,25 @@ class CheckpointManager(Configurable):
 
         logger.info(f"Loading the checkpoint from {checkpoint_id}.")
         begin = time.monotonic()
-        states = self._states_to_load(model_only)
-        self.dcp_load(
-            states,
-            checkpoint_id=checkpoint_id,
-            from_hf=from_hf,
-            from_quantized=from_quantized,
+        telemetry = CheckpointTelemetry(
+            "load", max(step, 0), self.async_mode.value, checkpoint_id
         )
-        GarbageCollection.collect("GC collection for checkpoint loading.")
+        if find_seconds is not None:
+            telemetry.phases["find_step"] = find_seconds
+        states = self._states_to_load(model_only)
+        with telemetry.phase("read"):
+            telemetry.num_bytes = self.dcp_load(
+                states,
+                checkpoint_id=checkpoint_id,
+                from_hf=from_hf,
+                from_quantized=from_quantized,
+            )
+        with telemetry.phase("gc"):
+            GarbageCollection.collect("GC collection for checkpoint loading.")
         logger.info(
             f"Finished loading the checkpoint in {time.monotonic() - begin:.2f} seconds."
         )
+        self._finish_telemetry(telemetry)
         return True
 
     def maybe_wait_for_staging(self) -> None:
@@ -832,6 +1226,10 @@ class CheckpointManager(Configurable):
     def _find_load_step(self, folder: str = "") -> int:
         """Find the step to load the checkpoint for.
 
+        The latest complete step is read from the folder's catalog. The folder
+        is only scanned when there is no catalog, its latest checkpoint has
+        been removed, or the folder holds newer step directories.
+
         Args:
             folder (str, optional): The folder to find the checkpoint for. If ``folder``
             is "", then ``self.folder`` will be used.
@@ -840,25 +1238,54 @@ class CheckpointManager(Configurable):
             int: The step to load the checkpoint for.
         """
         folder = folder if folder else self.folder
-        pattern = r"step-(\d+)"
-        step_counts = []
-
         if not os.path.isdir(folder):
             return -1
 
-        for filename in os.listdir(folder):
-            match = re.search(pattern, filename)
-            dcp_metadata_probe = os.path.join(folder, filename, ".metadata")
-            safetensors_metadata_probe = os.path.join(
-                folder, filename, "model.safetensors.index.json"
+        catalog = self._catalog(folder)
+        catalog.reload()
+        if catalog.is_stale():
+            logger.warning(
+                f"Checkpoint catalog {catalog.path} is stale, scanning {folder}."
             )
-            if match and os.path.isfile(dcp_metadata_probe):
-                step_counts.append(int(match.group(1)))
-            elif match and os.path.isfile(safetensors_metadata_probe):
-                step_counts.append(int(match.group(1)))
-        if not step_counts:
-            return -1
-        return max(step_counts)
+            catalog.reload(scan=True)
+        return catalog.latest_complete_step()
+
+    def _catalog(self, folder: str = "") -> CheckpointCatalog:
+        folder = folder if folder else self.folder
+        if folder not in self._catalogs:
+            self._catalogs[folder] = CheckpointCatalog(folder)
+        return self._catalogs[folder]
+
+    def _catalog_add(self, step: int, folder: str = "") -> None:
+        # Rank 0 of the saving replica owns the catalog
+        if dist.get_rank() == 0:
+            self._catalog(folder).add(step)
+
+    def _catalog_complete(
+        self,
+        step: int,
+        begin: float,
+        future: Future | None = None,
+        folder: str = "",
+    ) -> None:
+        """Marks ``step`` complete in the catalog once its save has finished.
+
+        For async saves this happens when ``future`` resolves, in the thread
+        that completes it, so the catalog never lists a checkpoint as complete
+        before it is fully written.
+        """
+        if dist.get_rank() != 0:
+            return
+        catalog = self._catalog(folder)
+        if future is None:
+            catalog.mark_complete(step, time.monotonic() - begin)
+            return
+
+        def on_done(f: Future) -> None:
+            if not f.cancelled() and f.exception() is None:
+                catalog.mark_complete(step, time.monotonic() - begin)
+
+        future.add_done_callback(on_done)
 
     def _ft_folder(self) -> str:
         return os.path.join(self.folder, f"ft-replicat-{self.ft_replica_id}")
@@ -869,11 +1296,13 @@ class CheckpointManager(Configurable):
 
     def _ft_save(self, step: int) -> None:
         begin = time.monotonic()
-        self._async_wait()
+        self._async_wait(step)
         checkpoint_id = self._create_checkpoint_id(step, folder=self._ft_folder())
+        self._catalog_add(step, folder=self._ft_folder())
         self.save_future = self.dcp_save(
             self.ft_states, checkpoint_id=checkpoint_id, async_mode=AsyncMode.ASYNC
         )
+        self._catalog_complete(step, begin, self.save_future, folder=self._ft_folder())
         logger.info(f"Staging ft checkpoint took {time.monotonic() - begin} secs.")
 
     def _ft_load(self) -> None:
@@ -940,7 +1369,9 @@ class CheckpointManager(Configurable):
 
         return states_to_load
 
-    def _save_last_step(self, curr_step: int) -> None:
+    def _save_last_step(
+        self, curr_step: int, telemetry: CheckpointTelemetry | None = None
+    ) -> None:
         # We only consider saving model only at the end of the training. So this
         # won't affect preemption and training resume. We also only allow dtype
         # conversion when we are checkpointing model only and the current dtype
@@ -964,13 +1395,20 @@ class CheckpointManager(Configurable):
                 self.last_save_model_only
             ), "Only model can be saved when saving in HF safetensors format."
 
-        self.dcp_save(
-            states,
-            checkpoint_id=self._create_checkpoint_id(curr_step),
-            async_mode=AsyncMode.DISABLED,
-            enable_garbage_collection=True,
-            to_hf=self.last_save_in_hf,
-        )
+        begin = time.monotonic()
+        self._catalog_add(curr_step)
+        with telemetry.phase("write") if telemetry else contextlib.nullcontext():
+            self.dcp_save(
+                states,
+                checkpoint_id=self._create_checkpoint_id(curr_step),
+                async_mode=AsyncMode.DISABLED,
+                enable_garbage_collection=True,
+                to_hf=self.last_save_in_hf,
+            )
+        self._catalog_complete(curr_step, begin)
+        if telemetry is not None and self.last_save_in_hf:
+            # HF shards are not named per rank, report the local tensor bytes
+            telemetry.num_bytes = _tensor_nbytes(states)
 
     def _should_save(self, curr_step: int, last_step: bool = False) -> bool:
         if not self.enable or self.load_only:
@@ -987,7 +1425,13 @@ class CheckpointManager(Configurable):
 
         return False
 
-    def _async_wait(self) -> None:
+    def _async_wait(self, curr_step: int | None = None) -> None:
+        """Waits for the previous async save, and reports its telemetry.
+
+        Args:
+            curr_step: Current training step, at which the telemetry of the
+                previous save is logged. Defaults to the step of that save.
+        """
         if self.async_mode == AsyncMode.ASYNC_WITH_PINNED_MEM:
             if self.save_future is not None:
                 self.save_future.result()
@@ -1003,6 +1447,73 @@ class CheckpointManager(Configurable):
                 "and fault tolerance is not active."
             )
 
+        if self._pending_telemetry is not None:
+            telemetry, self._pending_telemetry = self._pending_telemetry, None
+            self._finish_telemetry(telemetry, curr_step)
+
+    def _finish_telemetry(
+        self, telemetry: CheckpointTelemetry, curr_step: int | None = None
+    ) -> None:
+        """Summarizes a finished save or load across ranks and reports it.
+
+        Must be called on every rank that took part in the save or load.
+        Metrics are logged at ``curr_step``, defaulting to the checkpoint step:
+        loggers such as WandB reject steps older than ones already logged.
+        """
+        if not self.enable_telemetry:
+            return
+        telemetry.wait()
+        if telemetry.kind == "save" and telemetry.num_bytes == 0:
+            telemetry.num_bytes = _rank_checkpoint_bytes(
+                telemetry.checkpoint_id,
+                dist.get_rank() if dist.is_initialized() else 0,
+            )
+        summary = telemetry.summarize(getattr(self, "pg", None))
+
+        kind = telemetry.kind
+        logger.info(
+            f"Checkpoint {kind} at step {summary['step']}: "
+            f"{summary['bytes_total'] / 1e9:.2f} GB, per-rank GB/s "
+            f"min {summary['gbps_min']:.2f} (rank {summary['slowest_rank']}) "
+            f"median {summary['gbps_median']:.2f} max {summary['gbps_max']:.2f}, "
+            + ", ".join(f"{k}={v:.2f}s" for k, v in summary["phases"].items())
+        )
+
+        if self.metrics_processor is not None:
+            metrics = {
+                f"checkpoint_metrics/{kind}/{phase}(s)": seconds
+                for phase, seconds in summary["phases"].items()
+            }
+            metrics[f"checkpoint_metrics/{kind}/step"] = summary["step"]
+            metrics.update(
+                {
+                    f"checkpoint_metrics/{kind}/bytes(GB)": summary["bytes_total"]
+                    / 1e9,
+                    f"checkpoint_metrics/{kind}/rank_bandwidth_min(GB/s)": summary[
+                        "gbps_min"
+                    ],
+                    f"checkpoint_metrics/{kind}/rank_bandwidth_median(GB/s)": summary[
+                        "gbps_median"
+                    ],
+                    f"checkpoint_metrics/{kind}/rank_bandwidth_max(GB/s)": summary[
+                        "gbps_max"
+                    ],
+                }
+            )
+            self.metrics_processor.logger.log(
+                metrics, summary["step"] if curr_step is None else curr_step
+            )
+
+        if not dist.is_initialized() or dist.get_rank() == 0:
+            os.makedirs(self.telemetry_folder, exist_ok=True)
+            path = os.path.join(
+                self.telemetry_folder, f"{kind}-step-{summary['step']}.json"
+            )
+            fd, tmp_path = tempfile.mkstemp(dir=self.telemetry_folder)
+            with os.fdopen(fd, "w") as f:
+                json.dump(summary, f, indent=2)
+            os.replace(tmp_path, path)
+
     def _purge_stale_checkpoints(self):
         if (
             self.keep_latest_k > 0
@@ -1014,16 +1525,12 @@ class CheckpointManager(Configurable):
                 or (self.ft_manager and self.ft_manager.participating_rank() == 0)
             )
         ):
-            discovered_checkpoints = []
-            for filename in os.listdir(self.folder):
-                match = re.search(r"step-(\d+)", filename)
-                if match:
-                    path = os.path.join(self.folder, filename)
-                    discovered_checkpoints.append((int(match.group(1)), path))
-
-            discovered_checkpoints.sort()
-            to_delete = discovered_checkpoints[: -1 * self.keep_latest_k]
+            catalog = self._catalog()
+            to_delete = catalog.steps()[: -1 * self.keep_latest_k]
+            if not to_delete:
+                return
 
-            for _, path in to_delete:
+            for step in to_delete:
                 assert self.purge_thread is not None
-                self.purge_queue.put(path)
+                self.purge_queue.put(os.path.join(self.folder, catalog.dirname(step)))
+            catalog.remove(to_delete)
@@ -4,15 +4,20 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import bisect
+import contextlib
+import json
 import os
+import queue
+import socket
+import threading
 import time
-from collections import namedtuple
+from collections import deque, namedtuple
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable, Literal
 
 import torch
-from torch.utils.tensorboard import SummaryWriter
 from torchtitan.components.lr_scheduler import LRSchedulersContainer
 from torchtitan.components.optimizer import OptimizersContainer
 from torchtitan.config import Configurable
@@ -21,7 +26,6 @@ from torchtitan.tools import utils
 from torchtitan.tools.logging import logger
 from torchtitan.tools.utils import Color, device_module, device_type, NoColor
 
-
 # named tuple for passing device memory stats for logging
 DeviceMemStats = namedtuple(
     "DeviceMemStats",
@@ -102,12 +106,342 @@ def build_device_memory_monitor():
     return device_memory_monitor
 
 
+# Phases of a training step reported by StepTimeline, in execution order.
+# forward_backward is used instead of forward and backward under Pipeline
+# Parallel, where the schedule interleaves them.
+TIMELINE_PHASES = (
+    "data",
+    "comm",
+    "h2d",
+    "forward",
+    "backward",
+    "forward_backward",
+    "grad_clip",
+    "checkpoint_staging",
+    "optimizer",
+    "checkpoint",
+    "validation",
+)
+
+
+class _TimelinePhase:
+    __slots__ = ("timeline", "index", "start")
+
+    def __init__(self, timeline: "StepTimeline", index: int):
+        self.timeline = timeline
+        self.index = index
+
+    def __enter__(self) -> None:
+        self.start = self.timeline._mark()
+
+    def __exit__(self, *args) -> None:
+        self.timeline._add(self.index, self.start, self.timeline._mark())
+
+
+class StepTimeline:
+    """Time spent in each phase of the training steps between two log steps.
+
+    Phases are delimited by CUDA events recorded on the current stream, so
+    the training loop never waits for the device: completed phases are
+    resolved with non-blocking queries, and only :meth:`collect`, called at
+    log steps, synchronizes. The time of a phase is the stream time between
+    its events; for host-side phases such as data loading, this is the time
+    the device waited for the host. Without CUDA, host wall time is used.
+
+    The phases of a step are held until :meth:`step` closes it, after the
+    checkpoint and validation that follow it, so that :meth:`collect` at a
+    log step reports whole steps: that of the log step itself is reported
+    at the next one.
+
+    Args:
+        enable (bool): Whether to record phases, a no-op otherwise.
+        device (torch.device | None): Device whose current stream is timed.
+    """
+
+    def __init__(self, enable: bool = True, device: torch.device | None = None):
+        self.enable = enable
+        self.device = device
+        self.use_events = device is not None and device.type == "cuda"
+        self.num_steps = 0
+        self._index = {name: i for i, name in enumerate(TIMELINE_PHASES)}
+        self._totals = [0.0] * len(TIMELINE_PHASES)
+        # Phases of the open step, as (index, start, end)
+        self._step_phases: list[tuple[int, Any, Any]] = []
+        self._pending: deque = deque()
+
+    def phase(self, name: str) -> contextlib.AbstractContextManager:
+        """Context manager timing the enclosed block as (part of) phase ``name``."""
+        if not self.enable:
+            return contextlib.nullcontext()
+        return _TimelinePhase(self, self._index[name])
+
+    def _mark(self) -> Any:
+        if self.use_events:
+            event = torch.cuda.Event(enable_timing=True)
+            event.record()
+            return event
+        return time.perf_counter()
+
+    def _add(self, index: int, start: Any, end: Any) -> None:
+        self._step_phases.append((index, start, end))
+
+    def _resolve(self, block: bool) -> None:
+        # Events on one stream complete in order
+        while self._pending:
+            index, start, end = self._pending[0]
+            if block:
+                end.synchronize()
+            elif not end.query():
+                return
+            self._totals[index] += start.elapsed_time(end) / 1e3
+            self._pending.popleft()
+
+    def step(self) -> None:
+        """Mark the end of a training step, and of its checkpoint and validation."""
+        self.num_steps += 1
+        if not self.use_events:
+            for index, start, end in self._step_phases:
+                self._totals[index] += end - start
+        else:
+            self._pending.extend(self._step_phases)
+            self._resolve(block=False)
+        self._step_phases = []
+
+    def collect(self) -> list[float]:
+        """Mean seconds per step of each of ``TIMELINE_PHASES`` over the steps
+        closed since the last call.
+
+        Waits for the device to reach the end of the phases of those steps.
+        """
+        self._resolve(block=True)
+        num_steps = max(self.num_steps, 1)
+        means = [total / num_steps for total in self._totals]
+        self._totals = [0.0] * len(TIMELINE_PHASES)
+        self.num_steps = 0
+        return means
+
+
+# Phases of TIMELINE_PHASES that run no collectives under any parallelism. In
+# a collective, the fast ranks wait for the slowest one, so the time of
+# phases with collectives grows on the fast ranks as much as on the straggler.
+STRAGGLER_PHASES = ("data", "h2d", "checkpoint_staging", "optimizer")
+
+
+def straggler_phases(parallel_dims: ParallelDims) -> tuple[str, ...]:
+    """Phases of TIMELINE_PHASES that run no collectives under ``parallel_dims``.
+
+    FSDP, TP, CP and EP communicate in forward and backward, Pipeline
+    Parallel sends activations between stages, and DDP all-reduces gradients
+    in backward. A rank with a slow GPU then shows in the optimizer phase.
+    """
+    if (
+        parallel_dims.fsdp_enabled
+        or parallel_dims.tp_enabled
+        or parallel_dims.cp_enabled
+        or parallel_dims.ep_enabled
+        or parallel_dims.pp_enabled
+    ):
+        return STRAGGLER_PHASES
+    if parallel_dims.dp_replicate_enabled:
+        return (*STRAGGLER_PHASES, "forward")
+    return (*STRAGGLER_PHASES, "forward", "backward")
+
+
+@dataclass
+class StragglerReport:
+    """A rank whose step time stayed above the straggler threshold."""
+
+    step: int
+    rank: int
+    hostname: str
+    step_time: float
+    """Seconds per step the rank spent in the compared phases"""
+    reference_time: float
+    """Percentile of the step time across ranks"""
+    phase: str
+    """Phase with the largest excess over its percentile across ranks"""
+    phase_excess: float
+    """Seconds per step by which the rank's phase exceeds its percentile"""
+    num_intervals: int
+    """Number of consecutive log intervals the rank has been slow"""
+
+
+class StragglerDetector:
+    """Flags ranks that are persistently slower than the others.
+
+    At each log step, :meth:`update` receives the step timeline of all ranks,
+    already gathered by :class:`MetricsProcessor`, so detection adds no
+    communication. The step time of a rank is the time of its ``phases``,
+    which must not contain collectives: waiting for a straggler in a
+    collective inflates the phase on the fast ranks as well, so that the
+    straggler does not stand out. Under FSDP or TP, forward and backward are
+    therefore not compared, and a rank whose GPU is slow is detected from its
+    optimizer step, see :func:`straggler_phases`.
+
+    A rank is slow in a log interval when its step time exceeds ``threshold``
+    times the ``percentile`` of step times across ranks, and is reported once
+    it has been slow for ``patience`` consecutive intervals, then every
+    ``patience`` intervals while it stays slow.
+
+    Reports are logged with the rank's hostname, the phase responsible and a
+    histogram of the rank's ratio to the reference over the last ``window``
+    intervals, then passed to the callbacks registered with
+    :meth:`register_callback`. All ranks see the same reports.
+
+    Args:
+        percentile (float): Percentile of the step time across ranks that
+            ranks are compared to, in [0, 100].
+        threshold (float): Multiple of the reference step time above which a
+            rank is slow.
+        patience (int): Number of consecutive slow log intervals after which
+            a rank is reported.
+        window (int): Number of log intervals kept in the ratio histograms.
+        phases (tuple[str, ...]): Phases of TIMELINE_PHASES whose time is
+            compared, by default those without collectives on a single device.
+    """
+
+    # Upper edges of the histogram bins of step time ratios to the reference
+    HISTOGRAM_EDGES = (1.05, 1.1, 1.25, 1.5, 2.0)
+
+    def __init__(
+        self,
+        percentile: float = 50.0,
+        threshold: float = 1.2,
+        patience: int = 3,
+        window: int = 100,
+        phases: tuple[str, ...] = (*STRAGGLER_PHASES, "forward", "backward"),
+    ):
+        if not 0 <= percentile <= 100:
+            raise ValueError(f"percentile must be in [0, 100], got {percentile}")
+        if patience < 1 or window < 1:
+            raise ValueError(
+                f"patience and window must be positive, got {patience} and {window}"
+            )
+        self.percentile = percentile
+        self.threshold = threshold
+        self.patience = patience
+        self.hostnames: list[str] | None = None
+        self.phases = phases
+        self._phase_index = [TIMELINE_PHASES.index(p) for p in phases]
+        # [world_size] consecutive slow intervals of each rank
+        self._num_slow: torch.Tensor | None = None
+        # Step time ratios of all ranks to the reference, one per interval
+        self._ratios: deque[torch.Tensor] = deque(maxlen=window)
+        self._callbacks: list[Callable[[StragglerReport], None]] = []
+
+    def register_callback(self, callback: Callable[[StragglerReport], None]) -> None:
+        """Call ``callback`` with each straggler report, on every rank."""
+        self._callbacks.append(callback)
+
+    def histogram(self, rank: int) -> list[int]:
+        """Number of recent intervals per ratio bin of ``rank``, see HISTOGRAM_EDGES.
+
+        The last bin counts ratios of at least the last edge.
+        """
+        counts = [0] * (len(self.HISTOGRAM_EDGES) + 1)
+        for ratios in self._ratios:
+            counts[bisect.bisect_right(self.HISTOGRAM_EDGES, ratios[rank].item())] += 1
+        return counts
+
+    def _format_histogram(self, rank: int) -> str:
+        labels = [f"<{self.HISTOGRAM_EDGES[0]:g}"]
+        labels += [
+            f"{lo:g}-{hi:g}"
+            for lo, hi in zip(self.HISTOGRAM_EDGES, self.HISTOGRAM_EDGES[1:])
+        ]
+        labels.append(f">={self.HISTOGRAM_EDGES[-1]:g}")
+        return ", ".join(
+            f"{label}: {count}" for label, count in zip(labels, self.histogram(rank))
+        )
+
+    def update(self, step: int, rank_phase_times: torch.Tensor) -> dict[str, float]:
+        """Update the histograms with the phase times of the last log interval.
+
+        Must be called by all ranks, as the hostnames are gathered on the
+        first call.
+
+        Args:
+            step: Current training step.
+            rank_phase_times: [world_size, len(TIMELINE_PHASES)] mean seconds
+                per step of each phase on each rank.
+
+        Returns:
+            Metrics of the reference and maximum step time across ranks, and
+            of the slowest rank.
+        """
+        if self.hostnames is None:
+            self.hostnames = _gather_hostnames()
+
+        phase_times = rank_phase_times[:, self._phase_index].double()
+        step_times = phase_times.sum(dim=1)
+        q = self.percentile / 100
+        reference = torch.quantile(step_times, q).item()
+        if reference <= 0:
+            return {}
+        ratios = step_times / reference
+        self._ratios.append(ratios)
+
+        slow = ratios > self.threshold
+        if self._num_slow is None or self._num_slow.shape != slow.shape:
+            self._num_slow = torch.zeros_like(slow, dtype=torch.long)
+        self._num_slow = torch.where(slow, self._num_slow + 1, 0)
+
+        reference_phase_times = torch.quantile(phase_times, q, dim=0)
+        for rank in slow.nonzero().flatten().tolist():
+            num_intervals = self._num_slow[rank].item()
+            if num_intervals % self.patience:
+                continue
+            excess = phase_times[rank] - reference_phase_times
+            phase = int(excess.argmax())
+            report = StragglerReport(
+                step=step,
+                rank=rank,
+                hostname=self.hostnames[rank],
+                step_time=step_times[rank].item(),
+                reference_time=reference,
+                phase=self.phases[phase],
+                phase_excess=excess[phase].item(),
+                num_intervals=num_intervals,
+            )
+            logger.warning(
+                f"Straggler: rank {rank} on {report.hostname} took "
+                f"{report.step_time * 1e3:.1f}ms per step, "
+                f"{ratios[rank].item():.2f}x the p{self.percentile:g} of "
+                f"{reference * 1e3:.1f}ms, for {num_intervals} log intervals; "
+                f"{report.phase} is {report.phase_excess * 1e3:.1f}ms above its "
+                f"p{self.percentile:g}. Ratio histogram over the last "
+                f"{len(self._ratios)} intervals: {self._format_histogram(rank)}"
+            )
+            for callback in self._callbacks:
+                callback(report)
+
+        slowest = int(ratios.argmax())
+        return {
+            f"straggler/step_time_p{self.percentile:g}(s)": reference,
+            "straggler/step_time_max(s)": step_times[slowest].item(),
+            "straggler/slowest_rank": slowest,
+            "straggler/slowest_ratio": ratios[slowest].item(),
+            "straggler/num_stragglers": int((self._num_slow >= self.patience).sum()),
+        }
+
+
+def _gather_hostnames() -> list[str]:
+    if not torch.distributed.is_initialized():
+        return [socket.gethostname()]
+    hostnames: list[Any] = [None] * torch.distributed.get_world_size()
+    torch.distributed.all_gather_object(hostnames, socket.gethostname())
+    return hostnames
+
+
 class BaseLogger:
     """Logger that does nothing, used when logging is disabled."""
 
     def log(self, metrics: dict[str, Any], step: int) -> None:
         pass
 
+    def flush(self) -> None:
+        pass
+
     def close(self) -> None:
         pass
 
@@ -116,6 +450,9 @@ class TensorBoardLogger(BaseLogger):
     """Logger implementation for TensorBoard."""
 
     def __init__(self, log_dir: str, tag: str | None = None):
+        # Import tensorboard here to avoid startup import
+        from torch.utils.tensorboard import SummaryWriter
+
         self.tag = tag
         self.writer = SummaryWriter(log_dir, max_queue=1000)
         logger.info(f"TensorBoard logging enabled. Logs will be saved at {log_dir}")
@@ -125,6 +462,9 @@ class TensorBoardLogger(BaseLogger):
             tag = k if self.tag is None else f"{self.tag}/{k}"
             self.writer.add_scalar(tag, v, step)
 
+    def flush(self) -> None:
+        self.writer.flush()
+
     def close(self) -> None:
         self.writer.close()
 
@@ -175,6 +515,159 @@ class WandBLogger(BaseLogger):
             self.wandb.finish()
 
 
+class JSONLLogger(BaseLogger):
+    """Logger appending one JSON line of metrics per call to a local file."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.file = open(path, "a")
+        logger.info(f"JSONL metrics logging enabled. Metrics will be saved at {path}")
+
+    def log(self, metrics: dict[str, Any], step: int) -> None:
+        self.file.write(json.dumps({"step": step, **metrics}, default=float) + "\n")
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetLogger(BaseLogger):
+    """Logger writing metrics to local Parquet files.
+
+    Rows are buffered and written as a new ``<prefix>-<n>.parquet`` file every
+    ``rows_per_file`` rows and on flush.
+    """
+
+    def __init__(self, prefix: str, rows_per_file: int = 10000):
+        # Import pyarrow here to avoid startup import
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        os.makedirs(os.path.dirname(prefix), exist_ok=True)
+        self.prefix = prefix
+        self.rows_per_file = rows_per_file
+        self.rows: list[dict[str, Any]] = []
+        self.num_files = 0
+        logger.info(
+            f"Parquet metrics logging enabled. Metrics will be saved at {prefix}-*.parquet"
+        )
+
+    def log(self, metrics: dict[str, Any], step: int) -> None:
+        self.rows.append({"step": step, **metrics})
+        if len(self.rows) >= self.rows_per_file:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        table = self.pa.Table.from_pylist(self.rows)
+        self.pq.write_table(table, f"{self.prefix}-{self.num_files:05d}.parquet")
+        self.num_files += 1
+        self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+
+
+class AsyncLogger(BaseLogger):
+    """Logs through another logger from a background thread.
+
+    ``log`` only enqueues the metrics, so that the serialization and I/O of
+    the wrapped loggers (e.g. WandB, TensorBoard) stay off the training
+    thread. The queue holds at most ``queue_size`` entries. When it is full,
+    ``drop_policy`` decides whether the oldest queued entry or the new one
+    is dropped, or whether ``log`` blocks until there is room.
+    :meth:`flush` waits until all queued metrics are logged and flushed.
+
+    Args:
+        logger_instance (BaseLogger): Logger to log through.
+        queue_size (int): Maximum number of queued log calls.
+        drop_policy (str): "drop_oldest", "drop_newest" or "block".
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        logger_instance: BaseLogger,
+        queue_size: int = 1000,
+        drop_policy: Literal["drop_oldest", "drop_newest", "block"] = "drop_oldest",
+    ):
+        if drop_policy not in ("drop_oldest", "drop_newest", "block"):
+            raise ValueError(f"Unknown drop policy {drop_policy!r}")
+        self.logger = logger_instance
+        self.drop_policy = drop_policy
+        self.num_dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(
+            target=self._run, name="metrics_logger", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._STOP:
+                    return
+                if item is None:
+                    self.logger.flush()
+                else:
+                    self.logger.log(*item)
+            except Exception as e:
+                logger.warning(f"Metrics logger failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _put(self, item: Any) -> None:
+        if self.drop_policy == "block":
+            self._queue.put(item)
+            return
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                if self.drop_policy == "drop_newest":
+                    self._dropped()
+                    return
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._dropped()
+            except queue.Empty:
+                pass
+
+    def _dropped(self) -> None:
+        self.num_dropped += 1
+        if self.num_dropped == 1 or self.num_dropped % 100 == 0:
+            logger.warning(
+                f"Metrics logger queue is full, {self.num_dropped} log calls "
+                f"dropped so far ({self.drop_policy})"
+            )
+
+    def log(self, metrics: dict[str, Any], step: int) -> None:
+        # Copy, as callers may reuse or mutate the dict
+        self._put((dict(metrics), step))
+
+    def flush(self) -> None:
+        # None asks the background thread to flush the wrapped logger. Only
+        # the training thread enqueues, so it cannot be dropped meanwhile.
+        self._queue.put(None)
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self.flush()
+            self._queue.put(self._STOP)
+            self._thread.join()
+        self.logger.close()
+
+
 class LoggerContainer(BaseLogger):
     """Container to call all loggers enabled in the job config."""
 
@@ -188,6 +681,10 @@ class LoggerContainer(BaseLogger):
         for logger_instance in self._loggers:
             logger_instance.log(metrics, step)
 
+    def flush(self) -> None:
+        for logger_instance in self._loggers:
+            logger_instance.flush()
+
     @property
     def number_of_loggers(self) -> int:
         return len(self._loggers)
@@ -300,8 +797,75 @@ class MetricsProcessor(Configurable):
         enable_wandb: bool = False
         """Whether to log metrics to Weights & Biases"""
 
+        async_logging: bool = True
+        """
+        Whether to log metrics from a background thread, so that the I/O of
+        the loggers (e.g. WandB, TensorBoard) does not stall training steps.
+        """
+
+        async_queue_size: int = 1000
+        """Maximum number of log calls queued for the background thread"""
+
+        async_drop_policy: Literal["drop_oldest", "drop_newest", "block"] = (
+            "drop_oldest"
+        )
+        """
+        What to do when the background logging queue is full: drop the oldest
+        queued metrics, drop the new metrics, or block training until there
+        is room.
+        """
+
+        step_metrics_format: Literal["none", "jsonl", "parquet"] = "none"
+        """
+        Format of local files receiving per-step metrics of every rank (host
+        step time, data loading time, learning rate), logged every step
+        rather than every log_freq steps. Parquet requires pyarrow.
+        """
+
+        save_step_metrics_folder: str = "step_metrics"
+        """Folder to dump per-step metrics, one file (set) per rank"""
+
+        enable_step_timeline: bool = False
+        """
+        Whether to time the phases of each training step (data loading,
+        host-to-device copies, forward, backward, optimizer, communication,
+        checkpointing, ...) with CUDA events. Per-phase means over the log_freq
+        steps are logged along with the slowest rank of each phase, using one
+        small all-gather per log step.
+        """
+
+        enable_straggler_detection: bool = False
+        """
+        Whether to flag ranks whose step time stays above straggler_threshold
+        times the straggler_percentile step time across ranks, logging their
+        hostname and the phase responsible. Enables the step timeline, whose
+        all-gather provides the per-rank times. Callbacks can be registered on
+        MetricsProcessor.straggler_detector.
+
+        Only phases without collectives are compared, as fast ranks wait for
+        the straggler in collectives. Under FSDP, TP, CP, EP or PP this
+        excludes forward and backward, so a slow GPU is only detected from
+        its optimizer step, and slow network links are not attributed to a
+        rank.
+        """
+
+        straggler_percentile: float = 50.0
+        """Percentile of the step time across ranks that ranks are compared to"""
+
+        straggler_threshold: float = 1.2
+        """Multiple of the percentile step time above which a rank is slow"""
+
+        straggler_patience: int = 3
+        """Number of consecutive slow log intervals after which a rank is flagged"""
+
+        straggler_window: int = 100
+        """Number of log intervals kept in the per-rank step time histograms"""
+
     config: Config
     logger: BaseLogger
+    step_logger: BaseLogger | None
+    step_timeline: StepTimeline
+    straggler_detector: StragglerDetector | None
     parallel_dims: ParallelDims
     device_memory_monitor: DeviceMemoryMonitor
     color: utils.NoColor | utils.Color
@@ -310,6 +874,7 @@ class MetricsProcessor(Configurable):
     ntokens_since_last_log: int
     data_loading_times: list[float]
     time_last_log: float
+    time_last_step: float
 
     num_flops_per_token: int
     has_quantization: bool
@@ -340,9 +905,45 @@ class MetricsProcessor(Configurable):
             config_dict=config_dict,
             tag=tag,
         )
+        self.step_logger = self._build_step_logger(
+            config=config, dump_folder=dump_folder
+        )
+        if config.async_logging:
+            # No thread for ranks that do not log
+            if (
+                isinstance(self.logger, LoggerContainer)
+                and self.logger.number_of_loggers > 0
+            ):
+                self.logger = AsyncLogger(
+                    self.logger, config.async_queue_size, config.async_drop_policy
+                )
+            if self.step_logger is not None:
+                self.step_logger = AsyncLogger(
+                    self.step_logger,
+                    config.async_queue_size,
+                    config.async_drop_policy,
+                )
         self.parallel_dims = parallel_dims
         self.config = config
         self.device_memory_monitor = build_device_memory_monitor()
+        self.step_timeline = StepTimeline(
+            enable=config.enable_step_timeline or config.enable_straggler_detection,
+            device=torch.device(device_type, self.device_memory_monitor.device_index),
+        )
+        self.straggler_detector = (
+            StragglerDetector(
+                percentile=config.straggler_percentile,
+                threshold=config.straggler_threshold,
+                patience=config.straggler_patience,
+                window=config.straggler_window,
+                phases=straggler_phases(parallel_dims),
+            )
+            if config.enable_straggler_detection
+            else None
+        )
+        # [world_size, len(TIMELINE_PHASES)] phase times of all ranks over
+        # the last log interval, when the step timeline is enabled
+        self.rank_phase_times: torch.Tensor | None = None
         # used for colorful printing
         self.color = utils.NoColor() if config.disable_color_printing else utils.Color()
 
@@ -352,6 +953,9 @@ class MetricsProcessor(Configurable):
         self.ntokens_since_last_log = 0
         self.data_loading_times = []
         self.time_last_log = time.perf_counter()
+        self.time_last_step = self.time_last_log
+        # Number of data_loading_times entries already covered by log_step
+        self._num_step_data_loading_times = 0
         self.device_memory_monitor.reset_peak_stats()
 
         self.has_quantization = has_quantization
@@ -451,6 +1055,51 @@ class MetricsProcessor(Configurable):
             logger.debug("No loggers enabled, returning an empty LoggerContainer")
         return logger_container
 
+    def _build_step_logger(
+        self, *, config: Config, dump_folder: str
+    ) -> BaseLogger | None:
+        """Build the local per-step metrics logger of this rank, if enabled."""
+        if config.step_metrics_format == "none":
+            return None
+        rank = torch.distributed.get_rank() if torch.distributed.is_initialized() else 0
+        prefix = os.path.join(
+            dump_folder, config.save_step_metrics_folder, f"rank_{rank}"
+        )
+        if config.step_metrics_format == "jsonl":
+            return JSONLLogger(f"{prefix}.jsonl")
+        return ParquetLogger(prefix)
+
+    def log_step(self, step: int, extra_metrics: dict[str, Any] | None = None):
+        """
+        Log per-step metrics of this rank to the local step metrics files.
+
+        Only host-side timings are recorded, so this never synchronizes with
+        the device. Must be called every step, before :meth:`log`. The step
+        timeline is closed separately, by ``step_timeline.step()`` once the
+        checkpoint and validation of the step are done.
+
+        Args:
+            step: Current training step
+            extra_metrics: Optional additional metrics to log
+        """
+        now = time.perf_counter()
+        step_data_loading_times = self.data_loading_times[
+            self._num_step_data_loading_times :
+        ]
+        self._num_step_data_loading_times = len(self.data_loading_times)
+        time_step = now - self.time_last_step
+        self.time_last_step = now
+        if self.step_logger is None:
+            return
+
+        metrics = {
+            "time_metrics/step(s)": time_step,
+            "time_metrics/data_loading(s)": sum(step_data_loading_times),
+        }
+        if extra_metrics:
+            metrics.update(extra_metrics)
+        self.step_logger.log(metrics, step)
+
     def log(
         self,
         step: int,
@@ -516,6 +1165,13 @@ class MetricsProcessor(Configurable):
         if mfu is not None:
             metrics["mfu(%)"] = mfu
 
+        if self.step_timeline.enable:
+            metrics.update(self._timeline_metrics())
+            if self.straggler_detector is not None:
+                metrics.update(
+                    self.straggler_detector.update(step, self.rank_phase_times)
+                )
+
         if extra_metrics:
             metrics.update(extra_metrics)
 
@@ -536,9 +1192,50 @@ class MetricsProcessor(Configurable):
 
         self.ntokens_since_last_log = 0
         self.data_loading_times.clear()
+        self._num_step_data_loading_times = 0
         self.time_last_log = time.perf_counter()
         self.device_memory_monitor.reset_peak_stats()
 
+    def _timeline_metrics(self) -> dict[str, float]:
+        """Gather the step timeline of all ranks, and report this rank's phase
+        times with the slowest rank of each phase. Must be called by all ranks.
+        """
+        local_times = torch.tensor(
+            self.step_timeline.collect(),
+            dtype=torch.float64,
+            device=self.step_timeline.device,
+        )
+        if torch.distributed.is_initialized():
+            rank = torch.distributed.get_rank()
+            gathered = [
+                torch.empty_like(local_times)
+                for _ in range(torch.distributed.get_world_size())
+            ]
+            torch.distributed.all_gather(gathered, local_times)
+            rank_times = torch.stack(gathered).cpu()
+        else:
+            rank = 0
+            rank_times = local_times.cpu().unsqueeze(0)
+        self.rank_phase_times = rank_times
+
+        metrics = {}
+        summary = []
+        local = rank_times[rank]
+        maxima, slowest_ranks = rank_times.max(dim=0)
+        for i, name in enumerate(TIMELINE_PHASES):
+            # Skip phases that did not run on any rank, e.g. validation
+            if maxima[i] == 0:
+                continue
+            metrics[f"timeline/{name}(s)"] = local[i].item()
+            metrics[f"timeline/{name}_max(s)"] = maxima[i].item()
+            metrics[f"timeline/{name}_slowest_rank"] = slowest_ranks[i].item()
+            summary.append(
+                f"{name} {local[i].item() * 1e3:.1f}ms "
+                f"(max {maxima[i].item() * 1e3:.1f}ms rank {slowest_ranks[i].item()})"
+            )
+        logger.info("Step timeline per step: " + ", ".join(summary))
+        return metrics
+
     def log_validation(
         self, loss: float, step: int, extra_metrics: dict[str, Any] | None = None
     ):
@@ -578,5 +1275,13 @@ class MetricsProcessor(Configurable):
         self.time_last_log = time.perf_counter()
         self.device_memory_monitor.reset_peak_stats()
 
+    def flush(self):
+        """Wait until all metrics logged so far are written out by the loggers."""
+        self.logger.flush()
+        if self.step_logger is not None:
+            self.step_logger.flush()
+
     def close(self):
         self.logger.close()
+        if self.step_logger is not None:
+            self.step_logger.close()
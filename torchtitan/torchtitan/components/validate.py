@@ -4,14 +4,16 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 from contextlib import AbstractContextManager
 from dataclasses import dataclass, field, replace
 from typing import Any, cast, TypeAlias
 
 import torch
+import torch.distributed._functional_collectives as funcol
 import torch.nn as nn
 from torch.distributed.pipelining.schedules import _PipelineSchedule
+from torch.distributed.tensor import DTensor
 from torchtitan.components.dataloader import BaseDataLoader
 from torchtitan.components.loss import IGNORE_INDEX, LossFunction
 from torchtitan.components.metrics import MetricsProcessor
@@ -20,6 +22,7 @@ from torchtitan.config import Configurable, ParallelismConfig
 from torchtitan.distributed import ParallelDims, utils as dist_utils
 from torchtitan.distributed.context_parallel import prepare_context_parallel_input
 from torchtitan.hf_datasets.text_datasets import HuggingFaceTextDataLoader
+from torchtitan.models.common.attention import ATTENTION_METADATA_KEYS
 from torchtitan.protocols import BaseModel
 from torchtitan.tools import utils
 from torchtitan.tools.logging import logger
@@ -27,6 +30,18 @@ from torchtitan.tools.logging import logger
 ValidationContext: TypeAlias = Callable[[], AbstractContextManager[None]]
 
 
+def _local_loss_sum(loss_sum: torch.Tensor) -> torch.Tensor:
+    """Sum of ``loss_sum`` as a plain tensor.
+
+    With loss_parallel, the loss is a Replicate DTensor, which cannot be
+    added in place to a plain tensor.
+    """
+    loss_sum = loss_sum.detach()
+    if isinstance(loss_sum, DTensor):
+        loss_sum = loss_sum.full_tensor()
+    return loss_sum.sum()
+
+
 class BaseValidator(Configurable):
     @dataclass(kw_only=True, slots=True)
     class Config(Configurable.Config):
@@ -87,6 +102,28 @@ class Validator(BaseValidator):
         )
         """DataLoader configuration for validation"""
 
+        reduce_at_end: bool = False
+        """
+        Accumulate the loss sum and valid token count of each rank on device and
+        all-reduce them once after the last batch, instead of all-reducing the
+        token count of every batch. The logged loss is then the mean over all
+        validation tokens rather than the mean of per-batch means.
+        """
+
+        prefetch: bool = False
+        """
+        Copy the next validation batch to the device on a side CUDA stream while
+        the current batch runs. Ignored on non-CUDA devices.
+        """
+
+        cache_batches: bool = False
+        """
+        Keep the validation batches in (pinned) CPU memory after the first
+        validation run and replay them in later runs instead of loading and
+        tokenizing the validation set again. All batches of a run are held in
+        host memory, so this is meant for a bounded number of ``steps``.
+        """
+
         def __post_init__(self):
             assert (
                 self.steps > 0 or self.steps == -1
@@ -135,6 +172,17 @@ class Validator(BaseValidator):
         self.pp_schedule = pp_schedule
         self.pp_has_first_stage = pp_has_first_stage
         self.pp_has_last_stage = pp_has_last_stage
+        self._cached_batches: list[tuple[dict[str, Any], torch.Tensor]] | None = None
+
+        self._prefetch_stream = None
+        if config.prefetch:
+            if utils.device_type == "cuda":
+                self._prefetch_stream = torch.cuda.Stream()
+            else:
+                logger.warning(
+                    "Validation prefetch requires a CUDA device, "
+                    "batches will be moved to the device inline."
+                )
 
         if config.steps == -1:
             logger.warning(
@@ -142,6 +190,84 @@ class Validator(BaseValidator):
                 "unequal sample counts across ranks when dataset is exhausted."
             )
 
+    def _load_batches(self) -> Iterator[tuple[dict[str, Any], torch.Tensor]]:
+        """Yields the CPU batches of one validation run, from the cache if any."""
+        if self._cached_batches is not None:
+            yield from self._cached_batches
+            return
+
+        cache = [] if self.config.cache_batches else None
+        pin = utils.device_type == "cuda"
+        num_steps = 0
+        for input_dict, labels in self.validation_dataloader:
+            # pyrefly: ignore [missing-attribute, unsupported-operation]
+            if self.config.steps != -1 and num_steps >= self.config.steps:
+                break
+            if cache is not None:
+                if pin:
+                    input_dict = {
+                        k: v.pin_memory() if isinstance(v, torch.Tensor) else v
+                        for k, v in input_dict.items()
+                    }
+                    labels = labels.pin_memory()
+                cache.append((input_dict, labels))
+            yield input_dict, labels
+            num_steps += 1
+
+        if cache is not None:
+            self._cached_batches = cache
+
+    @staticmethod
+    def _to_device(
+        input_dict: dict[str, Any], labels: torch.Tensor
+    ) -> tuple[dict[str, Any], torch.Tensor]:
+        # Copy into a new dict, cached batches must stay on the CPU
+        device_type = utils.device_type
+        input_dict = {
+            k: (
+                v.to(device_type, non_blocking=True)
+                if isinstance(v, torch.Tensor)
+                else v
+            )
+            for k, v in input_dict.items()
+        }
+        return input_dict, labels.to(device_type, non_blocking=True)
+
+    def _device_batches(self) -> Iterator[tuple[dict[str, Any], torch.Tensor]]:
+        """Yields the validation batches on device.
+
+        With prefetching, the copy of the next batch is issued on
+        ``_prefetch_stream`` before the current batch is yielded, so it
+        overlaps the current forward pass.
+        """
+        stream = self._prefetch_stream
+        if stream is None:
+            for input_dict, labels in self._load_batches():
+                yield self._to_device(input_dict, labels)
+            return
+
+        def handoff(pending):
+            (input_dict, labels), copied = pending
+            main_stream = torch.cuda.current_stream()
+            main_stream.wait_event(copied)
+            # The main stream uses memory allocated on the side stream
+            for v in [labels, *input_dict.values()]:
+                if isinstance(v, torch.Tensor):
+                    v.record_stream(main_stream)
+            return input_dict, labels
+
+        pending = None
+        for input_dict, labels in self._load_batches():
+            with torch.cuda.stream(stream):
+                batch = self._to_device(input_dict, labels)
+                copied = torch.cuda.Event()
+                copied.record(stream)
+            if pending is not None:
+                yield handoff(pending)
+            pending = batch, copied
+        if pending is not None:
+            yield handoff(pending)
+
     def post_dataloading_process(
         self,
         input_dict: dict[str, torch.Tensor],
@@ -196,6 +322,10 @@ class Validator(BaseValidator):
         if attn_mask_type != "block_causal":
             extra_inputs.pop("positions", None)
 
+        mask_inputs = {
+            k: extra_inputs.pop(k) for k in ATTENTION_METADATA_KEYS if k in extra_inputs
+        }
+
         try:
             # pyrefly: ignore [not-callable]
             extra_kwargs["attention_masks"] = cast(
@@ -203,7 +333,7 @@ class Validator(BaseValidator):
             ).get_attention_masks(
                 input_batch=inputs,
                 tokenizer=self.tokenizer,
-                extra_inputs=extra_inputs,
+                extra_inputs={**extra_inputs, **mask_inputs},
             )
         except TypeError:
             pass
@@ -235,16 +365,13 @@ class Validator(BaseValidator):
         accumulated_losses = []
         device_type = utils.device_type
         num_steps = 0
+        reduce_at_end = self.config.reduce_at_end
+        # Loss sum and valid token count of this rank, for reduce_at_end.
+        # float32 as float64 is not supported on all devices, e.g. MPS.
+        local_totals = torch.zeros(2, dtype=torch.float32, device=device_type)
 
-        for input_dict, labels in self.validation_dataloader:
-            # pyrefly: ignore [missing-attribute, unsupported-operation]
-            if self.config.steps != -1 and num_steps >= self.config.steps:
-                break
-
+        for input_dict, labels in self._device_batches():
             self.metrics_processor.ntokens_since_last_log += labels.numel()
-            for k, v in input_dict.items():
-                input_dict[k] = v.to(device_type)
-            labels = labels.to(device_type)
 
             # Process data (extract inputs, handle attention masks, CP sharding)
             inputs, labels, extra_inputs, extra_kwargs = self.post_dataloading_process(
@@ -256,7 +383,9 @@ class Validator(BaseValidator):
             local_valid_tokens += (labels != IGNORE_INDEX).sum()
 
             # All-reduce token count across DP ranks to get global token count
-            if parallel_dims.dp_enabled:
+            if reduce_at_end:
+                local_totals[1] += local_valid_tokens
+            elif parallel_dims.dp_enabled:
                 batch_mesh = parallel_dims.get_mesh("batch")
                 global_valid_tokens = dist_utils.dist_sum(
                     local_valid_tokens, batch_mesh, None
@@ -305,18 +434,32 @@ class Validator(BaseValidator):
                         )
                         loss_sum = self.loss_fn(predictions, labels)
 
-            accumulated_losses.append(loss_sum.detach() / global_valid_tokens)
+            if reduce_at_end:
+                local_totals[0] += _local_loss_sum(loss_sum)
+            else:
+                accumulated_losses.append(loss_sum.detach() / global_valid_tokens)
             num_steps += 1
 
         # Compute average loss
-        loss = torch.sum(torch.stack(accumulated_losses))
-        loss /= num_steps
-        if parallel_dims.dp_cp_enabled:
-            global_avg_loss = dist_utils.dist_sum(
-                loss, parallel_dims.get_optional_mesh("loss")
-            )
+        if reduce_at_end:
+            # One all-reduce of (loss sum, valid tokens) for the whole run
+            if parallel_dims.dp_cp_enabled:
+                local_totals = funcol.all_reduce(
+                    local_totals,
+                    reduceOp="sum",
+                    group=parallel_dims.get_optional_mesh("loss"),
+                )
+            total_loss, total_tokens = local_totals.tolist()
+            global_avg_loss = total_loss / max(total_tokens, 1.0)
         else:
-            global_avg_loss = float(loss.item())
+            loss = torch.sum(torch.stack(accumulated_losses))
+            loss /= num_steps
+            if parallel_dims.dp_cp_enabled:
+                global_avg_loss = dist_utils.dist_sum(
+                    loss, parallel_dims.get_optional_mesh("loss")
+                )
+            else:
+                global_avg_loss = float(loss.item())
 
         self.metrics_processor.log_validation(loss=global_avg_loss, step=step)
 
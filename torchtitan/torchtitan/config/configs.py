@@ -68,6 +68,16 @@ class TrainingConfig:
     This feature only takes effect when data_parallel_shard_degree > 1
     """
 
+    prefetch_attention_masks: bool = False
+    """
+    Build the flex/varlen attention masks of all microbatches of a step on a side
+    CUDA stream at the start of the step, so that mask construction overlaps with
+    the gradient clipping and optimizer step of the previous step instead of
+    running in front of every forward. Works best together with the dataloader
+    precomputing document metadata (``precompute_document_ids`` /
+    ``precompute_varlen_metadata``), which avoids host syncs altogether.
+    """
+
     gc_freq: int = 50
     """Python garbage control scheduling interval, in steps"""
 
@@ -318,6 +318,7 @@ class FaultTolerantTrainer(Trainer):
             ),
             base_folder=config.dump_folder,
             ft_manager=self.ft_manager,
+            metrics_processor=self.metrics_processor,
         )
 
         loss_parallel_enabled = (
@@ -468,6 +469,7 @@ class FaultTolerantTrainer(Trainer):
         loss = torch.sum(torch.stack(accumulated_losses))
 
         # log metrics
+        self.metrics_processor.log_step(self.step, {"lr": lr})
         if not self.metrics_processor.should_log(self.step):
             return
 
@@ -577,6 +579,7 @@ class FaultTolerantTrainer(Trainer):
                     self.step
                 ):
                     self.validator.validate(self.model_parts, self.step)
+                self.metrics_processor.step_timeline.step()
 
                 # signal the profiler that the next profiling step has started
                 if torch_profiler:
@@ -43,7 +43,7 @@ from torchtitan.experiments.graph_trainer.jit_backend import (
     get_compile_backend_with_passes,
 )
 from torchtitan.experiments.graph_trainer.storage import (
-    DiskStorageAdapter,
+    build_storage_adapter,
     StorageAdapter,
 )
 from torchtitan.tools.logging import logger
@@ -57,15 +57,26 @@ _SERIALIZABLE_PASSES: frozenset[str] = frozenset(
 
 
 def _get_precompile_storage_and_key(
+    model: nn.Module,
     compile_config: GraphTrainerCompileConfig,
-) -> tuple[StorageAdapter, str]:
-    storage = DiskStorageAdapter(compile_config.precompile_artifact_dir)
+    parallel_dims: ParallelDims,
+) -> tuple[StorageAdapter, str, str]:
+    from .precompile import compute_config_fingerprint
+
+    storage = build_storage_adapter(
+        compile_config.precompile_artifact_dir,
+        node_cache_dir=compile_config.precompile_node_cache_dir,
+    )
+    config_fingerprint = compute_config_fingerprint(
+        model, compile_config, parallel_dims
+    )
     rank = torch.distributed.get_rank()
     # Per-rank artifact keys will go away once the Compile on one Rank
     # (CooR) project lands — at that point we will precompile once and
-    # reuse that artifact across all ranks.
-    artifact_key = f"default_rank{rank}"
-    return storage, artifact_key
+    # reuse that artifact across all ranks. Until then, the content-addressed
+    # store keeps a single copy of identical per-rank artifacts.
+    artifact_key = f"{config_fingerprint}_rank{rank}"
+    return storage, artifact_key, config_fingerprint
 
 
 def _apply_jit_compile(
@@ -91,19 +102,12 @@ def _apply_jit_compile(
 
 def _make_precompile_callback(
     model: nn.Module,
-    compile_config: GraphTrainerCompileConfig,
-    parallel_dims: ParallelDims,
-    storage: StorageAdapter | None = None,
-    artifact_key: str | None = None,
+    storage: StorageAdapter,
+    artifact_key: str,
+    config_fingerprint: str,
 ):
-    """Build the on_compile callback that saves the compiled artifact to disk."""
-    from .precompile import compute_config_fingerprint, precompile_save
-
-    if storage is None or artifact_key is None:
-        storage, artifact_key = _get_precompile_storage_and_key(compile_config)
-    config_fingerprint = compute_config_fingerprint(
-        model, compile_config, parallel_dims
-    )
+    """Build the on_compile callback that saves the compiled artifact to storage."""
+    from .precompile import precompile_save
 
     def on_compile(compiled_fn, out_spec):
         precompile_save(
@@ -112,10 +116,9 @@ def _make_precompile_callback(
             storage,
             artifact_key,
             out_spec=out_spec,
-            metadata={
-                "world_size": torch.distributed.get_world_size(),
-                "rank": torch.distributed.get_rank(),
-            },
+            # No rank here, it would make otherwise identical artifacts of
+            # different ranks differ; the rank is part of artifact_key.
+            metadata={"world_size": torch.distributed.get_world_size()},
             config_fingerprint=config_fingerprint,
         )
 
@@ -135,25 +138,23 @@ def _apply_aot_compile(
 
     # When precompile is enabled, compute storage/key once and reuse them
     # for both the load attempt and the save callback to avoid duplicate
-    # DiskStorageAdapter construction and fingerprint computation.
-    storage: StorageAdapter | None = None
-    artifact_key: str | None = None
+    # storage construction and fingerprint computation.
+    on_compile = None
     if compile_config.precompile:
-        storage, artifact_key = _get_precompile_storage_and_key(compile_config)
+        storage, artifact_key, config_fingerprint = _get_precompile_storage_and_key(
+            model, compile_config, parallel_dims
+        )
 
         if storage.exists(artifact_key):
-            from .precompile import compute_config_fingerprint
-
-            config_fingerprint = compute_config_fingerprint(
-                model, compile_config, parallel_dims
-            )
             try:
                 return _apply_aot_compile_load(
                     model, parallel_dims, storage, artifact_key, config_fingerprint
                 )
             except (ValueError, pickle.UnpicklingError, RuntimeError) as e:
                 # ValueError: fingerprint/param/buffer mismatches from our
-                # validation. pickle.UnpicklingError: corrupted or
+                # validation, and ArtifactIntegrityError when the stored
+                # artifact does not match its checksum.
+                # pickle.UnpicklingError: corrupted or
                 # incompatible serialized data. RuntimeError: intentionally
                 # broad to catch remaining deserialization failures (e.g.
                 # shape mismatches in torch.load) that surface as
@@ -165,6 +166,10 @@ def _apply_aot_compile(
                 )
                 storage.delete(artifact_key)
 
+        on_compile = _make_precompile_callback(
+            model, storage, artifact_key, config_fingerprint
+        )
+
     # Get joint custom passes from config
     joint_custom_passes = get_joint_custom_passes_from_config(
         parallel_dims, compile_config, fsdp_reshard_after_forward
@@ -183,17 +188,6 @@ def _apply_aot_compile(
     )
 
     serializable = compile_config.precompile
-    on_compile = (
-        _make_precompile_callback(
-            model,
-            compile_config,
-            parallel_dims,
-            storage=storage,
-            artifact_key=artifact_key,
-        )
-        if serializable
-        else None
-    )
 
     # Create custom joint_graph_builder with compilers
     model_joint_graph_builder = functools.partial(
@@ -49,7 +49,18 @@ class GraphTrainerCompileConfig(CompileConfig):
     Directory where precompile artifacts are stored. The default /tmp
     is ephemeral on most cluster environments. For multi-node setups
     or persistence across job restarts, set this to a shared filesystem
-    path (e.g. under the job output directory).
+    path (e.g. under the job output directory), or to an s3://bucket/prefix
+    URI of an S3-compatible object store (requires boto3). Artifacts are
+    keyed by the config fingerprint and rank, and identical artifacts of
+    different ranks are stored once.
+    """
+
+    precompile_node_cache_dir: str | None = None
+    """
+    Node-local directory caching precompile artifacts, e.g.
+    /dev/shm/precompile_artifacts. When set, one rank per node fetches or
+    uploads each artifact and the other ranks of the node read the local
+    copy, instead of every rank accessing precompile_artifact_dir.
     """
 
 
@@ -6,9 +6,30 @@
 
 from __future__ import annotations
 
+import fcntl
+import hashlib
+import json
 import tempfile
+import zlib
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Any
+
+from torchtitan.tools.logging import logger
+
+try:
+    import zstandard
+
+    _HAS_ZSTD = True
+except ImportError:
+    _HAS_ZSTD = False
+
+try:
+    import boto3
+
+    _HAS_BOTO3 = True
+except ImportError:
+    _HAS_BOTO3 = False
 
 
 class StorageAdapter(ABC):
@@ -45,6 +66,37 @@ class StorageAdapter(ABC):
         """Delete an artifact for the given key. No-op if it doesn't exist."""
         ...
 
+    def evict(self, key: str) -> None:
+        """Drop cached copies of the artifact for the given key.
+
+        The stored artifact itself is kept. No-op for adapters without a cache.
+        """
+
+    def save_if_absent(self, key: str, data: bytes) -> bool:
+        """Save data under the given key unless an artifact already exists.
+
+        Returns True if the data was written. Adapters that can coordinate
+        concurrent writers (e.g. several ranks on a node) override this.
+        """
+        if self.exists(key):
+            return False
+        self.save(key, data)
+        return True
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temp file then atomically rename to avoid
+    # leaving partial files if the process crashes mid-write.
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+        try:
+            f.write(data)
+            f.flush()
+            Path(f.name).replace(path)
+        except BaseException:
+            Path(f.name).unlink(missing_ok=True)
+            raise
+
 
 class DiskStorageAdapter(StorageAdapter):
     def __init__(self, base_dir: str | Path) -> None:
@@ -58,17 +110,7 @@ class DiskStorageAdapter(StorageAdapter):
 
     def save(self, key: str, data: bytes) -> str:
         path = self._path_for(key)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        # Write to a temp file then atomically rename to avoid
-        # leaving partial files if the process crashes mid-write.
-        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
-            try:
-                f.write(data)
-                f.flush()
-                Path(f.name).replace(path)
-            except BaseException:
-                Path(f.name).unlink(missing_ok=True)
-                raise
+        _atomic_write(path, data)
         return str(path)
 
     def load(self, key: str) -> bytes:
@@ -82,3 +124,330 @@ class DiskStorageAdapter(StorageAdapter):
 
     def delete(self, key: str) -> None:
         self._path_for(key).unlink(missing_ok=True)
+
+
+def _is_not_found(e: Exception) -> bool:
+    # botocore.exceptions.ClientError carries the S3 error code in e.response
+    code = getattr(e, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class S3StorageAdapter(StorageAdapter):
+    """Stores artifacts as objects of an S3-compatible object store.
+
+    Artifacts of key ``k`` are stored as ``<prefix>/<k>.bin`` in the bucket of
+    ``uri`` (``s3://<bucket>/<prefix>``). ``client`` is any object with the
+    ``put_object``, ``get_object``, ``head_object`` and ``delete_object``
+    methods of a boto3 S3 client, e.g. :class:`LocalS3Client`. By default a
+    boto3 client is created, configured from the usual AWS environment
+    variables (``AWS_ENDPOINT_URL`` selects a non-AWS endpoint).
+    """
+
+    def __init__(self, uri: str, client: Any | None = None) -> None:
+        if not uri.startswith("s3://"):
+            raise ValueError(f"Expected an s3://<bucket>/<prefix> URI, got {uri!r}")
+        self.bucket, _, prefix = uri[len("s3://") :].partition("/")
+        self.prefix = prefix.strip("/")
+        if client is None:
+            if not _HAS_BOTO3:
+                raise ImportError(
+                    "boto3 is required to store precompile artifacts in S3, "
+                    "install it with `pip install boto3`."
+                )
+            client = boto3.client("s3")
+        self.client = client
+
+    def _object_key(self, key: str) -> str:
+        if "/" in key:
+            raise ValueError(f"Key {key!r} must not contain '/'")
+        return f"{self.prefix}/{key}.bin" if self.prefix else f"{key}.bin"
+
+    def save(self, key: str, data: bytes) -> str:
+        object_key = self._object_key(key)
+        self.client.put_object(Bucket=self.bucket, Key=object_key, Body=data)
+        return f"s3://{self.bucket}/{object_key}"
+
+    def load(self, key: str) -> bytes:
+        object_key = self._object_key(key)
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=object_key)
+        except Exception as e:
+            if _is_not_found(e):
+                raise FileNotFoundError(
+                    f"Artifact not found for key {key!r} at "
+                    f"s3://{self.bucket}/{object_key}"
+                ) from e
+            raise
+        return response["Body"].read()
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str) -> None:
+        # S3 deletes are idempotent
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+
+class _LocalS3Error(Exception):
+    def __init__(self, code: str, message: str) -> None:
+        super().__init__(message)
+        self.response = {"Error": {"Code": code, "Message": message}}
+
+
+class _LocalS3Body:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    def read(self) -> bytes:
+        return self._data
+
+
+class LocalS3Client:
+    """Local stand-in for a boto3 S3 client, storing objects under a directory.
+
+    Implements the subset of the client used by :class:`S3StorageAdapter`,
+    including botocore-style errors for missing objects, so that the S3 path
+    can be exercised in tests and single-machine runs without an object store.
+    """
+
+    def __init__(self, root_dir: str | Path) -> None:
+        self.root_dir = Path(root_dir).resolve()
+
+    def _path_for(self, bucket: str, key: str) -> Path:
+        path = (self.root_dir / bucket / key).resolve()
+        if not path.is_relative_to(self.root_dir):
+            raise ValueError(f"Object {bucket}/{key} resolves outside root directory")
+        return path
+
+    def put_object(self, *, Bucket: str, Key: str, Body: bytes) -> dict:
+        _atomic_write(self._path_for(Bucket, Key), Body)
+        return {}
+
+    def get_object(self, *, Bucket: str, Key: str) -> dict:
+        path = self._path_for(Bucket, Key)
+        if not path.exists():
+            raise _LocalS3Error("NoSuchKey", f"No such key: {Bucket}/{Key}")
+        return {"Body": _LocalS3Body(path.read_bytes())}
+
+    def head_object(self, *, Bucket: str, Key: str) -> dict:
+        path = self._path_for(Bucket, Key)
+        if not path.exists():
+            raise _LocalS3Error("404", f"Not Found: {Bucket}/{Key}")
+        return {"ContentLength": path.stat().st_size}
+
+    def delete_object(self, *, Bucket: str, Key: str) -> dict:
+        self._path_for(Bucket, Key).unlink(missing_ok=True)
+        return {}
+
+
+class NodeLocalCacheStorageAdapter(StorageAdapter):
+    """Caches a (remote) storage adapter in a node-local directory.
+
+    Loads are served from ``cache_dir``, e.g. under ``/dev/shm``, and only
+    fall through to ``remote`` on a miss. Misses and writes of a key are
+    serialized across the processes of a node with a file lock, so when all
+    ranks of a node need the same artifact, one of them fetches or uploads
+    it and the others read the local copy.
+    """
+
+    def __init__(self, remote: StorageAdapter, cache_dir: str | Path) -> None:
+        self.remote = remote
+        self.local = DiskStorageAdapter(cache_dir)
+        self.local.base_dir.mkdir(parents=True, exist_ok=True)
+
+    def _lock(self, key: str):
+        return _FileLock(self.local.base_dir / f"{key}.lock")
+
+    def save(self, key: str, data: bytes) -> str:
+        with self._lock(key):
+            path = self.remote.save(key, data)
+            self.local.save(key, data)
+        return path
+
+    def save_if_absent(self, key: str, data: bytes) -> bool:
+        with self._lock(key):
+            if self.local.exists(key):
+                return False
+            written = self.remote.save_if_absent(key, data)
+            self.local.save(key, data)
+        return written
+
+    def load(self, key: str) -> bytes:
+        if self.local.exists(key):
+            return self.local.load(key)
+        with self._lock(key):
+            # Another process of the node may have fetched it meanwhile
+            if self.local.exists(key):
+                return self.local.load(key)
+            data = self.remote.load(key)
+            self.local.save(key, data)
+        return data
+
+    def exists(self, key: str) -> bool:
+        return self.local.exists(key) or self.remote.exists(key)
+
+    def delete(self, key: str) -> None:
+        with self._lock(key):
+            self.local.delete(key)
+            self.remote.delete(key)
+
+    def evict(self, key: str) -> None:
+        with self._lock(key):
+            self.local.delete(key)
+
+
+class _FileLock:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def __enter__(self) -> "_FileLock":
+        self._file = open(self.path, "a")
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args) -> None:
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+class ArtifactIntegrityError(ValueError):
+    """A stored artifact does not match its recorded checksum."""
+
+
+_DECOMPRESS_ERRORS: tuple[type[Exception], ...] = (
+    (zlib.error, zstandard.ZstdError) if _HAS_ZSTD else (zlib.error,)
+)
+
+
+def _compress(data: bytes) -> tuple[str, bytes]:
+    if _HAS_ZSTD:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(data)
+    return "zlib", zlib.compress(data, level=1)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if not _HAS_ZSTD:
+            raise ImportError(
+                "Artifact is zstd-compressed, install zstandard to load it "
+                "with `pip install zstandard`."
+            )
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "none":
+        return data
+    raise ValueError(f"Unknown artifact compression {codec!r}")
+
+
+class ContentAddressedStorageAdapter(StorageAdapter):
+    """Stores artifacts deduplicated, compressed and checksummed.
+
+    The data of an artifact is compressed (zstd if ``zstandard`` is
+    installed, zlib otherwise) and stored once in ``backend`` under
+    ``blob-<sha256 of the data>``, however many keys refer to it. The key
+    itself holds a small JSON manifest naming the blob, so identical
+    artifacts saved under different keys (e.g. by different ranks) share
+    one blob. Loads verify the SHA-256 of the decompressed data and raise
+    :class:`ArtifactIntegrityError` on a mismatch or a missing blob.
+
+    Blobs are shared across ranks and nodes, so they are never deleted: a
+    corrupt blob is only evicted from the backend's cache, and saving an
+    artifact whose blob exists but is corrupt uploads it again. Deleting a
+    key deletes its manifest only.
+    """
+
+    def __init__(self, backend: StorageAdapter) -> None:
+        self.backend = backend
+
+    def save(self, key: str, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        blob_key = f"blob-{digest}"
+        codec, compressed = _compress(data)
+        if (
+            self.backend.exists(blob_key)
+            and self._read_blob(blob_key, codec, digest) is None
+        ):
+            logger.warning(f"Replacing corrupt artifact blob {blob_key}")
+            self.backend.save(blob_key, compressed)
+            written = True
+        else:
+            written = self.backend.save_if_absent(blob_key, compressed)
+        manifest = {
+            "blob": blob_key,
+            "sha256": digest,
+            "codec": codec,
+            "size": len(data),
+            "compressed_size": len(compressed),
+        }
+        path = self.backend.save(key, json.dumps(manifest).encode())
+        logger.info(
+            f"Artifact {key} stored as {blob_key[:21]} "
+            f"({'uploaded' if written else 'deduplicated'}, "
+            f"{len(data)} -> {len(compressed)} bytes {codec})"
+        )
+        return path
+
+    def _load_manifest(self, key: str) -> dict[str, Any]:
+        try:
+            manifest = json.loads(self.backend.load(key))
+            if not isinstance(manifest, dict) or "blob" not in manifest:
+                raise ValueError("missing blob")
+        except (UnicodeDecodeError, ValueError) as e:
+            raise ArtifactIntegrityError(
+                f"Artifact {key!r} is not a valid manifest: {e}"
+            ) from e
+        return manifest
+
+    def _read_blob(self, blob_key: str, codec: str, digest: str) -> bytes | None:
+        """Returns the data of a blob, or None if it is corrupt or missing."""
+        try:
+            data = _decompress(codec, self.backend.load(blob_key))
+        except (FileNotFoundError, *_DECOMPRESS_ERRORS):
+            return None
+        return data if hashlib.sha256(data).hexdigest() == digest else None
+
+    def load(self, key: str) -> bytes:
+        manifest = self._load_manifest(key)
+        blob_key = manifest["blob"]
+        data = self._read_blob(blob_key, manifest["codec"], manifest["sha256"])
+        if data is None:
+            # A corrupt cached copy is fetched again by the next load. The
+            # stored blob is kept as other keys refer to it, and is replaced
+            # by the next save of the artifact if it is corrupt.
+            self.backend.evict(blob_key)
+            raise ArtifactIntegrityError(
+                f"Artifact {key!r} failed its integrity check: blob {blob_key} "
+                "is missing or does not match its SHA-256"
+            )
+        return data
+
+    def exists(self, key: str) -> bool:
+        return self.backend.exists(key)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+
+def build_storage_adapter(
+    uri: str, node_cache_dir: str | None = None
+) -> StorageAdapter:
+    """Build the content-addressed artifact store for a directory or s3:// URI.
+
+    With ``node_cache_dir``, artifacts are cached in that node-local
+    directory and each node fetches or uploads every blob once.
+    """
+    storage: StorageAdapter
+    if uri.startswith("s3://"):
+        storage = S3StorageAdapter(uri)
+    else:
+        storage = DiskStorageAdapter(uri)
+    if node_cache_dir:
+        storage = NodeLocalCacheStorageAdapter(storage, node_cache_dir)
+    return ContentAddressedStorageAdapter(storage)
@@ -7,13 +7,22 @@
 import os
 import pickle
 import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from unittest.mock import MagicMock, patch
 
 import torch
 
-from torchtitan.experiments.graph_trainer.storage import DiskStorageAdapter
+from torchtitan.experiments.graph_trainer.storage import (
+    ArtifactIntegrityError,
+    ContentAddressedStorageAdapter,
+    DiskStorageAdapter,
+    LocalS3Client,
+    NodeLocalCacheStorageAdapter,
+    S3StorageAdapter,
+)
 
 
 class TestDiskStorageAdapter(unittest.TestCase):
@@ -76,6 +85,183 @@ class TestDiskStorageAdapter(unittest.TestCase):
                 storage.save("../../escape", b"data")
 
 
+class TestS3StorageAdapter(unittest.TestCase):
+    def test_save_load_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = S3StorageAdapter(
+                "s3://bucket/runs/llama", client=LocalS3Client(tmpdir)
+            )
+            self.assertFalse(storage.exists("key"))
+            path = storage.save("key", b"data")
+            self.assertEqual(path, "s3://bucket/runs/llama/key.bin")
+            self.assertTrue(storage.exists("key"))
+            self.assertEqual(storage.load("key"), b"data")
+            storage.delete("key")
+            storage.delete("key")
+            self.assertFalse(storage.exists("key"))
+
+    def test_load_nonexistent_raises(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = S3StorageAdapter("s3://bucket", client=LocalS3Client(tmpdir))
+            with self.assertRaises(FileNotFoundError):
+                storage.load("nonexistent")
+
+    def test_invalid_key_or_uri_rejected(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(ValueError):
+                S3StorageAdapter(tmpdir, client=LocalS3Client(tmpdir))
+            storage = S3StorageAdapter("s3://bucket", client=LocalS3Client(tmpdir))
+            with self.assertRaises(ValueError):
+                storage.save("../escape", b"data")
+
+
+class _CountingStorageAdapter(DiskStorageAdapter):
+    """Disk storage counting loads and saves, standing in for a remote store."""
+
+    def __init__(self, base_dir):
+        super().__init__(base_dir)
+        self.loads = 0
+        self.saves = 0
+        self._lock = threading.Lock()
+
+    def save(self, key, data):
+        with self._lock:
+            self.saves += 1
+        return super().save(key, data)
+
+    def load(self, key):
+        with self._lock:
+            self.loads += 1
+        return super().load(key)
+
+
+class TestContentAddressedStorageAdapter(unittest.TestCase):
+    def test_identical_artifacts_stored_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = DiskStorageAdapter(tmpdir)
+            storage = ContentAddressedStorageAdapter(backend)
+            data = b"compiled" * 1000
+            for rank in range(4):
+                storage.save(f"fp_rank{rank}", data)
+            storage.save("fp_rank4", b"other")
+
+            blobs = [f for f in os.listdir(tmpdir) if f.startswith("blob-")]
+            self.assertEqual(len(blobs), 2)
+            # Blobs are compressed
+            sizes = sorted(os.path.getsize(os.path.join(tmpdir, f)) for f in blobs)
+            self.assertLess(sizes[-1], len(data))
+            self.assertEqual(storage.load("fp_rank2"), data)
+            self.assertEqual(storage.load("fp_rank4"), b"other")
+
+            # Deleting a key keeps the blob shared with other keys
+            storage.delete("fp_rank0")
+            self.assertFalse(storage.exists("fp_rank0"))
+            self.assertEqual(storage.load("fp_rank1"), data)
+
+    def test_corrupt_blob_raises_and_is_replaced(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = DiskStorageAdapter(tmpdir)
+            storage = ContentAddressedStorageAdapter(backend)
+            storage.save("key", b"compiled" * 1000)
+            (blob,) = [f for f in os.listdir(tmpdir) if f.startswith("blob-")]
+            backend.save(blob.removesuffix(".bin"), b"garbage")
+
+            with self.assertRaises(ArtifactIntegrityError):
+                storage.load("key")
+            # The shared blob is kept, and saving again re-uploads it instead
+            # of deduplicating against it
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, blob)))
+            storage.save("other_key", b"compiled" * 1000)
+            self.assertEqual(storage.load("key"), b"compiled" * 1000)
+
+    def test_missing_blob_raises_integrity_error(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = DiskStorageAdapter(tmpdir)
+            storage = ContentAddressedStorageAdapter(backend)
+            storage.save("key", b"compiled")
+            (blob,) = [f for f in os.listdir(tmpdir) if f.startswith("blob-")]
+            backend.delete(blob.removesuffix(".bin"))
+
+            with self.assertRaises(ArtifactIntegrityError):
+                storage.load("key")
+
+    def test_legacy_artifact_raises_integrity_error(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = DiskStorageAdapter(tmpdir)
+            backend.save("key", pickle.dumps({"legacy": True}))
+            storage = ContentAddressedStorageAdapter(backend)
+            with self.assertRaises(ArtifactIntegrityError):
+                storage.load("key")
+
+
+class TestNodeLocalCacheStorageAdapter(unittest.TestCase):
+    def test_one_fetch_per_node(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            remote = _CountingStorageAdapter(os.path.join(tmpdir, "remote"))
+            remote.save("key", b"data")
+            cache_dir = os.path.join(tmpdir, "shm")
+
+            # One adapter per rank of the node, all loading at once
+            ranks = [NodeLocalCacheStorageAdapter(remote, cache_dir) for _ in range(8)]
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                loaded = list(pool.map(lambda s: s.load("key"), ranks))
+            self.assertEqual(loaded, [b"data"] * 8)
+            self.assertEqual(remote.loads, 1)
+
+    def test_one_upload_per_node(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            remote = _CountingStorageAdapter(os.path.join(tmpdir, "remote"))
+            cache_dir = os.path.join(tmpdir, "shm")
+            ranks = [
+                ContentAddressedStorageAdapter(
+                    NodeLocalCacheStorageAdapter(remote, cache_dir)
+                )
+                for _ in range(8)
+            ]
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(
+                    pool.map(
+                        lambda r: r[1].save(f"fp_rank{r[0]}", b"x" * 100),
+                        enumerate(ranks),
+                    )
+                )
+            # One blob upload, plus one manifest per rank
+            self.assertEqual(remote.saves, 1 + 8)
+
+            # Another node reads the artifacts through its own cache
+            other = ContentAddressedStorageAdapter(
+                NodeLocalCacheStorageAdapter(remote, os.path.join(tmpdir, "shm2"))
+            )
+            self.assertEqual(other.load("fp_rank3"), b"x" * 100)
+
+    def test_corrupt_local_copy_is_evicted(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            remote = DiskStorageAdapter(os.path.join(tmpdir, "remote"))
+            cache = NodeLocalCacheStorageAdapter(remote, os.path.join(tmpdir, "shm"))
+            storage = ContentAddressedStorageAdapter(cache)
+            storage.save("key", b"compiled" * 1000)
+            (blob,) = [f for f in os.listdir(remote.base_dir) if f.startswith("blob-")]
+            blob = blob.removesuffix(".bin")
+            cache.local.save(blob, b"garbage")
+
+            with self.assertRaises(ArtifactIntegrityError):
+                storage.load("key")
+            # Only the node-local copy is dropped, the next load fetches the
+            # remote blob again
+            self.assertFalse(cache.local.exists(blob))
+            self.assertTrue(remote.exists(blob))
+            self.assertEqual(storage.load("key"), b"compiled" * 1000)
+
+    def test_delete_removes_local_and_remote(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            remote = DiskStorageAdapter(os.path.join(tmpdir, "remote"))
+            storage = NodeLocalCacheStorageAdapter(remote, os.path.join(tmpdir, "shm"))
+            storage.save("key", b"data")
+            storage.delete("key")
+            self.assertFalse(storage.exists("key"))
+            self.assertFalse(remote.exists("key"))
+
+
 class TestPrecompiledArtifact(unittest.TestCase):
     def test_artifact_pickle_roundtrip(self):
         from torchtitan.experiments.graph_trainer.precompile import PrecompiledArtifact
@@ -14,11 +14,17 @@ import torchstore as ts
 from monarch.actor import Actor, endpoint
 from torchtitan.config import Configurable
 from torchtitan.config.configs import ParallelismConfig
+from torchtitan.experiments.rl.actors.utils import extract_sampled_log_probs
 from torchtitan.experiments.rl.plugin import (
     register_model_to_vllm_model_registry,
     VLLM_MODEL_NAME,
 )
 from torchtitan.experiments.rl.types import Episode
+from torchtitan.experiments.rl.weight_sync import (
+    TorchStoreWeightStore,
+    WeightReceiver,
+    WeightSyncConfig,
+)
 from torchtitan.protocols.model_spec import ModelSpec
 from torchtitan.tools.utils import has_cuda_capability
 from vllm import EngineArgs, LLMEngine, SamplingParams
@@ -42,9 +48,9 @@ class GeneratorCompileConfig:
     NOTE: inductor will offer the best performance, but will impact numerics - use eager for
     bitwise identical results."""
 
-    cudagraph_mode: Literal[
-        "none", "piecewise", "full", "full_and_piecewise"
-    ] = "piecewise"
+    cudagraph_mode: Literal["none", "piecewise", "full", "full_and_piecewise"] = (
+        "piecewise"
+    )
     """CUDA graph capture mode for vLLM.
     Piecewise capture supports dynamic sizes and splits cudagraphs around non capturable
       ops like attention
@@ -162,9 +168,12 @@ class VLLMGenerator(Actor, Configurable):
         model_spec: ModelSpec,
         model_path: str,
         batch_invariant_mode: bool,
+        weight_sync: WeightSyncConfig | None = None,
     ):
         self.config = config
         self.model_spec = model_spec
+        self.weight_sync = weight_sync or WeightSyncConfig()
+        self._weight_receiver: WeightReceiver | None = None
 
         # Register TorchTitan model with vLLM before any engine creation
         register_model_to_vllm_model_registry(model_spec)
@@ -215,6 +224,10 @@ class VLLMGenerator(Actor, Configurable):
         logger.info("vLLM rollout engine initialized")
 
         self.policy_version = 0
+        # Keeps group ids unique across generate calls with the same policy
+        self._num_generate_calls = 0
+        # vLLM request id -> (prompt index, group id, expected answer)
+        self._pending_groups: dict[str, tuple[int, str, str]] = {}
 
         logger.info("Generator initialized with vLLM engine")
 
@@ -224,6 +237,73 @@ class VLLMGenerator(Actor, Configurable):
         """
         return self._engine.model_executor.driver_worker.get_model()
 
+    def _add_requests(
+        self, prompt_texts: list[str], expected_answers: list[str]
+    ) -> None:
+        """Add one vLLM request per prompt, each sampling a whole group."""
+        if self._engine.has_unfinished_requests():
+            raise RuntimeError(
+                "Cannot start a new generation while the previous one is unfinished"
+            )
+        sampling_params = SamplingParams(
+            temperature=self.temperature,
+            top_p=self.top_p,
+            max_tokens=self.max_new_tokens,
+            n=self.num_samples_per_prompt,
+            seed=self.config.seed,
+            # Only the sampled token's log prob, returned as flat lists
+            logprobs=0,
+            flat_logprobs=True,
+            output_kind=RequestOutputKind.FINAL_ONLY,  # Only return completed outputs
+        )
+
+        # Assign a group_id per prompt.
+        # TODO: Assigning group_id here is GRPO-specific and should be
+        # decoupled from the generator in the future.
+        call_idx = self._num_generate_calls
+        self._num_generate_calls += 1
+        for idx, prompt in enumerate(prompt_texts):
+            request_id = f"{call_idx}_{idx}"
+            self._pending_groups[request_id] = (
+                idx,
+                f"{os.getpid()}_{self.policy_version}_{request_id}",
+                expected_answers[idx] if expected_answers else "",
+            )
+            self._engine.add_request(request_id, prompt, sampling_params)
+
+    def _step_until_groups_finish(self) -> list[tuple[int, list[Episode]]]:
+        """Step the engine until at least one group finishes.
+
+        Returns:
+            ``(prompt index, episodes)`` of every group that finished, or an
+            empty list once no requests are left.
+        """
+        finished = []
+        while not finished and self._engine.has_unfinished_requests():
+            for output in self._engine.step():
+                # With n > 1, vLLM returns a request once all its samples are done
+                if output.finished:
+                    finished.append(self._build_group(output))
+        return finished
+
+    def _build_group(self, output) -> tuple[int, list[Episode]]:
+        idx, gid, expected_answer = self._pending_groups.pop(output.request_id)
+        episodes = [
+            Episode(
+                policy_version=self.policy_version,
+                prompt_token_ids=output.prompt_token_ids,
+                text=sample.text,
+                token_ids=sample.token_ids,
+                token_log_probs=extract_sampled_log_probs(
+                    sample.token_ids, sample.logprobs
+                ),
+                expected_answer=expected_answer,
+                group_id=gid,
+            )
+            for sample in output.outputs
+        ]
+        return idx, episodes
+
     @endpoint
     async def generate(
         self,
@@ -247,63 +327,62 @@ class VLLMGenerator(Actor, Configurable):
         )
 
         with torch.no_grad():
-            # Generate samples using vLLM
-            sampling_params = SamplingParams(
-                temperature=self.temperature,
-                top_p=self.top_p,
-                max_tokens=self.max_new_tokens,
-                n=self.num_samples_per_prompt,
-                seed=self.config.seed,
-                logprobs=1,
-                prompt_logprobs=1,  # Also get prompt log probs to access prompt token IDs
-                output_kind=RequestOutputKind.FINAL_ONLY,  # Only return completed outputs
-            )
+            self._add_requests(prompt_texts, expected_answers)
+            groups = []
+            while finished := self._step_until_groups_finish():
+                groups.extend(finished)
 
-            for request_id, prompt in enumerate(prompt_texts):
-                self._engine.add_request(str(request_id), prompt, sampling_params)
-
-            # Step through engine until all requests are finished
-            all_outputs = []
-            while self._engine.has_unfinished_requests():
-                request_outputs = self._engine.step()
-                all_outputs.extend(request_outputs)
-
-            # Sort outputs by request_id to guarantee prompt ordering,
-            # since vLLM may return completed requests out of order.
-            all_outputs.sort(key=lambda o: int(o.request_id))
-
-            # Build flat list of Episodes; assign a group_id per prompt.
-            # TODO: Assigning group_id here is GRPO-specific and should be
-            # decoupled from the generator in the future.
-            episodes: list[Episode] = []
-            for idx, output in enumerate(all_outputs):
-                prompt_token_ids = output.prompt_token_ids
-                gid = f"{os.getpid()}_{self.policy_version}_{idx}"
-
-                for sample in output.outputs:
-                    per_token_log_probs = [
-                        list(logprob_dict.values())[0].logprob
-                        for logprob_dict in sample.logprobs
-                    ]
-                    episodes.append(
-                        Episode(
-                            policy_version=self.policy_version,
-                            prompt_token_ids=prompt_token_ids,
-                            text=sample.text,
-                            token_ids=sample.token_ids,
-                            token_log_probs=per_token_log_probs,
-                            expected_answer=expected_answers[idx]
-                            if expected_answers
-                            else "",
-                            group_id=gid,
-                        )
-                    )
+        # Sort groups by prompt index to guarantee prompt ordering,
+        # since vLLM may return completed requests out of order.
+        groups.sort(key=lambda group: group[0])
+        episodes = [ep for _, group in groups for ep in group]
 
         logger.debug(
             f"{os.getpid()=} Generating finish generate (policy v{self.policy_version})..."
         )
         return episodes
 
+    @endpoint
+    async def start_generate(
+        self,
+        prompt_texts: list[str],
+        expected_answers: list[str],
+    ) -> None:
+        """Start generating completions to be streamed by group.
+
+        Call :meth:`next_finished_groups` until it returns an empty list to
+        collect the Episodes. Arguments are as for :meth:`generate`.
+        """
+        self._add_requests(prompt_texts, expected_answers)
+
+    @endpoint
+    async def next_finished_groups(self) -> list[tuple[int, list[Episode]]]:
+        """Return the groups that finished next.
+
+        Steps the engine until all samples of at least one prompt are done,
+        so the caller can grade and compute advantages for those groups
+        while the slower ones are still being generated. Groups come in
+        completion order rather than prompt order.
+
+        Returns:
+            ``(prompt index, episodes)`` of one or more complete groups, or an
+            empty list once everything started by :meth:`start_generate` has
+            been returned.
+        """
+        with torch.no_grad():
+            return self._step_until_groups_finish()
+
+    @endpoint
+    async def abort(self) -> None:
+        """Abort the requests of a generation that will not be collected.
+
+        Called when the caller stops pulling :meth:`next_finished_groups`
+        before the end, so that the next generation can start.
+        """
+        if self._pending_groups:
+            self._engine.abort_request(list(self._pending_groups))
+            self._pending_groups.clear()
+
     @endpoint
     async def pull_model_state_dict(self, version: int) -> None:
         """Pull latest weights from TorchStore.
@@ -320,6 +399,21 @@ class VLLMGenerator(Actor, Configurable):
         """
         from monarch.rdma import is_rdma_available
 
+        if self.weight_sync.layerwise:
+            # Layers are swapped in as soon as the trainer has published them
+            if self._weight_receiver is None:
+                self._weight_receiver = WeightReceiver(
+                    self._get_model().model.state_dict(),
+                    TorchStoreWeightStore(direct_rdma=is_rdma_available()),
+                    linear_transfer_dtype=self.weight_sync.linear_transfer_dtype,
+                )
+            await self._weight_receiver.pull(version)
+            self.policy_version = version
+            logger.debug(
+                f"{os.getpid()=} Generator pulled model state dict for policy v{version}"
+            )
+            return
+
         model_sd = self._get_model().model.state_dict()
         await ts.get_state_dict(
             "model_state_dict",
@@ -0,0 +1,149 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import torch
+import torch.distributed as dist
+from torch.distributed.tensor import DTensor
+
+
+class _Bucket:
+    def __init__(self, params: list[torch.nn.Parameter], device, dtype):
+        self.params = params
+        self.numels = [_local(p).numel() for p in params]
+        self.buffer = torch.empty(sum(self.numels), device=device, dtype=dtype)
+        self.ready: set[int] = set()
+        self.work: dist.Work | None = None
+
+
+def _local(tensor: torch.Tensor) -> torch.Tensor:
+    return tensor.to_local() if isinstance(tensor, DTensor) else tensor
+
+
+class BucketedGradReducer:
+    """
+    Averages gradients across data parallel ranks in flattened buckets.
+
+    Parameters are grouped, in reverse registration order (roughly the order
+    in which backward produces their gradients), into buckets of about
+    ``bucket_size_mb``. A post-accumulate-grad hook marks each parameter as
+    ready, and as soon as a bucket is complete its gradients are copied into
+    one flat buffer and all-reduced asynchronously, so communication overlaps
+    the rest of backward. Buckets are launched in a fixed order on every rank,
+    as DDP does, to keep collectives matched.
+
+    For DTensor parameters (e.g. with tensor parallelism) the local shards are
+    reduced, which is what averaging over the data parallel group requires.
+
+    Call :meth:`finish` after backward and before reading the gradients.
+
+    Args:
+        params: Parameters whose gradients are reduced.
+        process_group: Data parallel process group, or None for the default group.
+        bucket_size_mb: Target bucket size in MiB.
+    """
+
+    def __init__(
+        self,
+        params: list[torch.nn.Parameter],
+        process_group: dist.ProcessGroup | None = None,
+        bucket_size_mb: float = 25.0,
+    ):
+        self.process_group = process_group
+        bucket_cap = int(bucket_size_mb * 1024 * 1024)
+
+        self.buckets: list[_Bucket] = []
+        params = [p for p in params if p.requires_grad]
+        current: list[torch.nn.Parameter] = []
+        current_bytes = 0
+        for p in reversed(params):
+            local = _local(p)
+            if current and (
+                current_bytes + local.numel() * local.element_size() > bucket_cap
+                or local.dtype != _local(current[0]).dtype
+                or local.device != _local(current[0]).device
+            ):
+                self._add_bucket(current)
+                current, current_bytes = [], 0
+            current.append(p)
+            current_bytes += local.numel() * local.element_size()
+        if current:
+            self._add_bucket(current)
+
+        self._param_to_bucket: dict[torch.nn.Parameter, tuple[int, int]] = {}
+        for bucket_idx, bucket in enumerate(self.buckets):
+            for param_idx, p in enumerate(bucket.params):
+                self._param_to_bucket[p] = (bucket_idx, param_idx)
+        self._next_bucket = 0
+        self._handles = [
+            p.register_post_accumulate_grad_hook(self._on_grad_ready) for p in params
+        ]
+
+    def _add_bucket(self, params: list[torch.nn.Parameter]) -> None:
+        local = _local(params[0])
+        self.buckets.append(_Bucket(params, local.device, local.dtype))
+
+    @staticmethod
+    def _is_complete(bucket: _Bucket) -> bool:
+        return len(bucket.ready) == len(bucket.params)
+
+    def _on_grad_ready(self, param: torch.nn.Parameter) -> None:
+        bucket_idx, param_idx = self._param_to_bucket[param]
+        self.buckets[bucket_idx].ready.add(param_idx)
+        # Launch in bucket order so every rank issues the same collectives
+        while self._next_bucket < len(self.buckets) and self._is_complete(
+            self.buckets[self._next_bucket]
+        ):
+            self._launch(self.buckets[self._next_bucket])
+            self._next_bucket += 1
+
+    @torch.no_grad()
+    def _launch(self, bucket: _Bucket) -> None:
+        offset = 0
+        for p, numel in zip(bucket.params, bucket.numels):
+            chunk = bucket.buffer[offset : offset + numel]
+            if p.grad is None:
+                # Parameters unused on this rank contribute zeros
+                chunk.zero_()
+            else:
+                chunk.copy_(_local(p.grad).reshape(-1))
+            offset += numel
+        bucket.work = dist.all_reduce(
+            bucket.buffer,
+            op=dist.ReduceOp.AVG,
+            group=self.process_group,
+            async_op=True,
+        )
+
+    @torch.no_grad()
+    def finish(self) -> None:
+        """Waits for all reductions and writes the averaged gradients back.
+
+        Buckets that did not complete during backward, because some of their
+        parameters received no gradient, are reduced here. Parameters without
+        a gradient on this rank get the averaged gradient as well.
+        """
+        for bucket in self.buckets[self._next_bucket :]:
+            self._launch(bucket)
+        for bucket in self.buckets:
+            assert bucket.work is not None
+            bucket.work.wait()
+            offset = 0
+            for p, numel in zip(bucket.params, bucket.numels):
+                if p.grad is None:
+                    # Other ranks may have used the parameter: give it the
+                    # averaged gradient too, so that replicas stay in sync
+                    p.grad = torch.zeros_like(p)
+                grad = _local(p.grad)
+                grad.copy_(bucket.buffer[offset : offset + numel].view_as(grad))
+                offset += numel
+            bucket.ready.clear()
+            bucket.work = None
+        self._next_bucket = 0
+
+    def remove_hooks(self) -> None:
+        for handle in self._handles:
+            handle.remove()
+        self._handles.clear()
@@ -5,7 +5,11 @@
 # LICENSE file in the root directory of this source tree.
 
 import logging
+import math
+import multiprocessing
+from collections import defaultdict
 from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
 
 import torch
 from monarch.actor import Actor, endpoint
@@ -14,33 +18,109 @@ from torchtitan.experiments.rl.types import Episode
 logger = logging.getLogger(__name__)
 
 
+def compute_rewards(
+    reward_fn: Callable,
+    completions: list[str],
+    expected_answers: list[str],
+    executor: Executor | None = None,
+    max_chunk_size: int | None = None,
+) -> torch.Tensor:
+    """
+    Compute the rewards of a batch of completions with batched reward_fn calls.
+
+    Completions are grouped by expected answer, so reward_fn is called once
+    per distinct answer with all of its completions instead of once per
+    completion. Groups are split into chunks of at most ``max_chunk_size``
+    completions, and with an ``executor`` the chunks are scored in parallel.
+
+    Args:
+        reward_fn: Reward function that takes (completions: list[str], expected_answer: str)
+                   and returns a tensor of rewards.
+        completions: Completion texts.
+        expected_answers: Expected answer of each completion.
+        executor: Optional executor (e.g. a process pool) to score chunks on.
+        max_chunk_size: Maximum number of completions per reward_fn call.
+
+    Returns:
+        Float32 tensor of rewards, one per completion.
+    """
+    groups: dict[str, list[int]] = defaultdict(list)
+    for idx, answer in enumerate(expected_answers):
+        groups[answer].append(idx)
+
+    chunks: list[tuple[str, list[int]]] = []
+    for answer, indices in groups.items():
+        step = max_chunk_size or len(indices)
+        for start in range(0, len(indices), step):
+            chunks.append((answer, indices[start : start + step]))
+
+    calls = [([completions[i] for i in indices], answer) for answer, indices in chunks]
+    if executor is None:
+        chunk_rewards = [reward_fn(texts, answer) for texts, answer in calls]
+    else:
+        futures = [executor.submit(reward_fn, texts, answer) for texts, answer in calls]
+        chunk_rewards = [future.result() for future in futures]
+
+    rewards = torch.empty(len(completions), dtype=torch.float32)
+    for (_, indices), values in zip(chunks, chunk_rewards):
+        rewards[indices] = torch.as_tensor(values, dtype=torch.float32)
+    return rewards
+
+
 class Grader(Actor):
     """
     Evaluates completions and assigns rewards to episodes.
 
     The Grader receives a flat list of Episodes and computes rewards
-    using a reward function. It scores each episode independently.
+    using a reward function, batching all episodes that share an
+    expected answer into one call.
 
     Args:
         reward_fn: Reward function that takes (completions: list[str], expected_answer: str)
                    and returns a tensor of rewards.
+        num_workers: Number of worker processes to score with, for CPU-heavy
+            reward functions (e.g. regex matching or code execution). 0 scores
+            in the actor process. reward_fn must be picklable when > 0.
     """
 
     def __init__(
         self,
         reward_fn: Callable,
+        num_workers: int = 0,
     ):
         self.reward_fn = reward_fn
-
-        logger.info("Grader initialized")
+        self.num_workers = num_workers
+        self._executor: ProcessPoolExecutor | None = None
+        if num_workers > 0:
+            # spawn: forking a process that runs the actor runtime is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        logger.info(f"Grader initialized (num_workers={num_workers})")
+
+    def compute_rewards(self, episodes: list[Episode]) -> torch.Tensor:
+        """Return the rewards of ``episodes`` as one float32 tensor."""
+        max_chunk_size = None
+        if self._executor is not None:
+            # Spread single-answer batches across all workers
+            max_chunk_size = max(1, math.ceil(len(episodes) / self.num_workers))
+        return compute_rewards(
+            self.reward_fn,
+            [ep.text for ep in episodes],
+            [ep.expected_answer for ep in episodes],
+            executor=self._executor,
+            max_chunk_size=max_chunk_size,
+        )
 
     @endpoint
     async def score(self, episodes: list[Episode]) -> list[Episode]:
         """
         Score episodes by computing rewards.
 
-        Calls the reward_fn with each episode's completion text and
-        expected answer, then sets the reward on each episode.
+        Calls the reward_fn once per distinct expected answer with all the
+        matching completions, then sets the reward on each episode.
 
         Args:
             episodes: Flat list of Episodes to score.
@@ -50,12 +130,10 @@ class Grader(Actor):
         """
         logger.debug(f"Grader scoring {len(episodes)} episodes...")
 
-        # Score each episode individually
-        for ep in episodes:
-            rewards = self.reward_fn([ep.text], ep.expected_answer)
-            ep.reward = rewards[0].item()
+        all_rewards = self.compute_rewards(episodes)
+        for ep, reward in zip(episodes, all_rewards.tolist()):
+            ep.reward = reward
 
-        all_rewards = torch.tensor([ep.reward for ep in episodes])
         logger.debug(
             f"Grader finished scoring: "
             f"reward_mean={all_rewards.mean().item():.4f}, "
@@ -63,3 +141,8 @@ class Grader(Actor):
         )
 
         return episodes
+
+    def __del__(self):
+        """Shut down the scoring worker processes."""
+        if getattr(self, "_executor", None) is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -23,12 +23,19 @@ from torchtitan.components.optimizer import OptimizersContainer
 from torchtitan.config import CommConfig, Configurable, TORCH_DTYPE_MAP
 from torchtitan.config.configs import CompileConfig, ParallelismConfig, TrainingConfig
 from torchtitan.distributed import ParallelDims, utils as dist_utils
+from torchtitan.experiments.rl.actors.grad_reducer import BucketedGradReducer
 from torchtitan.experiments.rl.actors.utils import (
+    compute_batch_token_log_probs,
     compute_policy_gradient_loss,
     compute_token_log_probs,
     verify_logprob_identity,
 )
 from torchtitan.experiments.rl.types import Episode
+from torchtitan.experiments.rl.weight_sync import (
+    TorchStoreWeightStore,
+    WeightSender,
+    WeightSyncConfig,
+)
 from torchtitan.protocols.model_spec import ModelSpec
 from torchtitan.tools import utils
 
@@ -62,6 +69,25 @@ class PolicyTrainer(Actor, Configurable):
         comm: CommConfig = field(default_factory=CommConfig)
         """Communication configuration for distributed initialization."""
         compile: CompileConfig = field(default_factory=CompileConfig)
+        pack_sequences: bool = True
+        """
+        Compute the log probs of all episodes on a rank with one packed varlen
+        forward per model instead of one forward per episode.
+        """
+        logprob_chunk_size: int | None = None
+        """
+        Number of tokens per chunk when extracting log probs from the logits.
+        Bounds the float32 memory to ``chunk_size x vocab`` instead of
+        ``num_tokens x vocab``, at the cost of matching the generator's
+        log probs to float32 tolerance rather than bitwise. None disables
+        chunking.
+        """
+        grad_bucket_size_mb: float = 25.0
+        """
+        Size of the flattened gradient buckets that are all-reduced across data
+        parallel ranks while backward is still running. Set to 0 to all-reduce
+        every parameter gradient separately after backward.
+        """
 
     def __init__(
         self,
@@ -71,9 +97,12 @@ class PolicyTrainer(Actor, Configurable):
         batch_invariant_mode: bool,
         hf_assets_path: str = "",
         transfer_dtype: str = "",
+        weight_sync: WeightSyncConfig | None = None,
     ):
         self.config = config
         self.model_spec = model_spec
+        self.weight_sync = weight_sync or WeightSyncConfig()
+        self._weight_sender: WeightSender | None = None
         # Only cast if transfer dtype differs from training dtype, otherwise
         # staging buffers would be allocated for a no-op cast.
         training_dtype = TORCH_DTYPE_MAP[config.training.dtype]
@@ -141,6 +170,16 @@ class PolicyTrainer(Actor, Configurable):
         self.dp_rank = dist.get_rank() // self.parallel_dims.non_data_parallel_size
         self.dp_enabled = self.parallel_dims.dp_enabled
 
+        # Gradient averaging across DP ranks, overlapped with backward
+        self.grad_reducer: BucketedGradReducer | None = None
+        if self.dp_enabled and config.grad_bucket_size_mb > 0:
+            dp_mesh = self.parallel_dims.get_optional_mesh("batch")
+            self.grad_reducer = BucketedGradReducer(
+                list(self.model.parameters()),
+                process_group=dp_mesh.get_group() if dp_mesh is not None else None,
+                bucket_size_mb=config.grad_bucket_size_mb,
+            )
+
         logger.debug(
             f"PolicyTrainer initialized (dp_rank={self.dp_rank}, dp_size={self.dp_size})"
         )
@@ -243,6 +282,21 @@ class PolicyTrainer(Actor, Configurable):
         """
         from monarch.rdma import is_rdma_available
 
+        if self.weight_sync.layerwise:
+            if self._weight_sender is None:
+                self._weight_sender = WeightSender(
+                    self.model.state_dict,
+                    TorchStoreWeightStore(direct_rdma=is_rdma_available()),
+                    transfer_dtype=self._transfer_dtype,
+                    linear_transfer_dtype=self.weight_sync.linear_transfer_dtype,
+                )
+            stats = await self._weight_sender.push(self.policy_version)
+            logger.debug(
+                f"Pushed policy v{self.policy_version} in {stats['num_chunks']} "
+                f"chunks ({stats['push_sec']:.3f}s)"
+            )
+            return
+
         await ts.put_state_dict(
             self.model.state_dict(),
             "model_state_dict",
@@ -289,14 +343,24 @@ class PolicyTrainer(Actor, Configurable):
         ref_token_log_probs = []
         device = next(self.model.parameters()).device
         with torch.no_grad():
-            for prompt_toks, gen_toks in zip(my_prompt_token_ids, my_token_ids):
-                token_lps = compute_token_log_probs(
+            if self.config.pack_sequences:
+                ref_token_log_probs = compute_batch_token_log_probs(
                     self.ref_model,
-                    prompt_toks,
-                    gen_toks,
+                    my_prompt_token_ids,
+                    my_token_ids,
                     device,
+                    chunk_size=self.config.logprob_chunk_size,
                 )
-                ref_token_log_probs.append(token_lps)
+            else:
+                for prompt_toks, gen_toks in zip(my_prompt_token_ids, my_token_ids):
+                    token_lps = compute_token_log_probs(
+                        self.ref_model,
+                        prompt_toks,
+                        gen_toks,
+                        device,
+                        chunk_size=self.config.logprob_chunk_size,
+                    )
+                    ref_token_log_probs.append(token_lps)
 
         # Compute loss on this rank's shard
         loss, loss_metrics, batch_token_log_probs = compute_policy_gradient_loss(
@@ -306,6 +370,8 @@ class PolicyTrainer(Actor, Configurable):
             my_advantages,
             ref_token_log_probs,
             kl_coef=0.1,
+            pack_sequences=self.config.pack_sequences,
+            logprob_chunk_size=self.config.logprob_chunk_size,
         )
 
         # Verify logprob identity (local shard)
@@ -327,7 +393,10 @@ class PolicyTrainer(Actor, Configurable):
 
         # All-reduce gradients across DP ranks so all ranks have consistent
         # weight updates despite processing different data shards.
-        if self.dp_enabled:
+        if self.grad_reducer is not None:
+            # Buckets were launched from backward hooks; wait for the rest
+            self.grad_reducer.finish()
+        elif self.dp_enabled:
             for param in self.model.parameters():
                 if param.grad is not None:
                     dist.all_reduce(param.grad, op=dist.ReduceOp.AVG)
@@ -31,21 +31,116 @@ def build_varlen_metadata(
     )
 
 
+class _ChunkedSelectiveLogSoftmax(torch.autograd.Function):
+    """Gathers target log probs in row chunks and recomputes them in backward.
+
+    Only one fp32 chunk of ``[chunk_size, vocab]`` is alive at a time, and
+    backward keeps the original logits plus one fp32 logsumexp per row
+    instead of the full fp32 log probs.
+    """
+
+    @staticmethod
+    def forward(ctx, logits, target_ids, chunk_size):
+        token_lps = logits.new_empty(logits.shape[0], dtype=torch.float32)
+        lse = torch.empty_like(token_lps)
+        for start in range(0, logits.shape[0], chunk_size):
+            end = start + chunk_size
+            chunk = logits[start:end].to(torch.float32)
+            lse[start:end] = torch.logsumexp(chunk, dim=-1)
+            token_lps[start:end] = (
+                chunk.gather(1, target_ids[start:end].unsqueeze(-1)).squeeze(-1)
+                - lse[start:end]
+            )
+        ctx.save_for_backward(logits, target_ids, lse)
+        ctx.chunk_size = chunk_size
+        return token_lps
+
+    @staticmethod
+    def backward(ctx, grad_token_lps):
+        logits, target_ids, lse = ctx.saved_tensors
+        chunk_size = ctx.chunk_size
+        grad_logits = torch.empty_like(logits)
+        for start in range(0, logits.shape[0], chunk_size):
+            end = start + chunk_size
+            grad = grad_token_lps[start:end].unsqueeze(-1)
+            # d(x[t] - logsumexp(x)) / dx = onehot(t) - softmax(x)
+            chunk = logits[start:end].to(torch.float32)
+            grad_chunk = torch.exp(chunk - lse[start:end].unsqueeze(-1)).mul_(-grad)
+            grad_chunk.scatter_add_(1, target_ids[start:end].unsqueeze(-1), grad)
+            grad_logits[start:end] = grad_chunk
+        return grad_logits, None, None
+
+
+def selective_log_softmax(
+    logits: torch.Tensor,
+    target_ids: torch.Tensor,
+    chunk_size: int | None = None,
+) -> torch.Tensor:
+    """
+    Compute float32 log probabilities of the target tokens from logits.
+
+    Without ``chunk_size`` this upcasts the logits and runs a full
+    ``log_softmax``, which is what the generator computes and keeps the
+    log probs bitwise comparable. With ``chunk_size``, log probs are computed
+    as ``logit[target] - logsumexp(logits)`` over chunks of rows, so peak
+    memory no longer scales with ``rows x vocab`` in float32. Results then
+    match the unchunked path to float32 tolerance, and backward is supported.
+
+    Args:
+        logits: [num_tokens, vocab_size] logits
+        target_ids: [num_tokens] token IDs to gather
+        chunk_size: Number of rows processed at a time, or None to disable
+            chunking
+
+    Returns:
+        [num_tokens] float32 log probabilities of the target tokens
+    """
+    if chunk_size is None:
+        # Convert to float32 for numerical stability
+        log_probs = F.log_softmax(logits.to(torch.float32), dim=-1)
+        return log_probs.gather(1, target_ids.unsqueeze(-1)).squeeze(-1)
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    return _ChunkedSelectiveLogSoftmax.apply(logits, target_ids, chunk_size)
+
+
+def extract_sampled_log_probs(token_ids: list[int], logprobs) -> list[float]:
+    """Log probs of the sampled tokens from a vLLM completion.
+
+    Reads vLLM's flat logprobs format, where each position's entries start
+    with the sampled token, without building per-token dicts. The
+    list-of-dicts format, keyed by token id, is also accepted.
+    """
+    start_indices = getattr(logprobs, "start_indices", None)
+    if start_indices is None:
+        return [
+            position[token_id].logprob
+            for token_id, position in zip(token_ids, logprobs)
+        ]
+    if len(logprobs.logprobs) == len(start_indices):
+        # Only the sampled token was requested at each position
+        return list(logprobs.logprobs)
+    return [logprobs.logprobs[i] for i in start_indices]
+
+
 def compute_token_log_probs(
     model: torch.nn.Module,
     prompt_ids: list[int],
     gen_ids: list[int],
     device: torch.device,
+    chunk_size: int | None = None,
 ) -> torch.Tensor:
     """
     Compute per-token log probabilities for generated tokens.
-    TODO Only batch size 1 is supported for now.
+    Processes a single episode; use compute_batch_token_log_probs to pack
+    a batch of episodes into one forward.
 
     Args:
         model: The model to use for computing logits
         prompt_ids: Prompt token IDs
         gen_ids: Generated token IDs
         device: Device to run computation on
+        chunk_size: See ``selective_log_softmax``
 
     Returns:
         Per-token log probabilities for the generated tokens
@@ -57,8 +152,7 @@ def compute_token_log_probs(
 
     full_tensor = token_ids.unsqueeze(0)
 
-    # NOTE: We should move towards batching to improve efficiency here
-    # See https://github.com/pytorch/torchtitan/issues/2674
+    # NOTE: See compute_batch_token_log_probs for the batched version
     # Explicit positions avoid dynamic rope_cache[0:seqlen] slice in RoPE,
     # which breaks torch.compile with symbolic shapes.
     seq_len = full_tensor.shape[1]
@@ -66,24 +160,87 @@ def compute_token_log_probs(
 
     logits = model(full_tensor, attention_masks=attention_masks, positions=positions)
 
-    # Convert to float32 for numerical stability
-    logits_f32 = logits[:, :-1, :].to(torch.float32)
-    log_probs = F.log_softmax(logits_f32, dim=-1)
-    target_tokens = full_tensor[:, 1:]
-
     # Extract log probs for generated tokens only
     gen_start_idx = prompt_len - 1
     gen_end_idx = gen_start_idx + gen_len
 
-    gen_token_logprobs = log_probs[0, gen_start_idx:gen_end_idx, :]
-    gen_token_ids_tensor = target_tokens[0, gen_start_idx:gen_end_idx]
-    token_lps = gen_token_logprobs.gather(
-        1, gen_token_ids_tensor.unsqueeze(-1)
-    ).squeeze(-1)
+    token_lps = selective_log_softmax(
+        logits[0, gen_start_idx:gen_end_idx, :],
+        full_tensor[0, gen_start_idx + 1 : gen_end_idx + 1],
+        chunk_size=chunk_size,
+    )
 
     return token_lps
 
 
+def compute_batch_token_log_probs(
+    model: torch.nn.Module,
+    prompt_token_ids: list[list[int]],
+    gen_token_ids: list[list[int]],
+    device: torch.device,
+    chunk_size: int | None = None,
+) -> list[torch.Tensor]:
+    """
+    Compute per-token log probabilities for a batch of episodes in one forward.
+
+    All episodes are packed into a single varlen sequence whose documents are
+    separated by ``build_varlen_metadata``, so attention and RoPE positions
+    never cross episode boundaries. With batch-invariant kernels the result is
+    bitwise identical to calling ``compute_token_log_probs`` per episode.
+
+    Args:
+        model: The model to use for computing logits
+        prompt_token_ids: Prompt token IDs for each episode
+        gen_token_ids: Generated token IDs for each episode
+        device: Device to run computation on
+        chunk_size: See ``selective_log_softmax``
+
+    Returns:
+        Per-token log probabilities for the generated tokens of each episode
+    """
+    sequences = [
+        torch.tensor(prompt_ids + gen_ids, dtype=torch.long, device=device)
+        for prompt_ids, gen_ids in zip(prompt_token_ids, gen_token_ids)
+    ]
+    attention_masks = build_varlen_metadata(
+        [
+            (token_ids, len(prompt_ids), len(gen_ids))
+            for token_ids, prompt_ids, gen_ids in zip(
+                sequences, prompt_token_ids, gen_token_ids
+            )
+        ],
+        device,
+    )
+    full_tensor = torch.cat(sequences).unsqueeze(0)
+
+    # Positions restart at 0 for every packed episode
+    seq_starts = attention_masks.cu_seq_q[:-1].long()
+    seq_lens = attention_masks.cu_seq_q.diff().long()
+    positions = torch.arange(full_tensor.shape[1], device=device)
+    positions = (positions - seq_starts.repeat_interleave(seq_lens)).unsqueeze(0)
+
+    logits = model(full_tensor, attention_masks=attention_masks, positions=positions)
+
+    # The logits at packed index i predict the token at i + 1, so the
+    # generated tokens of an episode are predicted from
+    # [start + prompt_len - 1, start + prompt_len + gen_len - 1).
+    gen_lens = torch.tensor(
+        [len(gen_ids) for gen_ids in gen_token_ids], dtype=torch.long, device=device
+    )
+    prompt_lens = seq_lens - gen_lens
+    pred_starts = seq_starts + prompt_lens - 1
+    pred_idx = torch.arange(int(gen_lens.sum()), device=device)
+    pred_idx += (pred_starts - (gen_lens.cumsum(0) - gen_lens)).repeat_interleave(
+        gen_lens
+    )
+
+    token_lps = selective_log_softmax(
+        logits[0, pred_idx, :], full_tensor[0, pred_idx + 1], chunk_size=chunk_size
+    )
+
+    return list(token_lps.split(gen_lens.tolist()))
+
+
 def compute_policy_gradient_loss(
     model: torch.nn.Module,
     vllm_token_ids: list[list[int]],
@@ -93,6 +250,8 @@ def compute_policy_gradient_loss(
     kl_coef: float = 0.1,
     ppo_clip_eps: float = 0.2,
     entropy_coef: float = 0.01,
+    pack_sequences: bool = False,
+    logprob_chunk_size: int | None = None,
 ) -> tuple[torch.Tensor, dict, list[torch.Tensor]]:
     """
     Compute GRPO/PPO policy gradient loss with per-token KL divergence.
@@ -109,6 +268,9 @@ def compute_policy_gradient_loss(
         kl_coef: KL divergence penalty coefficient
         ppo_clip_eps: PPO clipping epsilon
         entropy_coef: Entropy bonus coefficient
+        pack_sequences: Compute all log probs in one packed forward with
+            ``compute_batch_token_log_probs`` instead of one forward per sample
+        logprob_chunk_size: Row chunk size of ``selective_log_softmax``
 
     Returns:
         loss: Total loss (PG + entropy + KL)
@@ -119,16 +281,25 @@ def compute_policy_gradient_loss(
     advantages = advantages.to(device)
 
     # Compute per-token log probs under current policy (WITH GRADIENTS)
-    batch_token_log_probs = []
-
-    for prompt_toks, gen_toks in zip(prompt_token_ids, vllm_token_ids):
-        token_lps = compute_token_log_probs(
+    if pack_sequences:
+        batch_token_log_probs = compute_batch_token_log_probs(
             model,
-            prompt_toks,
-            gen_toks,
+            prompt_token_ids,
+            vllm_token_ids,
             device,
+            chunk_size=logprob_chunk_size,
         )
-        batch_token_log_probs.append(token_lps)
+    else:
+        batch_token_log_probs = []
+        for prompt_toks, gen_toks in zip(prompt_token_ids, vllm_token_ids):
+            token_lps = compute_token_log_probs(
+                model,
+                prompt_toks,
+                gen_toks,
+                device,
+                chunk_size=logprob_chunk_size,
+            )
+            batch_token_log_probs.append(token_lps)
 
     # Per-token log ratios and KL, averaged across tokens per sample
     per_sample_mean_log_ratio = []
@@ -23,6 +23,7 @@ python3 torchtitan/experiments/rl/simple_grpo_sum_digits.py \
 """
 
 import asyncio
+import contextlib
 import logging
 import os
 import re
@@ -43,6 +44,7 @@ from torchtitan.experiments.rl.actors.grader import Grader
 from torchtitan.experiments.rl.actors.trainer import PolicyTrainer
 from torchtitan.experiments.rl.sum_digits import extract_answer, SumDigitsTask
 from torchtitan.experiments.rl.types import Episode
+from torchtitan.experiments.rl.weight_sync import WeightSyncConfig
 from torchtitan.protocols.model_spec import ModelSpec
 
 logger = logging.getLogger(__name__)
@@ -101,6 +103,38 @@ def _log_samples(episodes: list[Episode]) -> None:
         logger.info(f"       A: {ep.text[:300].replace(chr(10), ' ').strip()}")
 
 
+class _PipelineStats:
+    """Counters of the async pipeline, reported after every training step."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.generator_busy = 0.0
+        self.trainer_busy = 0.0
+        self.samples_trained = 0
+        self.samples_dropped = 0
+        self.staleness_sum = 0
+        self.staleness_count = 0
+        self.staleness_max = 0
+
+    def record_staleness(self, staleness: list[int], num_dropped: int) -> None:
+        self.staleness_sum += sum(staleness)
+        self.staleness_count += len(staleness)
+        self.staleness_max = max([self.staleness_max, *staleness])
+        self.samples_dropped += num_dropped
+
+    def summary(self, queue_depth: int) -> str:
+        elapsed = time.perf_counter() - self.start
+        mean_staleness = self.staleness_sum / max(self.staleness_count, 1)
+        return (
+            f"Pipeline | Queue depth: {queue_depth} | "
+            f"Staleness: mean={mean_staleness:.2f}, max={self.staleness_max} | "
+            f"Dropped: {self.samples_dropped} | "
+            f"Util: generator={self.generator_busy / elapsed:.0%}, "
+            f"trainer={self.trainer_busy / elapsed:.0%} | "
+            f"Samples/s: {self.samples_trained / elapsed:.2f}"
+        )
+
+
 class RLTrainer(Configurable):
     """Top-level RL training orchestrator."""
 
@@ -131,6 +165,29 @@ class RLTrainer(Configurable):
         log_samples: bool = False
         """Log first completion per episode during training and eval."""
 
+        async_mode: bool = False
+        """Overlap generation and training. The generator keeps producing
+        rollouts into a bounded queue with the latest weights it has pulled
+        while the trainer consumes them, instead of alternating
+        generate -> grade -> train -> sync."""
+
+        rollout_queue_size: int = 1
+        """Async mode only. Maximum number of graded rollout batches waiting
+        for the trainer. The generator blocks when the queue is full."""
+
+        max_policy_lag: int = 2
+        """Async mode only. Episodes generated by a policy more than this many
+        versions behind the trainer are dropped before the training step.
+        Staleness is bounded by ``rollout_queue_size + 1`` (queued batches
+        plus the one being generated), so larger lags drop nothing."""
+
+        grader_num_workers: int = 0
+        """Number of worker processes the Grader scores completions with.
+        0 scores in the grader actor process."""
+
+        weight_sync: WeightSyncConfig = field(default_factory=WeightSyncConfig)
+        """Weight transfer settings from the trainer to the generator."""
+
         trainer: PolicyTrainer.Config = field(default_factory=PolicyTrainer.Config)
         """PolicyTrainer config. Controls optimizer, training, parallelism"""
 
@@ -208,6 +265,7 @@ class RLTrainer(Configurable):
             batch_invariant_mode=config.batch_invariant_mode,
             hf_assets_path=config.hf_assets_path,
             transfer_dtype=config.generator.model_dtype,
+            weight_sync=config.weight_sync,
         )
         self.generator = generator_mesh.spawn(
             "generator",
@@ -216,11 +274,13 @@ class RLTrainer(Configurable):
             model_spec=config.model_spec,
             model_path=config.hf_assets_path,
             batch_invariant_mode=config.batch_invariant_mode,
+            weight_sync=config.weight_sync,
         )
         self.grader = grader_mesh.spawn(
             "grader",
             Grader,
             self.task.reward_function,
+            num_workers=config.grader_num_workers,
         )
 
         # Initialize TorchStore for weight sync between trainer and generator.
@@ -290,55 +350,105 @@ class RLTrainer(Configurable):
         )
         return result
 
-    async def train(self):
-        """Run the RL training loop.
+    def _sample_prompts(self) -> tuple[list[str], list[str]]:
+        """Create the prompts and expected answers for one rollout batch."""
+        train_prompts = []
+        train_answers = []
+        for _ in range(self.config.num_episodes_per_step):
+            question, answer = self.task.create_question()
+            train_prompts.append(self.system_prompt + "\n\n" + question)
+            train_answers.append(answer)
+        return train_prompts, train_answers
 
-        Must call :meth:`setup` first.
-        """
-        num_steps = self.config.num_steps
+    @staticmethod
+    def _compute_advantages(episodes: list[Episode]) -> None:
+        """Compute GRPO advantages in place (normalize within group)."""
+        groups: dict[str, list[int]] = defaultdict(list)
+        for idx, ep in enumerate(episodes):
+            groups[ep.group_id].append(idx)
+        for indices in groups.values():
+            rewards = torch.tensor([episodes[i].reward for i in indices])
+            mean_reward = rewards.mean().item()
+            for i in indices:
+                episodes[i].advantage = episodes[i].reward - mean_reward
+
+    def _log_step(
+        self, step: int, episodes: list[Episode], metrics: dict, t_step: float
+    ) -> None:
+        all_token_lens = [len(ep.token_ids) for ep in episodes]
+        avg_len = sum(all_token_lens) / len(all_token_lens)
+
+        all_rewards = [ep.reward for ep in episodes]
+        correct_count = sum(1 for r in all_rewards if r > 0)
+        total_count = len(all_rewards)
 
-        # Pre-training evaluation
-        logger.info("Evaluating pre-training baseline...")
-        pre_eval = await self.evaluate()
+        logger.info(
+            f"Step {step:2d} | Loss: {metrics['loss']:+.4f} | "
+            f"Reward: {metrics['reward_mean']:+.3f} | "
+            f"Correct: {correct_count:>2}/{total_count} | "
+            f"Avg tokens: {avg_len:>3.0f} | "
+            f"Logprob diff: mean={metrics['logprob_diff_mean']:.4e}, "
+            f"max={metrics['logprob_diff_max']:.4e} | "
+            f"Time: {t_step:.1f}s"
+        )
 
-        logger.info("=" * 80)
-        logger.info(f"Starting RL training for {num_steps} steps")
-        logger.info("=" * 80)
+    @staticmethod
+    def _diverged(metrics: dict) -> bool:
+        if torch.isfinite(torch.tensor(metrics["loss"])):
+            return False
+        logger.info("!" * 80)
+        logger.info("ERROR: Loss is NaN/Inf! Training diverged.")
+        logger.info("!" * 80)
+        return True
+
+    async def _generate_and_grade(
+        self, prompts: list[str], answers: list[str]
+    ) -> list[Episode]:
+        """Generate, grade and compute advantages for one rollout batch.
+
+        The generator returns Episodes group by group as each prompt's
+        samples finish, and every finished group is sent to the grader right
+        away, so grading overlaps the generation of the slower groups.
+        Episodes are returned in prompt order.
+        """
+        # TODO: Create a queue to use all episodes from all GPUs
+        await self.generator.start_generate.call(prompts, answers)
+        scoring = []
+        while True:
+            finished = (await self.generator.next_finished_groups.call()).item(gpus=0)
+            if not finished:
+                break
+            episodes = [ep for _, group in finished for ep in group]
+            scoring.append(
+                (
+                    [(idx, len(group)) for idx, group in finished],
+                    self.grader.score.call(episodes),
+                )
+            )
 
+        groups: dict[int, list[Episode]] = {}
+        for group_sizes, scored in scoring:
+            episodes = (await scored).item()
+            start = 0
+            for idx, size in group_sizes:
+                group = episodes[start : start + size]
+                start += size
+                # Groups are complete, so advantages only need their own episodes
+                self._compute_advantages(group)
+                groups[idx] = group
+        return [ep for idx in sorted(groups) for ep in groups[idx]]
+
+    async def _train_sync(self, num_steps: int) -> None:
+        """Fully sync RL loop (GRPO): generate, grade, train, sync weights."""
         for step in range(num_steps):
             # Generate data sample for this step
-            train_prompts = []
-            train_answers = []
-            train_questions = []
-            for _ in range(self.config.num_episodes_per_step):
-                question, answer = self.task.create_question()
-                train_prompts.append(self.system_prompt + "\n\n" + question)
-                train_answers.append(answer)
-                train_questions.append(question)
+            train_prompts, train_answers = self._sample_prompts()
 
             step_start: float = time.perf_counter()
 
-            # Fully sync RL loop (GRPO)
-            # 1. Generator produces flat list of Episodes with group_id
-            # TODO: Create a queue to use all episodes from all GPUs
-            episodes = (
-                self.generator.generate.call(train_prompts, train_answers)
-                .get()
-                .item(gpus=0)
-            )
-
-            # 2. Grader computes rewards per episode
-            episodes = self.grader.score.call(episodes).get().item()
-
-            # 3. Controller computes GRPO advantages (normalize within group)
-            groups: dict[str, list[int]] = defaultdict(list)
-            for idx, ep in enumerate(episodes):
-                groups[ep.group_id].append(idx)
-            for indices in groups.values():
-                rewards = torch.tensor([episodes[i].reward for i in indices])
-                mean_reward = rewards.mean().item()
-                for i in indices:
-                    episodes[i].advantage = episodes[i].reward - mean_reward
+            # 1-3. Generator streams Episodes by group_id, the grader computes
+            # rewards and the controller GRPO advantages as groups finish
+            episodes = await self._generate_and_grade(train_prompts, train_answers)
 
             if self.config.log_samples:
                 _log_samples(episodes)
@@ -348,38 +458,161 @@ class RLTrainer(Configurable):
 
             # 5. Sync weights
             t0 = time.perf_counter()
-            self.trainer.push_model_state_dict.call().get()
-            t_push = time.perf_counter() - t0
-            self.generator.pull_model_state_dict.call(metrics["policy_version"]).get()
+            push = self.trainer.push_model_state_dict.call()
+            if self.config.weight_sync.layerwise:
+                # The generator swaps in each layer while the next is pushed
+                pull = self.generator.pull_model_state_dict.call(
+                    metrics["policy_version"]
+                )
+                push.get()
+                t_push = time.perf_counter() - t0
+                pull.get()
+            else:
+                push.get()
+                t_push = time.perf_counter() - t0
+                self.generator.pull_model_state_dict.call(
+                    metrics["policy_version"]
+                ).get()
             t_total = time.perf_counter() - t0
             logger.info(f"Weight sync: push={t_push:.3f}s, total={t_total:.3f}s")
 
             t_step = time.perf_counter() - step_start
-
-            all_token_lens = [len(ep.token_ids) for ep in episodes]
-            avg_len = sum(all_token_lens) / len(all_token_lens)
-
-            all_rewards = [ep.reward for ep in episodes]
-            correct_count = sum(1 for r in all_rewards if r > 0)
-            total_count = len(all_rewards)
-
-            logger.info(
-                f"Step {step:2d} | Loss: {metrics['loss']:+.4f} | "
-                f"Reward: {metrics['reward_mean']:+.3f} | "
-                f"Correct: {correct_count:>2}/{total_count} | "
-                f"Avg tokens: {avg_len:>3.0f} | "
-                f"Logprob diff: mean={metrics['logprob_diff_mean']:.4e}, "
-                f"max={metrics['logprob_diff_max']:.4e} | "
-                f"Time: {t_step:.1f}s"
-            )
+            self._log_step(step, episodes, metrics, t_step)
 
             # Check for divergence
-            if not torch.isfinite(torch.tensor(metrics["loss"])):
-                logger.info("!" * 80)
-                logger.info("ERROR: Loss is NaN/Inf! Training diverged.")
-                logger.info("!" * 80)
+            if self._diverged(metrics):
                 break
 
+    async def _produce_rollouts(
+        self,
+        queue: asyncio.Queue,
+        weights_lock: asyncio.Lock,
+        state: dict,
+        stats: "_PipelineStats",
+    ) -> None:
+        """Generate and grade rollout batches until cancelled.
+
+        Pulls the latest published weights between batches, so generation
+        runs with a policy that lags the trainer by at most the number of
+        batches in flight.
+        """
+        generator_version = 0
+        while True:
+            if state["published_version"] > generator_version:
+                async with weights_lock:
+                    generator_version = state["published_version"]
+                    t0 = time.perf_counter()
+                    await self.generator.pull_model_state_dict.call(generator_version)
+                    stats.generator_busy += time.perf_counter() - t0
+
+            train_prompts, train_answers = self._sample_prompts()
+            t0 = time.perf_counter()
+            episodes = await self._generate_and_grade(train_prompts, train_answers)
+            stats.generator_busy += time.perf_counter() - t0
+
+            # Blocks while the trainer is behind by rollout_queue_size batches
+            await queue.put(episodes)
+
+    async def _train_async(self, num_steps: int) -> None:
+        """Off-policy RL loop that overlaps generation with training.
+
+        A producer task keeps generating and grading rollouts into a bounded
+        queue while this loop trains on them and publishes new weights. Each
+        Episode carries the ``policy_version`` that generated it, and
+        episodes older than ``max_policy_lag`` versions are dropped.
+        """
+        config = self.config
+        queue: asyncio.Queue[list[Episode]] = asyncio.Queue(
+            maxsize=config.rollout_queue_size
+        )
+        # Serializes weight publishing and pulling so the generator never
+        # reads a partially written state dict
+        weights_lock = asyncio.Lock()
+        state = {"published_version": 0}
+        stats = _PipelineStats()
+        producer = asyncio.create_task(
+            self._produce_rollouts(queue, weights_lock, state, stats)
+        )
+
+        trainer_version = 0
+        try:
+            for step in range(num_steps):
+                step_start: float = time.perf_counter()
+
+                queue_depth = queue.qsize()
+                episodes: list[Episode] = []
+                while not episodes:
+                    get = asyncio.ensure_future(queue.get())
+                    done, _ = await asyncio.wait(
+                        [get, producer], return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if get not in done:
+                        get.cancel()
+                        # Surface the producer's exception
+                        producer.result()
+                    batch = get.result()
+                    staleness = [trainer_version - ep.policy_version for ep in batch]
+                    episodes = [
+                        ep
+                        for ep, lag in zip(batch, staleness)
+                        if lag <= config.max_policy_lag
+                    ]
+                    stats.record_staleness(staleness, len(batch) - len(episodes))
+                    if not episodes:
+                        logger.info(
+                            f"Dropped a rollout batch that is {min(staleness)} "
+                            f"policy versions behind the trainer"
+                        )
+
+                if config.log_samples:
+                    _log_samples(episodes)
+
+                t0 = time.perf_counter()
+                metrics = (await self.trainer.step.call(episodes)).item(gpus=0)
+                trainer_version = metrics["policy_version"]
+                async with weights_lock:
+                    await self.trainer.push_model_state_dict.call()
+                    state["published_version"] = trainer_version
+                stats.trainer_busy += time.perf_counter() - t0
+                stats.samples_trained += len(episodes)
+
+                t_step = time.perf_counter() - step_start
+                self._log_step(step, episodes, metrics, t_step)
+                logger.info(stats.summary(queue_depth))
+
+                if self._diverged(metrics):
+                    break
+        finally:
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
+            # The producer may have been cancelled in the middle of a
+            # generation, whose requests would block the next one
+            await self.generator.abort.call()
+
+        # Leave the generator on the final policy for evaluation
+        self.generator.pull_model_state_dict.call(trainer_version).get()
+
+    async def train(self):
+        """Run the RL training loop.
+
+        Must call :meth:`setup` first.
+        """
+        num_steps = self.config.num_steps
+
+        # Pre-training evaluation
+        logger.info("Evaluating pre-training baseline...")
+        pre_eval = await self.evaluate()
+
+        logger.info("=" * 80)
+        logger.info(f"Starting RL training for {num_steps} steps")
+        logger.info("=" * 80)
+
+        if self.config.async_mode:
+            await self._train_async(num_steps)
+        else:
+            await self._train_sync(num_steps)
+
         # Post-training evaluation
         logger.info("RL Training complete")
         logger.info("Evaluating post-training performance...")
@@ -0,0 +1,92 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import tempfile
+import unittest
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.nn as nn
+
+from torchtitan.experiments.rl.actors.grad_reducer import BucketedGradReducer
+
+WORLD_SIZE = 2
+
+
+def _build_model() -> nn.Module:
+    torch.manual_seed(0)
+    return nn.Sequential(
+        nn.Linear(8, 16),
+        nn.ReLU(),
+        nn.Linear(16, 16),
+        nn.ReLU(),
+        nn.Linear(16, 4),
+    )
+
+
+def _backward(model: nn.Module, rank: int, skip_last: bool = False) -> None:
+    torch.manual_seed(rank)
+    h = torch.randn(5, 8)
+    layers = list(model)[:-1] if skip_last else list(model)
+    for layer in layers:
+        h = layer(h)
+    h.pow(2).mean().backward()
+
+
+def _worker(rank: int, init_file: str) -> None:
+    dist.init_process_group(
+        "gloo",
+        init_method=f"file://{init_file}",
+        rank=rank,
+        world_size=WORLD_SIZE,
+    )
+    try:
+        expected_model = _build_model()
+        _backward(expected_model, rank)
+        for param in expected_model.parameters():
+            dist.all_reduce(param.grad, op=dist.ReduceOp.AVG)
+
+        model = _build_model()
+        # Small buckets so the model spans several of them
+        reducer = BucketedGradReducer(list(model.parameters()), bucket_size_mb=1e-3)
+        assert len(reducer.buckets) > 1
+        for _ in range(2):
+            model.zero_grad()
+            _backward(model, rank)
+            reducer.finish()
+            for expected, param in zip(expected_model.parameters(), model.parameters()):
+                torch.testing.assert_close(param.grad, expected.grad)
+
+        # Only rank 0 uses the last layer; the other rank contributes zeros
+        model.zero_grad()
+        _backward(model, rank, skip_last=rank != 0)
+        reducer.finish()
+        # Every rank gets the averaged gradient, so replicas stay in sync
+        for param in list(model)[-1].parameters():
+            assert param.grad is not None
+            grads = [torch.empty_like(param.grad) for _ in range(WORLD_SIZE)]
+            dist.all_gather(grads, param.grad)
+            torch.testing.assert_close(grads[0], grads[1])
+            assert grads[0].abs().sum() > 0
+    finally:
+        dist.destroy_process_group()
+
+
+class TestBucketedGradReducer(unittest.TestCase):
+    def test_matches_per_parameter_all_reduce(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mp.spawn(
+                _worker,
+                args=(os.path.join(tmp_dir, "init"),),
+                nprocs=WORLD_SIZE,
+                join=True,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
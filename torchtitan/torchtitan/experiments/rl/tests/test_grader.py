@@ -0,0 +1,70 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import multiprocessing
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+
+from torchtitan.experiments.rl.actors.grader import compute_rewards
+from torchtitan.experiments.rl.sum_digits import SumDigitsTask
+
+
+class TestComputeRewards(unittest.TestCase):
+    def setUp(self):
+        task = SumDigitsTask(seed=0)
+        self.reward_fn = task.reward_function
+        self.completions = []
+        self.expected_answers = []
+        for i in range(12):
+            _, answer = task.create_question()
+            for text in (f"[ANSWER] {answer}", f"[ANSWER] {int(answer) + 1}", "?"):
+                self.completions.append(text)
+                # Repeat answers so that several groups hold more than one prompt
+                self.expected_answers.append(answer if i % 3 else "7")
+        self.expected = torch.cat(
+            [
+                self.reward_fn([text], answer)
+                for text, answer in zip(self.completions, self.expected_answers)
+            ]
+        )
+
+    def test_matches_per_completion_scoring(self):
+        calls = []
+
+        def counting_reward_fn(completions, expected_answer):
+            calls.append(len(completions))
+            return self.reward_fn(completions, expected_answer)
+
+        rewards = compute_rewards(
+            counting_reward_fn, self.completions, self.expected_answers
+        )
+        self.assertTrue(torch.equal(rewards, self.expected))
+        self.assertEqual(len(calls), len(set(self.expected_answers)))
+
+    def test_chunked(self):
+        rewards = compute_rewards(
+            self.reward_fn, self.completions, self.expected_answers, max_chunk_size=2
+        )
+        self.assertTrue(torch.equal(rewards, self.expected))
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(
+            max_workers=2, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            rewards = compute_rewards(
+                self.reward_fn,
+                self.completions,
+                self.expected_answers,
+                executor=executor,
+                max_chunk_size=5,
+            )
+        self.assertTrue(torch.equal(rewards, self.expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
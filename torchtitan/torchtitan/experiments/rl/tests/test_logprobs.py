@@ -0,0 +1,153 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+from types import SimpleNamespace
+
+import torch
+import torch.nn as nn
+
+from torchtitan.experiments.rl.actors.utils import (
+    compute_batch_token_log_probs,
+    compute_token_log_probs,
+    extract_sampled_log_probs,
+    selective_log_softmax,
+)
+from torchtitan.models.common.attention import VarlenMetadata
+
+
+class _PrefixMeanLM(nn.Module):
+    """Tiny causal LM that mixes tokens only within each varlen document."""
+
+    def __init__(self, vocab_size: int = 64, dim: int = 16, max_len: int = 64):
+        super().__init__()
+        self.tok_embeddings = nn.Embedding(vocab_size, dim)
+        self.pos_embeddings = nn.Embedding(max_len, dim)
+        self.output = nn.Linear(dim, vocab_size)
+
+    def forward(
+        self,
+        tokens: torch.Tensor,
+        attention_masks: VarlenMetadata,
+        positions: torch.Tensor,
+    ) -> torch.Tensor:
+        h = self.tok_embeddings(tokens) + self.pos_embeddings(positions)
+        cu_seqlens = attention_masks.cu_seq_q.tolist()
+        docs = [
+            h[:, start:end].cumsum(1) / torch.arange(1, end - start + 1).view(1, -1, 1)
+            for start, end in zip(cu_seqlens[:-1], cu_seqlens[1:])
+        ]
+        return self.output(torch.cat(docs, dim=1))
+
+
+class TestBatchTokenLogProbs(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.model = _PrefixMeanLM()
+        self.prompts = [torch.randint(0, 64, (n,)).tolist() for n in (5, 9, 1, 12)]
+        self.gens = [torch.randint(0, 64, (n,)).tolist() for n in (4, 1, 7, 6)]
+
+    def test_matches_per_episode(self):
+        device = torch.device("cpu")
+        batched = compute_batch_token_log_probs(
+            self.model, self.prompts, self.gens, device
+        )
+        self.assertEqual(len(batched), len(self.prompts))
+        for token_lps, prompt, gen in zip(batched, self.prompts, self.gens):
+            expected = compute_token_log_probs(self.model, prompt, gen, device)
+            self.assertEqual(token_lps.shape, (len(gen),))
+            self.assertTrue(torch.equal(token_lps, expected))
+
+    def test_chunked_matches_per_episode(self):
+        device = torch.device("cpu")
+        batched = compute_batch_token_log_probs(
+            self.model, self.prompts, self.gens, device, chunk_size=3
+        )
+        for token_lps, prompt, gen in zip(batched, self.prompts, self.gens):
+            expected = compute_token_log_probs(self.model, prompt, gen, device)
+            torch.testing.assert_close(token_lps, expected)
+
+    def test_gradients_match_per_episode(self):
+        device = torch.device("cpu")
+        torch.cat(
+            compute_batch_token_log_probs(self.model, self.prompts, self.gens, device)
+        ).sum().backward()
+        batched_grads = [p.grad.clone() for p in self.model.parameters()]
+
+        self.model.zero_grad()
+        sum(
+            compute_token_log_probs(self.model, prompt, gen, device).sum()
+            for prompt, gen in zip(self.prompts, self.gens)
+        ).backward()
+        for batched_grad, p in zip(batched_grads, self.model.parameters()):
+            torch.testing.assert_close(batched_grad, p.grad)
+
+
+class TestSelectiveLogSoftmax(unittest.TestCase):
+    def _reference(self, logits, target_ids):
+        log_probs = torch.log_softmax(logits.float(), dim=-1)
+        return log_probs.gather(1, target_ids.unsqueeze(-1)).squeeze(-1)
+
+    def test_chunked_matches_full(self):
+        torch.manual_seed(0)
+        for dtype in (torch.float32, torch.bfloat16):
+            logits = (torch.randn(37, 1000) * 4).to(dtype).requires_grad_()
+            target_ids = torch.randint(0, 1000, (37,))
+            expected = self._reference(logits, target_ids)
+            grad = torch.randn(37)
+            (expected_grad,) = torch.autograd.grad(expected, logits, grad)
+            for chunk_size in (1, 8, 37, 64):
+                actual = selective_log_softmax(logits, target_ids, chunk_size)
+                self.assertEqual(actual.dtype, torch.float32)
+                torch.testing.assert_close(actual, expected)
+                (actual_grad,) = torch.autograd.grad(actual, logits, grad)
+                self.assertEqual(actual_grad.dtype, dtype)
+                torch.testing.assert_close(actual_grad, expected_grad)
+
+    def test_unchunked_is_log_softmax(self):
+        logits = torch.randn(9, 50)
+        target_ids = torch.randint(0, 50, (9,))
+        self.assertTrue(
+            torch.equal(
+                selective_log_softmax(logits, target_ids),
+                self._reference(logits, target_ids),
+            )
+        )
+
+
+class TestExtractSampledLogProbs(unittest.TestCase):
+    token_ids = [5, 7, 2]
+    expected = [-0.5, -1.25, -3.0]
+
+    def test_dict_format(self):
+        logprobs = [
+            {5: SimpleNamespace(logprob=-0.5)},
+            # The top-1 token differs from the sampled one
+            {3: SimpleNamespace(logprob=-0.1), 7: SimpleNamespace(logprob=-1.25)},
+            {2: SimpleNamespace(logprob=-3.0)},
+        ]
+        self.assertEqual(
+            extract_sampled_log_probs(self.token_ids, logprobs), self.expected
+        )
+
+    def test_flat_format(self):
+        sampled_only = SimpleNamespace(
+            start_indices=[0, 1, 2], logprobs=[-0.5, -1.25, -3.0]
+        )
+        self.assertEqual(
+            extract_sampled_log_probs(self.token_ids, sampled_only), self.expected
+        )
+        # Sampled token first, followed by the top-1 token
+        with_top1 = SimpleNamespace(
+            start_indices=[0, 1, 3], logprobs=[-0.5, -1.25, -0.1, -3.0]
+        )
+        self.assertEqual(
+            extract_sampled_log_probs(self.token_ids, with_top1), self.expected
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
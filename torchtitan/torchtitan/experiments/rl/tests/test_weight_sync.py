@@ -0,0 +1,167 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+import torch
+import torch.nn as nn
+
+from torchtitan.experiments.rl.weight_sync import (
+    FileWeightStore,
+    split_state_dict,
+    WeightReceiver,
+    WeightSender,
+)
+
+NUM_LAYERS = 3
+NUM_VERSIONS = 3
+
+
+class _Layer(nn.Module):
+    def __init__(self, dim: int):
+        super().__init__()
+        self.norm = nn.LayerNorm(dim)
+        self.proj = nn.Linear(dim, dim, bias=False)
+
+
+class _Model(nn.Module):
+    def __init__(self, dim: int = 16, dtype: torch.dtype = torch.float32):
+        super().__init__()
+        self.tok_embeddings = nn.Embedding(32, dim)
+        self.layers = nn.ModuleDict({str(i): _Layer(dim) for i in range(NUM_LAYERS)})
+        self.output = nn.Linear(dim, 32, bias=False)
+        self.to(dtype)
+
+
+def _weights(version: int) -> _Model:
+    torch.manual_seed(version)
+    return _Model()
+
+
+def _sender_process(root: str) -> None:
+    model = _Model()
+    sender = WeightSender(
+        model.state_dict, FileWeightStore(root), transfer_dtype=torch.bfloat16
+    )
+    for version in range(NUM_VERSIONS):
+        model.load_state_dict(_weights(version).state_dict())
+        asyncio.run(sender.push(version))
+
+
+def _receiver_process(root: str, result_queue) -> None:
+    model = _Model(dtype=torch.bfloat16)
+    receiver = WeightReceiver(model.state_dict(), FileWeightStore(root))
+    candidates = [_weights(v).state_dict() for v in range(NUM_VERSIONS)]
+    try:
+        for version in range(NUM_VERSIONS):
+            asyncio.run(receiver.pull(version, timeout=60))
+            # Each chunk is swapped as a whole, from the requested version or
+            # a newer one published in the meantime
+            for chunk in split_state_dict(model.state_dict()).values():
+                assert any(
+                    all(
+                        torch.equal(tensor, candidates[v][name].to(torch.bfloat16))
+                        for name, tensor in chunk.items()
+                    )
+                    for v in range(version, NUM_VERSIONS)
+                )
+        result_queue.put(None)
+    except Exception as e:
+        result_queue.put(repr(e))
+
+
+class TestWeightSync(unittest.TestCase):
+    def test_split_state_dict(self):
+        chunks = split_state_dict(_Model().state_dict())
+        self.assertEqual(
+            list(chunks),
+            ["tok_embeddings", "layers.0", "layers.1", "layers.2", "output"],
+        )
+        self.assertEqual(
+            sorted(chunks["layers.1"]),
+            ["layers.1.norm.bias", "layers.1.norm.weight", "layers.1.proj.weight"],
+        )
+
+    def test_layerwise_version_handshake(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = FileWeightStore(root)
+            source = _weights(1)
+            sender = WeightSender(source.state_dict, store)
+            target = _Model()
+            receiver = WeightReceiver(target.state_dict(), store)
+            old_output = target.output.weight.clone()
+
+            # Only publish the first two chunks of version 1
+            chunks = split_state_dict(source.state_dict())
+            for name in ["tok_embeddings", "layers.0"]:
+                asyncio.run(sender._put_chunk(name, chunks[name], 1))
+
+            self.assertFalse(asyncio.run(receiver.poll(1)))
+            self.assertEqual(
+                receiver.chunk_versions, {"tok_embeddings": 1, "layers.0": 1}
+            )
+            torch.testing.assert_close(
+                target.layers["0"].proj.weight, source.layers["0"].proj.weight
+            )
+            # Layers that have not been published keep the old weights
+            torch.testing.assert_close(target.output.weight, old_output)
+
+            asyncio.run(sender.push(1))
+            self.assertTrue(asyncio.run(receiver.poll(1)))
+            for name, tensor in target.state_dict().items():
+                torch.testing.assert_close(tensor, source.state_dict()[name])
+
+    def test_fp8_linear_weights(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = FileWeightStore(root)
+            source = _weights(0)
+            sender = WeightSender(
+                source.state_dict,
+                store,
+                transfer_dtype=torch.bfloat16,
+                linear_transfer_dtype="float8_e4m3fn",
+            )
+            target = _Model(dtype=torch.bfloat16)
+            receiver = WeightReceiver(
+                target.state_dict(), store, linear_transfer_dtype="float8_e4m3fn"
+            )
+            asyncio.run(sender.push(0))
+            asyncio.run(receiver.pull(0, timeout=10))
+
+            source_sd = source.state_dict()
+            for name, tensor in target.state_dict().items():
+                expected = source_sd[name]
+                if name.endswith("proj.weight"):
+                    # float8 e4m3 keeps 3 mantissa bits
+                    scale = expected.abs().max()
+                    torch.testing.assert_close(
+                        tensor.float(), expected, atol=scale * 2**-4, rtol=2**-3
+                    )
+                else:
+                    self.assertTrue(torch.equal(tensor, expected.to(torch.bfloat16)))
+
+    def test_multi_process(self):
+        ctx = multiprocessing.get_context("spawn")
+        with tempfile.TemporaryDirectory() as root:
+            root = os.path.join(root, "store")
+            result_queue = ctx.Queue()
+            receiver = ctx.Process(target=_receiver_process, args=(root, result_queue))
+            sender = ctx.Process(target=_sender_process, args=(root,))
+            receiver.start()
+            sender.start()
+            sender.join(timeout=120)
+            self.assertIsNone(result_queue.get(timeout=120))
+            receiver.join(timeout=120)
+            self.assertEqual(sender.exitcode, 0)
+            self.assertEqual(receiver.exitcode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
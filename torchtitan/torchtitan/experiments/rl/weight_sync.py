@@ -0,0 +1,398 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Layer-wise weight synchronization from the trainer to the generator.
+
+The trainer's state dict is split into chunks, one per transformer layer plus
+one per remaining top-level module, and published chunk by chunk. Every chunk
+is followed by a version marker, so the generator can copy a layer in as soon
+as it has arrived while the trainer is still publishing the next ones, and a
+layer is only swapped once it is complete. Publishing is pipelined: the next
+chunk is cast while the current one is in flight, with at most two chunks
+staged at a time.
+
+Linear weights of the transformer layers can use a different transfer dtype
+than the other tensors, including float8 with a per-tensor scale.
+"""
+
+import asyncio
+import os
+import re
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol
+
+import torch
+from torch.distributed.tensor import DTensor
+
+from torchtitan.config import TORCH_DTYPE_MAP
+
+_LAYER_RE = re.compile(r"^(.*?layers\.\d+)\.")
+_SCALE_SUFFIX = ".__fp8_scale"
+_FP8_DTYPES = {
+    "float8_e4m3fn": torch.float8_e4m3fn,
+    "float8_e5m2": torch.float8_e5m2,
+}
+
+
+@dataclass(kw_only=True, slots=True)
+class WeightSyncConfig:
+    """Weight transfer settings shared by the trainer and the generator."""
+
+    layerwise: bool = False
+    """Publish and pull the weights one transformer layer at a time with a
+    per-layer version handshake, so pulling overlaps pushing. When disabled,
+    the whole state dict is transferred as one unit."""
+
+    linear_transfer_dtype: str = ""
+    """Layer-wise only. Transfer dtype for the 2-D linear weights inside
+    transformer layers, e.g. "bfloat16" or "float8_e4m3fn" (float8 is sent
+    with a per-tensor scale). Empty uses the default transfer dtype. Norms,
+    embeddings and the output projection always use the default."""
+
+
+def _dtype(name: str) -> torch.dtype:
+    if name in _FP8_DTYPES:
+        return _FP8_DTYPES[name]
+    return TORCH_DTYPE_MAP[name]
+
+
+def chunk_name(param_name: str) -> str:
+    """The chunk a parameter is transferred in: its transformer layer, e.g.
+    ``layers.3``, or its top-level module for parameters outside layers."""
+    match = _LAYER_RE.match(param_name)
+    if match is not None:
+        return match.group(1)
+    return param_name.split(".")[0]
+
+
+def split_state_dict(
+    state_dict: dict[str, torch.Tensor],
+) -> dict[str, dict[str, torch.Tensor]]:
+    """Group a state dict into transfer chunks, preserving module order."""
+    chunks: dict[str, dict[str, torch.Tensor]] = {}
+    for name, tensor in state_dict.items():
+        chunks.setdefault(chunk_name(name), {})[name] = tensor
+    return chunks
+
+
+class WeightStore(Protocol):
+    """Key-value store the weights are published through."""
+
+    async def put_state_dict(
+        self, state_dict: dict[str, torch.Tensor], key: str
+    ) -> None:
+        """Publishes ``state_dict`` under ``key``."""
+        ...
+
+    async def get_state_dict(
+        self, key: str, user_state_dict: dict[str, torch.Tensor]
+    ) -> None:
+        """Copies the published tensors into ``user_state_dict`` in place."""
+        ...
+
+    async def put_version(self, key: str, version: int) -> None:
+        """Publishes the version marker of ``key``."""
+        ...
+
+    async def get_version(self, key: str) -> int | None:
+        """Returns the published version, or None if nothing was published."""
+        ...
+
+
+class TorchStoreWeightStore:
+    """``WeightStore`` backed by TorchStore, which reshards DTensors between
+    the trainer and generator layouts."""
+
+    def __init__(self, direct_rdma: bool = False):
+        self.direct_rdma = direct_rdma
+
+    async def put_state_dict(
+        self, state_dict: dict[str, torch.Tensor], key: str
+    ) -> None:
+        import torchstore as ts
+
+        await ts.put_state_dict(state_dict, key, direct_rdma=self.direct_rdma)
+
+    async def get_state_dict(
+        self, key: str, user_state_dict: dict[str, torch.Tensor]
+    ) -> None:
+        import torchstore as ts
+
+        await ts.get_state_dict(
+            key,
+            user_state_dict=user_state_dict,
+            strict=False,
+            direct_rdma=self.direct_rdma,
+        )
+
+    async def put_version(self, key: str, version: int) -> None:
+        import torchstore as ts
+
+        await ts.put(f"{key}/version", torch.tensor(version))
+
+    async def get_version(self, key: str) -> int | None:
+        import torchstore as ts
+
+        if not await ts.exists(f"{key}/version"):
+            return None
+        return int(await ts.get(f"{key}/version"))
+
+
+class FileWeightStore:
+    """``WeightStore`` on a shared directory, for tests and single-host runs.
+
+    Files are written to a temporary name and renamed, so readers never see a
+    partially written chunk or version.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key.replace("/", "__"))
+
+    def _atomic_save(self, obj, key: str) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root)
+        with os.fdopen(fd, "wb") as f:
+            torch.save(obj, f)
+        os.replace(tmp_path, self._path(key))
+
+    async def put_state_dict(
+        self, state_dict: dict[str, torch.Tensor], key: str
+    ) -> None:
+        cpu_state_dict = {k: v.detach().cpu() for k, v in state_dict.items()}
+        await asyncio.to_thread(self._atomic_save, cpu_state_dict, key)
+
+    async def get_state_dict(
+        self, key: str, user_state_dict: dict[str, torch.Tensor]
+    ) -> None:
+        loaded = await asyncio.to_thread(torch.load, self._path(key))
+        for name, tensor in user_state_dict.items():
+            tensor.copy_(loaded[name])
+
+    async def put_version(self, key: str, version: int) -> None:
+        await asyncio.to_thread(self._atomic_save, version, f"{key}/version")
+
+    async def get_version(self, key: str) -> int | None:
+        path = self._path(f"{key}/version")
+        if not os.path.exists(path):
+            return None
+        return await asyncio.to_thread(torch.load, path)
+
+
+def _is_linear_weight(name: str, tensor: torch.Tensor) -> bool:
+    return (
+        _LAYER_RE.match(name) is not None
+        and name.endswith(".weight")
+        and tensor.ndim == 2
+    )
+
+
+def _local(tensor: torch.Tensor) -> torch.Tensor:
+    return tensor.to_local() if isinstance(tensor, DTensor) else tensor
+
+
+def _quantize_fp8(
+    tensor: torch.Tensor, dtype: torch.dtype
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Casts to float8 with a per-tensor scale, keeping DTensor layouts."""
+    amax = tensor.abs().amax().float()
+    if isinstance(amax, DTensor):
+        amax = amax.full_tensor()
+    scale = amax.clamp_min(1e-12) / torch.finfo(dtype).max
+    quantized = (_local(tensor).float() / scale).to(dtype)
+    if isinstance(tensor, DTensor):
+        quantized = DTensor.from_local(
+            quantized,
+            tensor.device_mesh,
+            tensor.placements,
+            shape=tensor.shape,
+            stride=tensor.stride(),
+        )
+    return quantized, scale
+
+
+class _TransferDtypes:
+    def __init__(self, default: torch.dtype | None, linear: torch.dtype | None):
+        self.default = default
+        self.linear = linear
+
+    def __call__(self, name: str, tensor: torch.Tensor) -> torch.dtype | None:
+        if self.linear is not None and _is_linear_weight(name, tensor):
+            return self.linear
+        return self.default
+
+
+def _encode(
+    chunk: dict[str, torch.Tensor], dtypes: _TransferDtypes
+) -> dict[str, torch.Tensor]:
+    payload = {}
+    for name, tensor in chunk.items():
+        dtype = dtypes(name, tensor)
+        tensor = tensor.detach()
+        if dtype in _FP8_DTYPES.values():
+            payload[name], payload[name + _SCALE_SUFFIX] = _quantize_fp8(tensor, dtype)
+        elif dtype is not None and dtype != tensor.dtype:
+            payload[name] = tensor.to(dtype)
+        else:
+            payload[name] = tensor
+    return payload
+
+
+class WeightSender:
+    """Publishes a model's weights chunk by chunk with version markers.
+
+    Args:
+        state_dict_fn: Returns the current state dict to publish.
+        store: Store the weights are published through.
+        key: Key prefix of the published weights.
+        transfer_dtype: Default transfer dtype, or None to send as is.
+        linear_transfer_dtype: Transfer dtype of linear weights in layers.
+    """
+
+    def __init__(
+        self,
+        state_dict_fn: Callable[[], dict[str, torch.Tensor]],
+        store: WeightStore,
+        key: str = "model_state_dict",
+        transfer_dtype: torch.dtype | None = None,
+        linear_transfer_dtype: str = "",
+    ):
+        self.state_dict_fn = state_dict_fn
+        self.store = store
+        self.key = key
+        self._dtypes = _TransferDtypes(
+            transfer_dtype,
+            _dtype(linear_transfer_dtype) if linear_transfer_dtype else None,
+        )
+
+    async def _put_chunk(
+        self, name: str, payload: dict[str, torch.Tensor], version: int
+    ) -> None:
+        await self.store.put_state_dict(payload, f"{self.key}/{name}")
+        # The marker is written after the data, so a reader that sees the
+        # version always reads a complete chunk
+        await self.store.put_version(f"{self.key}/{name}", version)
+
+    async def push(self, version: int) -> dict[str, float]:
+        """Publish all chunks for ``version``.
+
+        Returns:
+            Timing stats: total seconds and the number of chunks.
+        """
+        start = time.perf_counter()
+        chunks = split_state_dict(self.state_dict_fn())
+        in_flight: asyncio.Task | None = None
+        for name, chunk in chunks.items():
+            # Cast the next chunk while the previous one is being published
+            payload = _encode(chunk, self._dtypes)
+            if in_flight is not None:
+                await in_flight
+            in_flight = asyncio.create_task(self._put_chunk(name, payload, version))
+        if in_flight is not None:
+            await in_flight
+        return {"push_sec": time.perf_counter() - start, "num_chunks": len(chunks)}
+
+
+class WeightReceiver:
+    """Swaps published weights into a model chunk by chunk.
+
+    A chunk is copied into the model only once its version marker reaches the
+    requested version, so every layer is swapped atomically, either on the
+    old or on the new weights, while the remaining layers keep the previous
+    version until their turn.
+
+    Args:
+        state_dict: The model's state dict; its tensors are updated in place.
+        store: Store the weights are published through.
+        key: Key prefix of the published weights.
+        transfer_dtype: Default transfer dtype used by the sender.
+        linear_transfer_dtype: Transfer dtype of linear weights in layers.
+    """
+
+    def __init__(
+        self,
+        state_dict: dict[str, torch.Tensor],
+        store: WeightStore,
+        key: str = "model_state_dict",
+        transfer_dtype: torch.dtype | None = None,
+        linear_transfer_dtype: str = "",
+    ):
+        self.store = store
+        self.key = key
+        self._chunks = split_state_dict(state_dict)
+        self._dtypes = _TransferDtypes(
+            transfer_dtype,
+            _dtype(linear_transfer_dtype) if linear_transfer_dtype else None,
+        )
+        self.chunk_versions: dict[str, int] = {}
+
+    async def _pull_chunk(self, chunk: dict[str, torch.Tensor], name: str) -> None:
+        # Receive directly into the model when the dtype matches, otherwise
+        # into staging tensors that are converted afterwards
+        targets: dict[str, torch.Tensor] = {}
+        conversions: list[tuple[torch.Tensor, torch.Tensor, torch.Tensor | None]] = []
+        for param_name, tensor in chunk.items():
+            dtype = self._dtypes(param_name, tensor)
+            if dtype is None or dtype == tensor.dtype:
+                targets[param_name] = tensor
+                continue
+            staging = torch.empty_like(tensor, dtype=dtype)
+            targets[param_name] = staging
+            scale = None
+            if dtype in _FP8_DTYPES.values():
+                scale = torch.empty((), dtype=torch.float32, device=tensor.device)
+                targets[param_name + _SCALE_SUFFIX] = scale
+            conversions.append((tensor, staging, scale))
+
+        await self.store.get_state_dict(f"{self.key}/{name}", targets)
+
+        with torch.no_grad():
+            for tensor, staging, scale in conversions:
+                if scale is None:
+                    tensor.copy_(staging)
+                else:
+                    _local(tensor).copy_(_local(staging).float() * scale)
+
+    async def poll(self, version: int) -> bool:
+        """Swap in every chunk that has reached ``version`` without waiting.
+
+        Returns:
+            Whether all chunks are at ``version`` or newer.
+        """
+        done = True
+        for name, chunk in self._chunks.items():
+            if self.chunk_versions.get(name, -1) >= version:
+                continue
+            published = await self.store.get_version(f"{self.key}/{name}")
+            if published is None or published < version:
+                done = False
+                continue
+            await self._pull_chunk(chunk, name)
+            self.chunk_versions[name] = published
+        return done
+
+    async def pull(
+        self, version: int, poll_interval: float = 0.01, timeout: float = 600.0
+    ) -> None:
+        """Swap in all chunks of ``version``, as they get published."""
+        deadline = time.monotonic() + timeout
+        while not await self.poll(version):
+            if time.monotonic() > deadline:
+                pending = [
+                    name
+                    for name in self._chunks
+                    if self.chunk_versions.get(name, -1) < version
+                ]
+                raise TimeoutError(
+                    f"Timed out waiting for weights v{version} of {pending}"
+                )
+            await asyncio.sleep(poll_interval)
@@ -14,12 +14,12 @@ from torchtitan.tools.logging import logger
 
 from ..model.args import SpecialTokens
 
-from .utils.image import (
-    convert_to_patches,
-    pad_empty_images_to_target_batch_size,
-    pad_patches,
+from .utils.image import collate_image_patches, normalize_patches
+from .utils.text import (
+    build_sample_boundaries,
+    pad_input_ids_and_labels_to_target_batch_size,
+    pad_text_batch,
 )
-from .utils.text import pad_input_ids_and_labels_to_target_batch_size, pad_text_batch
 
 
 @dataclass
@@ -87,13 +87,17 @@ class MultiModalCollatorNLD:
 
     special_tokens: SpecialTokens
 
+    # Dtype of the normalized patches when images are given as uint8
+    image_dtype: torch.dtype = torch.float32
+
     def collate_images(
         self, all_images: list[torch.Tensor]
     ) -> tuple[torch.Tensor | None, torch.Tensor | None]:
         """Process a list of image tensors into patches with coordinate grids.
 
         Args:
-            all_images: list of image tensors, each of shape (T, H, W, 3)
+            all_images: list of image tensors, each of shape (T, H, W, 3).
+                uint8 images are normalized here, over the whole batch at once.
 
         Returns:
             patches: Tensor of shape (N, L, D) or None if no images
@@ -102,26 +106,18 @@ class MultiModalCollatorNLD:
         if not all_images:
             return None, None
 
-        patch_list, grid_list = [], []
-        for img in all_images:
-            # Convert single image to patches
-            patches, grids = convert_to_patches(img, patch_size=self.patch_size)
-
-            # Pad/truncate to max patches
-            patches, grids = pad_patches(patches, grids, self.max_patches_per_image)
-
-            patch_list.append(patches)
-            grid_list.append(grids)
-
-        # Stack all images
-        patches = torch.stack(patch_list)
-        grids = torch.stack(grid_list)
-
-        # Pad to max_images_per_batch with empty images
-        patches, grids = pad_empty_images_to_target_batch_size(
-            patches, grids, self.max_images_per_batch
+        # Patchify images grouped by shape, padded to max patches and to
+        # max_images_per_batch with empty images
+        patches, grids = collate_image_patches(
+            all_images,
+            patch_size=self.patch_size,
+            max_patches=self.max_patches_per_image,
+            max_images=self.max_images_per_batch,
         )
 
+        if patches.dtype == torch.uint8:
+            patches = normalize_patches(patches, grids, self.image_dtype)
+
         return patches, grids
 
     def collate_text(
@@ -181,6 +177,8 @@ class MultiModalCollatorNLD:
                 - input_ids: Tensor of shape (S)
                 - labels: Tensor of shape (L)
                 - pixel_values: list of tensors, each (1, H, W, 3)
+                - sample_lengths (optional): lengths of the samples packed
+                  into the sequence by SamplePacker
 
         Returns:
             Dictionary containing:
@@ -188,6 +186,8 @@ class MultiModalCollatorNLD:
                 - labels: Tensor of shape (B, L)
                 - pixel_values: Tensor of shape (N, L, D)
                 - grid_thw: Tensor of shape (N, L, 3)
+                - document_ids, cu_seqlens, max_seqlen: for packed samples,
+                  attention boundaries between the samples of a sequence
         """
         # Count images per sample and total images
         images_per_sample = []
@@ -223,5 +223,16 @@ class MultiModalCollatorNLD:
             "grid_thw": grids,
             "special_tokens": self.special_tokens,
         }
+        if any("sample_lengths" in sample for sample in batch):
+            input_dict.update(
+                build_sample_boundaries(
+                    [
+                        sample.get("sample_lengths", [len(sample["input_ids"])])
+                        for sample in batch
+                    ],
+                    self.seq_len,
+                    self.batch_size,
+                )
+            )
 
         return input_dict, labels
@@ -22,12 +22,14 @@ from torch.distributed.checkpoint.stateful import Stateful
 from torch.utils.data import IterableDataset
 from torchtitan.components.dataloader import ParallelAwareDataloader
 from torchtitan.components.tokenizer import BaseTokenizer, HuggingFaceTokenizer
+from torchtitan.config import TORCH_DTYPE_MAP
 from torchtitan.hf_datasets import DatasetConfig
 from torchtitan.tools.logging import logger
 
 from ..model.args import SpecialTokens
 from .mm_collator_nld import MultiModalCollatorNLD
 from .utils.image import calculate_image_tokens, process_image
+from .utils.image_fetch import ImageFetcher
 from .utils.packing import SamplePacker
 from .utils.text import process_text_with_images
 
@@ -57,7 +59,8 @@ def _process_mm_sample(
         Dict with:
             - input_ids: Tensor of token IDs
             - labels: Tensor of label IDs
-            - pixel_values: List of processed image tensors
+            - pixel_values: List of processed uint8 image tensors, normalized
+              by the collator
 
     Example:
         Interleaved format:
@@ -88,6 +91,7 @@ def _process_mm_sample(
                     patch_size=patch_size,
                     merge_size=spatial_merge_size,
                     max_patch_per_image=max_patch_per_image,
+                    normalize=False,
                 )
                 if processed_img is not None:
                     num_tokens, width, height = calculate_image_tokens(
@@ -245,6 +249,8 @@ class HuggingFaceMultiModalDataset(IterableDataset, Stateful):
         dp_rank: int = 0,
         dp_world_size: int = 1,
         infinite: bool = False,
+        image_fetcher: ImageFetcher | None = None,
+        image_prefetch_window: int = 64,
     ) -> None:
         # Force lowercase for consistent comparison
         dataset_name = dataset_name.lower()
@@ -271,11 +277,19 @@ class HuggingFaceMultiModalDataset(IterableDataset, Stateful):
                 batch_size=batch_size,
             )
         self.infinite = infinite
+        # Fetches URL images of upcoming samples ahead of processing
+        self.image_fetcher = image_fetcher
+        self.image_prefetch_window = image_prefetch_window
         self._sample_idx = 0
 
     def __iter__(self):
         while True:
-            for sample in self._get_data_iter():
+            data_iter = self._get_data_iter()
+            if self.image_fetcher is not None:
+                data_iter = self.image_fetcher.prefetch(
+                    data_iter, window=self.image_prefetch_window
+                )
+            for sample in data_iter:
                 try:
                     self._sample_idx += 1
 
@@ -352,21 +366,14 @@ class HuggingFaceMultiModalDataset(IterableDataset, Stateful):
             and hasattr(self, "packer")
             and "packer_state" in state_dict
         ):
-            packer_state = state_dict["packer_state"]
-            self.packer.sample_buffer.clear()
-            self.packer.packed_samples.clear()
-            self.packer.sample_buffer.extend(packer_state["sample_buffer"])
-            self.packer.packed_samples.extend(packer_state["packed_samples"])
+            self.packer.load_state_dict(state_dict["packer_state"])
 
     def state_dict(self):
         state = {"sample_idx": self._sample_idx}
 
         # Save packer state if packing is enabled
         if self.enable_packing and hasattr(self, "packer"):
-            state["packer_state"] = {
-                "sample_buffer": list(self.packer.sample_buffer),
-                "packed_samples": list(self.packer.packed_samples),
-            }
+            state["packer_state"] = self.packer.state_dict()
 
         return state
 
@@ -397,6 +404,22 @@ class HuggingFaceMultiModalDataLoader(ParallelAwareDataloader):
         packing_buffer_size: int = 0
         """Set >0 to enable sample packing buffer."""
 
+        image_dtype: str = "float32"
+        """Dtype of the normalized pixel values. Images are kept in uint8 through
+        decoding, resizing and patchifying, and normalized once per batch by the collator."""
+
+        image_fetch_workers: int = 0
+        """Number of concurrent fetches of URL images (e.g. OBELICS), per dataloader worker.
+        Set >0 to fetch the images of upcoming samples ahead of processing them,
+        0 fetches each image when its sample is processed."""
+
+        image_prefetch_window: int = 64
+        """Number of upcoming samples whose URL images are fetched ahead."""
+
+        image_cache_dir: str | None = None
+        """Local directory (e.g. on NVMe) caching fetched URL images, shared by the
+        ranks on a node and reused across epochs. Requires image_fetch_workers > 0."""
+
     def __init__(
         self,
         config: Config,
@@ -425,6 +448,15 @@ class HuggingFaceMultiModalDataLoader(ParallelAwareDataloader):
             dp_rank=dp_rank,
             dp_world_size=dp_world_size,
             infinite=config.infinite,
+            image_fetcher=(
+                ImageFetcher(
+                    max_workers=config.image_fetch_workers,
+                    cache_dir=config.image_cache_dir,
+                )
+                if config.image_fetch_workers > 0
+                else None
+            ),
+            image_prefetch_window=config.image_prefetch_window,
         )
 
         collate_fn = MultiModalCollatorNLD(
@@ -434,6 +466,7 @@ class HuggingFaceMultiModalDataLoader(ParallelAwareDataloader):
             max_images_per_batch=config.max_images_per_batch,
             max_patches_per_image=config.max_patches_per_image,
             special_tokens=special_tokens,
+            image_dtype=TORCH_DTYPE_MAP[config.image_dtype],
         )
 
         dataloader_kwargs = {
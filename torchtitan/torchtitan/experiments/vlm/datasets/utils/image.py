@@ -18,6 +18,25 @@ from PIL import Image
 
 from torchtitan.tools.logging import logger
 
+try:
+    # SIMD (libjpeg-turbo) JPEG decoder, used for JPEG bytes when installed
+    import simplejpeg
+
+    _HAS_SIMPLEJPEG = True
+except ImportError:
+    _HAS_SIMPLEJPEG = False
+
+# CLIP normalization
+CLIP_MEAN = (0.48145466, 0.4578275, 0.40821073)
+CLIP_STD = (0.26862954, 0.26130258, 0.27577711)
+
+
+def _decode_image(data: bytes) -> Image.Image:
+    """Decode image bytes, with simplejpeg for JPEGs when it is available."""
+    if _HAS_SIMPLEJPEG and simplejpeg.is_jpeg(data):
+        return Image.fromarray(simplejpeg.decode_jpeg(data, colorspace="RGB"))
+    return Image.open(BytesIO(data))
+
 
 def process_image(
     image: str | bytes | Image.Image,
@@ -25,8 +44,9 @@ def process_image(
     merge_size: int = 1,
     max_patch_per_image: int = 256,
     min_patch_per_image: int = 1,
+    normalize: bool = True,
 ) -> torch.Tensor | None:
-    """Process a single image into normalized tensor format.
+    """Process a single image into tensor format.
 
     Args:
         image: PIL Image, bytes, or URL string
@@ -34,6 +54,8 @@ def process_image(
         merge_size: Spatial Merge size factor
         max_patch_per_image: Maximum patches allowed per image
         min_dimension: Minimum dimension for width/height
+        normalize: If False, return the raw uint8 pixels and leave the
+            normalization to ``normalize_patches`` at collate time
 
     Returns:
         Tensor of shape (1, H, W, 3) or None if processing fails
@@ -47,9 +69,9 @@ def process_image(
         # Convert various input formats to PIL Image
         if isinstance(image, str) and image.startswith("http"):
             response = requests.get(image, timeout=10)
-            image = Image.open(BytesIO(response.content))
+            image = _decode_image(response.content)
         elif isinstance(image, bytes):
-            image = Image.open(BytesIO(image))
+            image = _decode_image(image)
         elif isinstance(image, str):
             image = Image.open(image)
 
@@ -65,23 +87,51 @@ def process_image(
             min_patch_per_image=min_patch_per_image,
         )
 
-        # Convert to numpy and normalize
-        img_array = np.array(image)
-        img_array = img_array / 255.0
-
-        # CLIP normalization
-        mean = np.array([0.48145466, 0.4578275, 0.40821073])
-        std = np.array([0.26862954, 0.26130258, 0.27577711])
-        img_array = (img_array - mean) / std
-
-        # Convert to tensor (1, H, W, 3) with dummy temporal dim
-        return torch.from_numpy(img_array).float().unsqueeze(0)
+        # Convert to uint8 tensor (1, H, W, 3) with dummy temporal dim
+        pixels = torch.from_numpy(np.array(image)).unsqueeze(0)
+        if not normalize:
+            return pixels
+        return _normalize(pixels, torch.float32)
 
     except Exception as e:
         logger.warning(f"Error processing image: {e}")
         return None
 
 
+def _normalize(pixels: torch.Tensor, dtype: torch.dtype) -> torch.Tensor:
+    """Map uint8 RGB values to CLIP-normalized ``dtype`` values.
+
+    ``(x / 255 - mean) / std`` is folded into a single ``x * scale + bias``
+    over the trailing channel dimension.
+    """
+    std = torch.tensor(CLIP_STD, dtype=torch.float32)
+    scale = 1.0 / (255.0 * std)
+    bias = -torch.tensor(CLIP_MEAN, dtype=torch.float32) / std
+    out = torch.addcmul(bias.to(pixels.device), pixels, scale.to(pixels.device))
+    return out.to(dtype)
+
+
+def normalize_patches(
+    patches: torch.Tensor,
+    grids: torch.Tensor,
+    dtype: torch.dtype = torch.float32,
+) -> torch.Tensor:
+    """Normalize a batch of uint8 image patches in one pass.
+
+    Args:
+        patches: uint8 patches of shape (N, L, D), with channels last in D
+        grids: patch coordinates of shape (N, L, 3), all -1 at padding positions
+        dtype: output dtype, e.g. torch.float32 or torch.bfloat16
+
+    Returns:
+        Normalized patches of shape (N, L, D), zero at padding positions
+    """
+    N, L, D = patches.shape
+    out = _normalize(patches.view(N, L, D // 3, 3), dtype).view(N, L, D)
+    # Padding patches stay zero, as when padding normalized images
+    return out.masked_fill_((grids[..., :1] == -1), 0)
+
+
 def _smart_resize(
     height: int,
     width: int,
@@ -249,6 +299,75 @@ def convert_to_patches(
     return patches, grid
 
 
+def collate_image_patches(
+    images: list[torch.Tensor],
+    patch_size: int,
+    max_patches: int,
+    max_images: int,
+    temporal_patch_size: int = 1,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Patchify and pad a list of images into preallocated batch tensors.
+
+    Same output as ``convert_to_patches``, ``pad_patches`` and
+    ``pad_empty_images_to_target_batch_size`` applied image by image, but the
+    coordinate grid is built once per image shape, and every image is copied
+    once, through a patch view, directly into the preallocated output.
+
+    Args:
+        images: list of image tensors, each of shape (T, H, W, C)
+        patch_size: Spatial patch size (height and width)
+        max_patches: Number of patches per image after padding (L)
+        max_images: Minimum number of images after padding with blank images
+        temporal_patch_size: Temporal patch size
+
+    Returns:
+        patches: Tensor of shape (N, L, D), zero at padding positions
+        grids: Tensor of shape (N, L, 3) of (t, h, w) patch coordinates, -1 at
+            padding positions
+    """
+    ps, ts = patch_size, temporal_patch_size
+    C = images[0].shape[-1]
+    D = ts * ps * ps * C
+    N = max(len(images), max_images)
+    patches = torch.zeros(N, max_patches, D, dtype=images[0].dtype)
+    grids = torch.full((N, max_patches, 3), -1, dtype=torch.long)
+
+    groups: dict[tuple[int, ...], list[int]] = {}
+    for idx, img in enumerate(images):
+        groups.setdefault(tuple(img.shape), []).append(idx)
+
+    for (T, H, W, _), indices in groups.items():
+        if T % ts != 0:
+            raise ValueError(
+                f"Temporal dimension {T} must be divisible by temporal_patch_size {ts}"
+            )
+        if H % ps != 0 or W % ps != 0:
+            raise ValueError(
+                f"Spatial dimensions {H},{W} must be divisible by patch_size {ps}"
+            )
+        t, h, w = T // ts, H // ps, W // ps
+        L = t * h * w
+        if L > max_patches:
+            raise ValueError(
+                f"Image with {L} patches exceeds max_patches {max_patches}"
+            )
+
+        coords = torch.meshgrid(
+            torch.arange(t), torch.arange(h), torch.arange(w), indexing="ij"
+        )
+        grids[torch.tensor(indices), :L] = torch.stack(coords, dim=-1).view(L, 3)
+
+        # Copy each image straight into its output rows through a patch view:
+        # [t*pt, h*ph, w*pw, c] -> [t, h, w, pt, ph, pw, c] == [t*h*w, pt*ph*pw*c].
+        # Stacking the group first would add a full copy of the images.
+        for idx in indices:
+            patches[idx, :L].view(t, h, w, ts, ps, ps, C).copy_(
+                images[idx].view(t, ts, h, ps, w, ps, C).permute(0, 2, 4, 1, 3, 5, 6)
+            )
+
+    return patches, grids
+
+
 def pad_patches(
     patches: torch.Tensor,
     grids: torch.Tensor,
@@ -268,7 +387,9 @@ def pad_patches(
     elif L < max_patches:
         # Pad
         pad_len = max_patches - L
-        zero_patches = torch.zeros(pad_len, D, device=patches.device)
+        zero_patches = torch.zeros(
+            pad_len, D, dtype=patches.dtype, device=patches.device
+        )
         invalid_grids = torch.full((pad_len, 3), -1, device=grids.device)
         return (
             torch.cat([patches, zero_patches], 0),
@@ -293,7 +414,9 @@ def pad_empty_images_to_target_batch_size(
         return patches, grids
 
     blank_count = max_images - N
-    blank_patches = torch.zeros(blank_count, L, D, device=patches.device)
+    blank_patches = torch.zeros(
+        blank_count, L, D, dtype=patches.dtype, device=patches.device
+    )
     blank_grids = torch.full((blank_count, L, 3), -1, device=grids.device)
     return (
         torch.cat([patches, blank_patches], dim=0),
@@ -0,0 +1,255 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Concurrent fetching and on-disk caching of URL images in multimodal datasets."""
+
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from torchtitan.tools.logging import logger
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    # Unique temp name, as several ranks on the node may write the same entry
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ImageCache:
+    """Content-addressed on-disk cache of fetched image bytes.
+
+    Image bytes are stored once under ``blobs/<sha256 of content>``, and
+    ``urls/<sha256 of url>`` records which blob a URL resolved to. Writes are
+    atomic renames, so the cache can be shared by all ranks on a node, e.g.
+    on local NVMe.
+
+    Args:
+        cache_dir (str): Directory of the cache.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, "urls"), exist_ok=True)
+
+    def _url_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, "urls", _sha256(url.encode()))
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, "blobs", digest)
+
+    def get(self, url: str) -> bytes | None:
+        try:
+            with open(self._url_path(url)) as f:
+                digest = f.read()
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url: str, data: bytes) -> None:
+        digest = _sha256(data)
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            _atomic_write(blob_path, data)
+        _atomic_write(self._url_path(url), digest.encode())
+
+
+class ImageFetcher:
+    """Fetches URL images concurrently, with an optional on-disk cache.
+
+    Fetches run on a thread pool of ``max_workers`` threads sharing one
+    ``requests.Session`` whose connection pool is bounded to the same size.
+    The pool and session are created lazily, so that each dataloader worker
+    process builds its own.
+
+    Counters of cache hits, network fetches, failures and fetch latency are
+    kept in :attr:`stats` and logged every ``log_freq`` images.
+
+    Args:
+        max_workers (int): Number of concurrent fetches.
+        cache_dir (str | None): Directory of the :class:`ImageCache`, or None
+            to disable caching.
+        timeout (float): Timeout of a single request in seconds.
+        log_freq (int): Log the counters every ``log_freq`` images, 0 to disable.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        cache_dir: str | None = None,
+        timeout: float = 10.0,
+        log_freq: int = 1000,
+    ):
+        self.max_workers = max_workers
+        self.cache = ImageCache(cache_dir) if cache_dir else None
+        self.timeout = timeout
+        self.log_freq = log_freq
+        self.stats = {
+            "cache_hits": 0,
+            "fetches": 0,
+            "failures": 0,
+            "fetch_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._session: requests.Session | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Locks, threads and sessions are not picklable, and are rebuilt lazily
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        state["_executor"] = None
+        state["_session"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _get_session(self) -> requests.Session:
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.max_workers, pool_maxsize=self.max_workers
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def _record(
+        self, cache_hit: bool, fetch_seconds: float = 0.0, failed: bool = False
+    ) -> None:
+        with self._lock:
+            if cache_hit:
+                self.stats["cache_hits"] += 1
+            else:
+                self.stats["fetches"] += 1
+                self.stats["fetch_seconds"] += fetch_seconds
+                self.stats["failures"] += int(failed)
+            total = self.stats["cache_hits"] + self.stats["fetches"]
+            if self.log_freq and total % self.log_freq == 0:
+                logger.info(f"Image fetcher: {self.summary()}")
+
+    def summary(self) -> str:
+        stats = self.stats
+        total = stats["cache_hits"] + stats["fetches"]
+        hit_rate = stats["cache_hits"] / total if total else 0.0
+        latency_ms = (
+            stats["fetch_seconds"] / stats["fetches"] * 1e3 if stats["fetches"] else 0
+        )
+        return (
+            f"{total} images, cache hit rate {hit_rate:.1%}, "
+            f"mean fetch latency {latency_ms:.1f}ms, {stats['failures']} failures"
+        )
+
+    def fetch(self, url: str) -> bytes | None:
+        """Returns the bytes of ``url`` from the cache or the network, or None on failure."""
+        if self.cache is not None:
+            data = self.cache.get(url)
+            if data is not None:
+                self._record(cache_hit=True)
+                return data
+
+        start = time.perf_counter()
+        try:
+            response = self._get_session().get(url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.content
+        except Exception as e:
+            logger.warning(f"Error fetching image {url}: {e}")
+            data = None
+        self._record(
+            cache_hit=False,
+            fetch_seconds=time.perf_counter() - start,
+            failed=data is None,
+        )
+        if data is None:
+            return None
+
+        if self.cache is not None:
+            self.cache.put(url, data)
+        return data
+
+    def submit(self, url: str) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="image_fetch"
+            )
+        return self._executor.submit(self.fetch, url)
+
+    def prefetch(
+        self, samples: Iterable[dict[str, Any]], window: int = 64
+    ) -> Iterator[dict[str, Any]]:
+        """Yields ``samples`` with their URL images replaced by the fetched bytes.
+
+        URL images of the next ``window`` samples are fetched concurrently
+        while earlier samples are being consumed. Images that could not be
+        fetched are replaced by empty bytes, which fail image processing as a
+        failed blocking fetch would.
+        """
+        pending: deque[tuple[dict[str, Any], dict[str, Future]]] = deque()
+
+        def resolve(sample, futures):
+            if not futures:
+                return sample
+            fetched = {url: future.result() or b"" for url, future in futures.items()}
+            return _replace_urls(sample, fetched)
+
+        for sample in samples:
+            futures = {url: self.submit(url) for url in _image_urls(sample)}
+            pending.append((sample, futures))
+            if len(pending) >= window:
+                yield resolve(*pending.popleft())
+        while pending:
+            yield resolve(*pending.popleft())
+
+
+# Sample fields holding text, which are never fetched
+_TEXT_KEYS = ("text", "texts", "txt", "caption")
+
+
+def _is_url(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(("http://", "https://"))
+
+
+def _image_urls(sample: dict[str, Any]) -> list[str]:
+    """URL images of a sample, either single values or in lists (e.g. OBELICS ``images``)."""
+    urls = []
+    for key, value in sample.items():
+        if key in _TEXT_KEYS:
+            continue
+        values = value if isinstance(value, list) else [value]
+        urls.extend(v for v in values if _is_url(v))
+    return urls
+
+
+def _replace_urls(sample: dict[str, Any], fetched: dict[str, bytes]) -> dict[str, Any]:
+    sample = dict(sample)
+    for key, value in sample.items():
+        if key in _TEXT_KEYS:
+            continue
+        if isinstance(value, list):
+            sample[key] = [fetched.get(v, v) if _is_url(v) else v for v in value]
+        elif _is_url(value) and value in fetched:
+            sample[key] = fetched[value]
+    return sample
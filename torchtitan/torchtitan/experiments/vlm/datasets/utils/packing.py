@@ -6,6 +6,7 @@
 
 """Utilities for efficient sample packing in multimodal datasets."""
 
+import bisect
 from collections import deque
 from typing import Any
 
@@ -14,36 +15,69 @@ from torchtitan.tools.logging import logger
 
 
 class SamplePacker:
-    """Packs multiple samples together to maximize sequence length utilization."""
+    """Packs multiple samples together to maximize sequence length utilization.
+
+    Every ``buffer_size`` samples, the buffered samples are packed with
+    best-fit decreasing: longest first, each into the open sequence with the
+    least remaining space that still fits it. The ``max_open_sequences`` least
+    filled sequences stay open for the next window instead of being emitted
+    with a large empty tail, so packing effectively runs over a streaming
+    window.
+
+    Packed samples carry ``sample_lengths``, the length of each sample in
+    order, from which the collator builds per-sample attention boundaries.
+    :attr:`fill_rate` reports the fraction of emitted sequence capacity that
+    holds tokens.
+    """
 
     def __init__(
         self,
         max_seq_length: int,
         buffer_size: int = 100,
         batch_size: int = 8,
+        max_open_sequences: int | None = None,
+        log_freq: int = 1000,
     ):
         self.max_seq_length = max_seq_length
         self.buffer_size = buffer_size
         self.batch_size = batch_size
+        self.max_open_sequences = (
+            batch_size if max_open_sequences is None else max_open_sequences
+        )
+        self.log_freq = log_freq
 
         # Initialize buffers
         self.sample_buffer: deque = deque()
+        # Sequences being filled, each a list of samples
+        self.open_sequences: list[list[dict[str, Any]]] = []
         self.packed_samples: deque = deque()
 
-    def _pack_buffered_samples(self) -> list[dict[str, Any]]:
-        """Pack buffered samples into optimal sequences."""
-        if not self.sample_buffer:
-            return []
+        # Fill rate counters over emitted sequences
+        self.packed_tokens = 0
+        self.num_packed_sequences = 0
+
+    @property
+    def fill_rate(self) -> float:
+        """Fraction of the emitted sequences' capacity holding sample tokens."""
+        capacity = self.num_packed_sequences * self.max_seq_length
+        return self.packed_tokens / capacity if capacity else 0.0
 
+    def _pack_buffered_samples(self, flush: bool = False) -> None:
+        """Pack buffered samples into open sequences and emit the fullest ones.
+
+        With ``flush``, all open sequences are emitted.
+        """
         # Sort samples by length for better packing
         samples = sorted(
             self.sample_buffer, key=lambda x: len(x["input_ids"]), reverse=True
         )
+        self.sample_buffer.clear()
 
-        packed_sequences = []
-        current_sequence = []
-        current_length = 0
-
+        # Open sequences sorted by remaining space, for best-fit lookup
+        remaining = sorted(
+            (self.max_seq_length - _length(seq), idx)
+            for idx, seq in enumerate(self.open_sequences)
+        )
         for sample in samples:
             sample_length = len(sample["input_ids"])
 
@@ -55,52 +89,43 @@ class SamplePacker:
                 )
                 continue
 
-            # Check if adding this sample would exceed max length
-            if current_sequence and (
-                current_length + sample_length > self.max_seq_length
-            ):
-                # Current sequence is full, create packed sample
-                packed_sequences.append(
-                    {
-                        "input_ids": torch.cat(
-                            [s["input_ids"] for s in current_sequence]
-                        ),
-                        "labels": torch.cat([s["labels"] for s in current_sequence]),
-                        "pixel_values": [
-                            img for s in current_sequence for img in s["pixel_values"]
-                        ],
-                    }
-                )
-                current_sequence = []
-                current_length = 0
-
-            # Add sample to current sequence
-            current_sequence.append(sample)
-            current_length += sample_length
-
-        # Handle remaining sequence
-        if current_sequence:
-            packed_sequences.append(
-                {
-                    "input_ids": torch.cat([s["input_ids"] for s in current_sequence]),
-                    "labels": torch.cat([s["labels"] for s in current_sequence]),
-                    "pixel_values": [
-                        img for s in current_sequence for img in s["pixel_values"]
-                    ],
-                }
-            )
-
-        # Clear buffer
-        self.sample_buffer.clear()
-        return packed_sequences
+            pos = bisect.bisect_left(remaining, (sample_length, -1))
+            if pos < len(remaining):
+                space, idx = remaining.pop(pos)
+            else:
+                space, idx = self.max_seq_length, len(self.open_sequences)
+                self.open_sequences.append([])
+            self.open_sequences[idx].append(sample)
+            bisect.insort(remaining, (space - sample_length, idx))
+
+        # Keep the least filled sequences open for the next window
+        num_open = 0 if flush else self.max_open_sequences
+        by_fill = [idx for _, idx in remaining]
+        keep = set(by_fill[len(by_fill) - num_open :]) if num_open else set()
+        for idx, sequence in enumerate(self.open_sequences):
+            if idx not in keep:
+                self.packed_samples.append(self._concat(sequence))
+        self.open_sequences = [self.open_sequences[idx] for idx in sorted(keep)]
+
+    def _concat(self, sequence: list[dict[str, Any]]) -> dict[str, Any]:
+        sample_lengths = [len(s["input_ids"]) for s in sequence]
+        self.packed_tokens += sum(sample_lengths)
+        self.num_packed_sequences += 1
+        if self.log_freq and self.num_packed_sequences % self.log_freq == 0:
+            logger.info(f"Sample packing fill rate: {self.fill_rate:.1%}")
+        return {
+            "input_ids": torch.cat([s["input_ids"] for s in sequence]),
+            "labels": torch.cat([s["labels"] for s in sequence]),
+            "pixel_values": [img for s in sequence for img in s["pixel_values"]],
+            "sample_lengths": sample_lengths,
+        }
 
     def add_sample(self, sample: dict[str, Any]) -> None:
         """Add a sample to the buffer."""
         self.sample_buffer.append(sample)
 
         if len(self.sample_buffer) >= self.buffer_size:
-            packed = self._pack_buffered_samples()
-            self.packed_samples.extend(packed)
+            self._pack_buffered_samples()
 
     def has_batch_ready(self) -> bool:
         """Check if a full batch is ready."""
@@ -110,9 +135,8 @@ class SamplePacker:
         """Get next batch of packed samples if available."""
         if not self.has_batch_ready():
             # Try to pack any remaining samples
-            if self.sample_buffer:
-                packed = self._pack_buffered_samples()
-                self.packed_samples.extend(packed)
+            if self.sample_buffer or self.open_sequences:
+                self._pack_buffered_samples(flush=True)
 
             if not self.has_batch_ready():
                 return None
@@ -124,3 +148,19 @@ class SamplePacker:
             batch.append(self.packed_samples.popleft())
 
         return batch
+
+    def state_dict(self) -> dict[str, Any]:
+        return {
+            "sample_buffer": list(self.sample_buffer),
+            "open_sequences": list(self.open_sequences),
+            "packed_samples": list(self.packed_samples),
+        }
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        self.sample_buffer = deque(state_dict["sample_buffer"])
+        self.open_sequences = list(state_dict.get("open_sequences", []))
+        self.packed_samples = deque(state_dict["packed_samples"])
+
+
+def _length(sequence: list[dict[str, Any]]) -> int:
+    return sum(len(s["input_ids"]) for s in sequence)
@@ -4,6 +4,8 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+from typing import Any
+
 import torch
 
 
@@ -139,3 +141,45 @@ def process_text_with_images(
     # Join all parts with spaces and add EOS if needed
     result = "".join(parts)
     return result.strip() + (tokenizer.eos_token if add_eos else "")
+
+
+def build_sample_boundaries(
+    sample_lengths: list[list[int]],
+    seq_len: int,
+    target_batch_size: int,
+) -> dict[str, Any]:
+    """Build attention metadata that keeps packed samples apart.
+
+    Args:
+        sample_lengths: For each row, the lengths of the samples packed into it
+        seq_len: Sequence length of the model inputs
+        target_batch_size: Batch size after padding
+
+    Returns:
+        Dictionary containing:
+            - document_ids: Tensor of shape (B, seq_len) with the index of the
+              sample each token belongs to, padding being one more sample
+            - cu_seqlens: int32 cumulative sample lengths over the flattened batch
+            - max_seqlen: Length of the longest sample, as a Python int
+    """
+    document_ids = torch.zeros(target_batch_size, seq_len, dtype=torch.int32)
+    for row, lengths in enumerate(sample_lengths):
+        ids = torch.repeat_interleave(
+            torch.arange(len(lengths) + 1, dtype=torch.int32),
+            torch.tensor([*lengths, max(seq_len - sum(lengths), 0)]),
+        )
+        document_ids[row] = ids[:seq_len]
+
+    starts = torch.ones_like(document_ids, dtype=torch.bool)
+    starts[:, 1:] = document_ids[:, 1:] != document_ids[:, :-1]
+    cu_seqlens = torch.cat(
+        [
+            starts.flatten().nonzero(as_tuple=True)[0].to(torch.int32),
+            torch.tensor([document_ids.numel()], dtype=torch.int32),
+        ]
+    )
+    return {
+        "document_ids": document_ids,
+        "cu_seqlens": cu_seqlens,
+        "max_seqlen": int(torch.diff(cu_seqlens).max().item()),
+    }
@@ -10,17 +10,30 @@ from functools import partial
 from typing import Any
 
 import torch
-from datasets import Dataset, load_dataset
-from datasets.distributed import split_dataset_by_node
 from torch.distributed.checkpoint.stateful import Stateful
-from torch.utils.data import IterableDataset
+from torch.utils.data import default_collate, IterableDataset
 
 from torchtitan.components.dataloader import ParallelAwareDataloader
 from torchtitan.components.tokenizer import BaseTokenizer
 from torchtitan.hf_datasets import DatasetConfig
+from torchtitan.models.common.attention import (
+    build_varlen_metadata_inputs,
+    get_document_ids,
+)
 from torchtitan.tools.logging import logger
 
 
+def load_dataset(*args, **kwargs):
+    """``datasets.load_dataset``, importing ``datasets`` only once a dataset is loaded.
+
+    ``datasets`` takes about a second to import, which every rank would pay at
+    startup even when training on another dataset.
+    """
+    import datasets
+
+    return datasets.load_dataset(*args, **kwargs)
+
+
 def _load_c4_dataset(dataset_path: str, split: str):
     """Load C4 dataset with default configuration."""
     return load_dataset(dataset_path, name="en", split=split, streaming=True)
@@ -170,8 +183,13 @@ class HuggingFaceTextDataset(IterableDataset, Stateful):
         )
         ds = dataset_loader(path)
 
+        from datasets import Dataset
+        from datasets.distributed import split_dataset_by_node
+
         self.dataset_name = dataset_name
         self._data = split_dataset_by_node(ds, dp_rank, dp_world_size)
+        # Map-style datasets resume by index, iterable ones from their own state
+        self._is_map_style = isinstance(self._data, Dataset)
         self._tokenizer = tokenizer
         self.seq_len = seq_len
         self.infinite = infinite
@@ -185,7 +203,7 @@ class HuggingFaceTextDataset(IterableDataset, Stateful):
     def _get_data_iter(self):
         # For map-style datasets, resume by skipping to the correct index
         # For iterable-style datasets, the underlying iterator already points to the correct index
-        if isinstance(self._data, Dataset):
+        if self._is_map_style:
             if self._sample_idx == len(self._data):
                 return iter([])
             else:
@@ -234,7 +252,7 @@ class HuggingFaceTextDataset(IterableDataset, Stateful):
                 self._sample_idx = 0
                 logger.warning(f"Dataset {self.dataset_name} is being re-looped")
                 # Ensures re-looping a dataset loaded from a checkpoint works correctly
-                if not isinstance(self._data, Dataset):
+                if not self._is_map_style:
                     if hasattr(self._data, "set_epoch") and hasattr(
                         self._data, "epoch"
                     ):
@@ -252,7 +270,7 @@ class HuggingFaceTextDataset(IterableDataset, Stateful):
             )
         self._position_buffer = state_dict.get("position_buffer", [])
 
-        if isinstance(self._data, Dataset):
+        if self._is_map_style:
             self._sample_idx = state_dict["sample_idx"]
         else:
             assert "data" in state_dict
@@ -264,7 +282,7 @@ class HuggingFaceTextDataset(IterableDataset, Stateful):
             "position_buffer": self._position_buffer,
         }
 
-        if isinstance(self._data, Dataset):
+        if self._is_map_style:
             _state_dict["sample_idx"] = self._sample_idx
         else:
             # Save the iterable dataset's state to later efficiently resume from it
@@ -274,6 +292,21 @@ class HuggingFaceTextDataset(IterableDataset, Stateful):
         return _state_dict
 
 
+def _collate_with_attention_metadata(
+    batch: list[tuple[dict[str, torch.Tensor], torch.Tensor]],
+    eos_id: int,
+    varlen_metadata: bool = False,
+    document_ids: bool = False,
+) -> tuple[dict[str, Any], torch.Tensor]:
+    """Default collate plus attention metadata computed in the worker."""
+    input_dict, labels = default_collate(batch)
+    if varlen_metadata:
+        input_dict.update(build_varlen_metadata_inputs(input_dict["input"], eos_id))
+    if document_ids:
+        input_dict["document_ids"] = get_document_ids(input_dict["input"], eos_id)
+    return input_dict, labels
+
+
 class HuggingFaceTextDataLoader(ParallelAwareDataloader):
     """Configurable text dataloader that wraps HuggingFaceTextDataset.
 
@@ -289,6 +322,22 @@ class HuggingFaceTextDataLoader(ParallelAwareDataloader):
         infinite: bool = True
         """Whether to loop the dataset infinitely"""
 
+        precompute_varlen_metadata: bool = False
+        """
+        Compute ``cu_seqlens`` and ``max_seqlen`` for varlen attention in the
+        dataloader workers and ship them with the batch, so the training step
+        does not sync with the host to build them. Only useful with
+        ``attn_backend="varlen"``.
+        """
+
+        precompute_document_ids: bool = False
+        """
+        Ship the document index of every token with the batch so that flex
+        attention document masks are built from this compact metadata instead
+        of scanning token ids for EOS on the training rank. Only useful with
+        ``attn_backend="flex"`` and ``attn_mask_type="block_causal"``.
+        """
+
     def __init__(
         self,
         config: Config,
@@ -317,6 +366,14 @@ class HuggingFaceTextDataLoader(ParallelAwareDataloader):
             "prefetch_factor": config.prefetch_factor,
             "batch_size": local_batch_size,
         }
+        if config.precompute_varlen_metadata or config.precompute_document_ids:
+            assert tokenizer.eos_id is not None
+            dataloader_kwargs["collate_fn"] = partial(
+                _collate_with_attention_metadata,
+                eos_id=tokenizer.eos_id,
+                varlen_metadata=config.precompute_varlen_metadata,
+                document_ids=config.precompute_document_ids,
+            )
 
         super().__init__(
             hf_ds,
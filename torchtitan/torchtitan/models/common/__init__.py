@@ -5,11 +5,15 @@
 # LICENSE file in the root directory of this source tree.
 
 from .attention import (
+    ATTENTION_METADATA_KEYS,
+    build_varlen_metadata_inputs,
     create_attention_mask,
     create_varlen_metadata_for_document,
     FlexAttentionWrapper,
     get_causal_mask_mod,
+    get_document_ids,
     get_document_mask_mod,
+    get_document_start_mask,
     get_fixed_block_mask_mod,
     get_sliding_window_mask_mod,
     GQAttention,
@@ -31,6 +35,8 @@ from .rope import (
 )
 
 __all__ = [
+    "ATTENTION_METADATA_KEYS",
+    "build_varlen_metadata_inputs",
     "create_attention_mask",
     "create_varlen_metadata_for_document",
     "Decoder",
@@ -38,7 +44,9 @@ __all__ = [
     "FeedForward",
     "FlexAttentionWrapper",
     "get_causal_mask_mod",
+    "get_document_ids",
     "get_document_mask_mod",
+    "get_document_start_mask",
     "get_fixed_block_mask_mod",
     "get_sliding_window_mask_mod",
     "GQAttention",
@@ -13,7 +13,7 @@ os.environ.setdefault("DISABLE_LLVM_OPT", "1")
 from collections.abc import Callable, Generator
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import ClassVar, NamedTuple
+from typing import Any, ClassVar, NamedTuple
 
 import torch
 import torch.nn.functional as F
@@ -41,16 +41,20 @@ from torchtitan.protocols.module import Module
 
 
 __all__ = [
+    "ATTENTION_METADATA_KEYS",
     "FlexAttentionWrapper",
     "GQAttention",
     "LocalMapAttention",
     "ScaledDotProductAttentionWrapper",
     "VarlenAttentionWrapper",
     "VarlenMetadata",
+    "build_varlen_metadata_inputs",
     "create_attention_mask",
     "create_varlen_metadata_for_document",
     "get_causal_mask_mod",
+    "get_document_ids",
     "get_document_mask_mod",
+    "get_document_start_mask",
     "get_fixed_block_mask_mod",
     "get_sliding_window_mask_mod",
 ]
@@ -70,6 +74,11 @@ class VarlenMetadata(NamedTuple):
 
 AttentionMasksType = dict[str, BlockMask] | BlockMask | VarlenMetadata
 
+# Keys of the dataloader ``input_dict`` that carry attention metadata
+# precomputed in the dataloader workers. They are consumed by
+# ``get_attention_masks`` and must not be passed to the model forward.
+ATTENTION_METADATA_KEYS = ("cu_seqlens", "max_seqlen", "document_ids")
+
 
 class LocalMapAttention(Module):
     """Base class for inner attention wrappers with DTensor support.
@@ -356,22 +365,24 @@ def get_causal_mask_mod() -> _mask_mod_signature:
     return _causal_mask
 
 
-def get_document_mask_mod(batch: torch.Tensor, eos_id: int) -> _mask_mod_signature:
+def get_document_mask_mod(
+    batch: torch.Tensor, eos_id: int, document_ids: torch.Tensor | None = None
+) -> _mask_mod_signature:
     """Creates a document mask that prevents attention across document boundaries.
 
     Args:
         batch: Input batch tensor with shape [b, s, h, d]
         eos_id: End-of-sequence token ID that marks document boundaries
+        document_ids: Optional precomputed document index of every token with
+            shape [b, s], e.g. shipped by the dataloader. When given, ``batch``
+            is not scanned for EOS tokens.
 
     Returns:
         A mask modifier function that implements document-level masking.
     """
-    # batch is [b, s, h, d] shape
-    eos_mask = batch == eos_id
-    eos_mask[:, -1] = True
-    cumulative_mask = torch.cumsum(torch.where(eos_mask, 1, 0), dim=1)
-    sequence_indices = torch.zeros_like(cumulative_mask, dtype=torch.int32)
-    sequence_indices[:, 1:] = cumulative_mask[:, :-1]
+    if document_ids is None:
+        document_ids = get_document_ids(batch, eos_id)
+    sequence_indices = document_ids
 
     def document_mask(
         b: torch.Tensor, h: torch.Tensor, q_idx: torch.Tensor, kv_idx: torch.Tensor
@@ -446,63 +457,103 @@ def create_attention_mask(*args, **kwargs):
     return _compiled_create_block_mask(*args, **kwargs)
 
 
+def get_document_start_mask(input_batch: torch.Tensor, eos_id: int) -> torch.Tensor:
+    """Marks the first token of every document in a packed batch.
+
+    A document starts at position 0 of every row and right after every EOS
+    token, so an EOS at the last position of a row does not open a new one.
+
+    Args:
+        input_batch: Token ids with shape [b, s]
+        eos_id: End-of-sequence token ID that marks document boundaries
+
+    Returns:
+        A bool tensor with shape [b, s] that is True at document starts.
+    """
+    starts = torch.ones_like(input_batch, dtype=torch.bool)
+    starts[:, 1:] = input_batch[:, :-1] == eos_id
+    return starts
+
+
+def get_document_ids(input_batch: torch.Tensor, eos_id: int) -> torch.Tensor:
+    """Returns the index of the document each token belongs to within its row.
+
+    Args:
+        input_batch: Token ids with shape [b, s]
+        eos_id: End-of-sequence token ID that marks document boundaries
+
+    Returns:
+        An int32 tensor with shape [b, s].
+    """
+    starts = get_document_start_mask(input_batch, eos_id)
+    return torch.cumsum(starts, dim=1, dtype=torch.int32) - 1
+
+
 def create_varlen_metadata_for_document(
-    input_batch: torch.Tensor, eos_id: int
+    input_batch: torch.Tensor,
+    eos_id: int,
+    *,
+    cu_seqlens: torch.Tensor | None = None,
+    max_seqlen: int | None = None,
 ) -> VarlenMetadata:
     """
     Creates cumulative sequence length indices needed for variable length attention
 
+    The whole batch is processed at once: document starts are found with a
+    single ``nonzero`` over the flattened batch, so there is no per-row Python
+    loop. ``cu_seqlens`` and ``max_seqlen`` can instead be precomputed by the
+    dataloader (see ``ATTENTION_METADATA_KEYS``), in which case no device to host
+    sync happens here.
+
     Args:
-        input_batch
+        input_batch: Token ids with shape [b, s]
         eos_id: the EOS id marker
+        cu_seqlens: Precomputed packed cumulative sequence lengths, int32
+        max_seqlen: Precomputed length of the longest document
 
     Returns:
         VarlenMetadata containing cumulative sequence length indices for q, k, and max_seq_len
     """
-    batch_size, seq_len = input_batch.shape
-    device = input_batch.device
-    cu_seqlens_list, all_seq_lengths = [], []
-    offset = 0
-    max_seqlen = 0
-
-    for b in range(batch_size):
-        tokens = input_batch[b]
-        eos_positions = (tokens == eos_id).nonzero(as_tuple=True)[0].to(torch.int32)
-        sample_cu_seqlens = torch.cat(
+    if cu_seqlens is None:
+        batch_size, seq_len = input_batch.shape
+        starts = get_document_start_mask(input_batch, eos_id).flatten()
+        cu_seqlens = torch.cat(
             [
-                torch.tensor([0], dtype=torch.int32, device=device),
-                eos_positions + 1,
-                torch.tensor([seq_len], dtype=torch.int32, device=device),
+                starts.nonzero(as_tuple=True)[0].to(torch.int32),
+                torch.tensor(
+                    [batch_size * seq_len], dtype=torch.int32, device=starts.device
+                ),
             ]
         )
-        sample_cu_seqlens = torch.unique_consecutive(sample_cu_seqlens)
-
-        seq_lengths = torch.diff(sample_cu_seqlens)
-        all_seq_lengths.append(seq_lengths)
+    cu_seqlens = cu_seqlens.to(torch.int32)
 
-        cu_seqlens_adjusted = sample_cu_seqlens[:-1] + offset
-        cu_seqlens_list.append(cu_seqlens_adjusted)
-
-        offset += seq_len
-
-    packed_cu_seqlens = torch.cat(
-        cu_seqlens_list + [torch.tensor([offset], dtype=torch.int32, device=device)]
-    )
-
-    max_seqlen = 0
-    if len(all_seq_lengths) > 0:
-        all_seq_lengths = torch.cat(all_seq_lengths)
-        # device to host sync but only done once per model forward
-        max_seqlen = all_seq_lengths.max().item()
+    if max_seqlen is None:
+        max_seqlen = 0
+        if cu_seqlens.numel() > 1:
+            # device to host sync but only done once per model forward
+            max_seqlen = int(torch.diff(cu_seqlens).max().item())
 
     return VarlenMetadata(
-        cu_seq_q=packed_cu_seqlens,
-        cu_seq_k=packed_cu_seqlens,
+        cu_seq_q=cu_seqlens,
+        cu_seq_k=cu_seqlens,
         max_q=max_seqlen,
         max_k=max_seqlen,
     )
 
 
+def build_varlen_metadata_inputs(
+    input_batch: torch.Tensor, eos_id: int
+) -> dict[str, Any]:
+    """Computes varlen metadata for a batch on the host, e.g. in a dataloader worker.
+
+    The returned dict is meant to be merged into the dataloader ``input_dict``
+    under ``ATTENTION_METADATA_KEYS``. ``max_seqlen`` is a Python int so that it
+    stays on the host when the batch is moved to the device.
+    """
+    metadata = create_varlen_metadata_for_document(input_batch, eos_id)
+    return {"cu_seqlens": metadata.cu_seq_q, "max_seqlen": metadata.max_q}
+
+
 class BaseAttention(Module):
     @dataclass(kw_only=True, slots=True)
     class Config(Module.Config):
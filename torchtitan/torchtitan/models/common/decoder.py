@@ -101,6 +101,8 @@ class Decoder(BaseModel):
             in_features=config.dim, out_features=config.vocab_size
         )
 
+        self._causal_block_masks: dict[tuple, AttentionMasksType] = {}
+
     def init_weights(
         self,
         **kwargs,
@@ -161,22 +163,31 @@ class Decoder(BaseModel):
         extra_inputs: dict[str, torch.Tensor] | None = None,
     ) -> AttentionMasksType:
         mask_mods = [get_causal_mask_mod()]
+        seq_len = input_batch.shape[1]
 
         match self.attn_config.attn_mask_type:
             case "causal":
-                B = 1
+                # The causal mask only depends on the sequence length, so it is
+                # built once per shape and reused across microbatches.
+                cache_key = (seq_len, input_batch.device)
+                if cache_key not in self._causal_block_masks:
+                    self._causal_block_masks[cache_key] = create_attention_mask(
+                        and_masks(*mask_mods), 1, None, seq_len, seq_len
+                    )
+                return self._causal_block_masks[cache_key]
             case "block_causal":
                 B = input_batch.shape[0]
                 assert tokenizer.eos_id is not None
-                mask_mods.append(get_document_mask_mod(input_batch, tokenizer.eos_id))
+                document_ids = (extra_inputs or {}).get("document_ids")
+                mask_mods.append(
+                    get_document_mask_mod(input_batch, tokenizer.eos_id, document_ids)
+                )
             case _:
                 raise ValueError(
                     f"Unknown attention mask type: {self.attn_config.attn_mask_type}"
                 )
 
-        return create_attention_mask(
-            and_masks(*mask_mods), B, None, input_batch.shape[1], input_batch.shape[1]
-        )
+        return create_attention_mask(and_masks(*mask_mods), B, None, seq_len, seq_len)
 
     def get_attention_masks(
         self,
@@ -196,8 +207,12 @@ class Decoder(BaseModel):
                         f"attention mask type, got {self.attn_config.attn_mask_type}"
                     )
                 assert tokenizer.eos_id is not None
+                extra_inputs = extra_inputs or {}
                 return create_varlen_metadata_for_document(
-                    input_batch, tokenizer.eos_id
+                    input_batch,
+                    tokenizer.eos_id,
+                    cu_seqlens=extra_inputs.get("cu_seqlens"),
+                    max_seqlen=extra_inputs.get("max_seqlen"),
                 )
             case _:
                 raise TypeError("Only varlen and flex attn masks are supported")
@@ -143,7 +143,7 @@ def _fill_indices_fake(
     )
 
 
-# reference
+# vectorized CPU implementation, matches _fill_indices_kernel
 def fill_indices_cpu(
     tokens_per_expert_group: torch.Tensor,
     start_index_values: torch.Tensor,
@@ -152,32 +152,33 @@ def fill_indices_cpu(
     num_ranks: int,
     max_len: int,
 ):
-    # We need to preallocate the output - we ignore device and force it on cpu
-    # device = tokens_per_expert_group.device
-    permuted_indices = torch.full(
-        (max_len,),
-        -1,
-        dtype=torch.int64,
-    )  # device=device)
-    # Fill the permuted indices
-    # For each local expert
-    for e in range(experts_per_rank):
-        write_start = write_offsets[e].item()
-        # For each remote rank
-        for r in range(num_ranks):
-            i = r * experts_per_rank + e
-            start_index = start_index_values[i].item()
-            length = tokens_per_expert_group[i].item()
-            # Fill in the indices
-            if length > 0:
-                end_idx = min(write_start + length, max_len)
-                permuted_indices[write_start:end_idx] = torch.arange(
-                    start_index,
-                    start_index + (end_idx - write_start),
-                    dtype=torch.int64,
-                    # device=device,
-                )
-            write_start += length
+    # The output is always on cpu, independent of the input device
+    lengths = tokens_per_expert_group.to("cpu", torch.int64)
+    start_index_values = start_index_values.to("cpu", torch.int64)
+    write_offsets = write_offsets.to("cpu", torch.int64)
+
+    # Segments are (expert, rank) pairs, laid out expert-major in the output:
+    # for each local expert, the tokens from rank 0, then rank 1, ...
+    lengths_2d = lengths.view(num_ranks, experts_per_rank).t()
+    rank_offsets = torch.cumsum(lengths_2d, dim=1) - lengths_2d
+    segment_write_starts = (write_offsets.view(-1, 1) + rank_offsets).reshape(-1)
+    lengths = lengths_2d.reshape(-1)
+    starts = start_index_values.view(num_ranks, experts_per_rank).t().reshape(-1)
+
+    # Expand every segment to one entry per token: token j of the concatenated
+    # segments is written to j + (write start - begin) of its segment and takes
+    # the value j + (start index - begin).
+    segment_begins = torch.cumsum(lengths, 0) - lengths
+    positions = torch.arange(int(lengths.sum()), dtype=torch.int64)
+    dest_indices = positions + torch.repeat_interleave(
+        segment_write_starts - segment_begins, lengths
+    )
+    values = positions + torch.repeat_interleave(starts - segment_begins, lengths)
+
+    # Destinations are increasing, drop the tail that does not fit into max_len
+    num_valid = int(torch.searchsorted(dest_indices, max_len))
+    permuted_indices = torch.full((max_len,), -1, dtype=torch.int64)
+    permuted_indices[dest_indices[:num_valid]] = values[:num_valid]
     return permuted_indices
 
 
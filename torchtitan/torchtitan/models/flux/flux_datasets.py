@@ -21,6 +21,7 @@ from torch.utils.data import IterableDataset
 from torchtitan.components.dataloader import ParallelAwareDataloader
 from torchtitan.components.tokenizer import BaseTokenizer
 from torchtitan.hf_datasets import DatasetConfig
+from torchtitan.models.flux.latent_cache import LatentCache
 from torchtitan.models.flux.tokenizer import FluxTokenizerContainer
 from torchtitan.tools.logging import logger
 
@@ -29,7 +30,7 @@ def _process_cc12m_image(
     img: PIL.Image.Image,
     output_size: int = 256,
 ) -> torch.Tensor | None:
-    """Process CC12M image to the desired size."""
+    """Process CC12M image to the desired size, as a uint8 tensor of shape [3, H, W]."""
 
     width, height = img.size
     # Skip low resolution images
@@ -58,19 +59,9 @@ def _process_cc12m_image(
     if resized_img.mode != "RGB":
         resized_img = resized_img.convert("RGB")
 
-    # Normalize the image to [-1, 1]
-    np_img = np.array(resized_img).transpose((2, 0, 1))
-    tensor_img = torch.tensor(np_img).float() / 255.0 * 2.0 - 1.0
-
-    # NOTE: The following commented code is an alternative way
-    # img_transform = transforms.Compose(
-    #     [
-    #         transforms.Resize(max(output_size, output_size)),
-    #         transforms.CenterCrop((output_size, output_size)),
-    #         transforms.ToTensor(),
-    #     ]
-    # )
-    # tensor_img = img_transform(img)
+    # Keep the image in uint8 [C, H, W], it is normalized to [-1, 1] per batch on
+    # device by `normalize_images`
+    tensor_img = torch.from_numpy(np.array(resized_img)).permute(2, 0, 1)
 
     return tensor_img
 
@@ -348,12 +339,86 @@ class FluxValidationDataset(FluxDataset):
             yield sample_dict, labels
 
 
+class FluxCachedDataset(IterableDataset, Stateful):
+    """Dataset reading precomputed Flux encodings from a latent cache.
+
+    Yields the T5 and CLIP encodings as inputs and the autoencoder moments as
+    labels, so no encoder has to run during training. Samples are assigned to
+    data parallel ranks round-robin in the order of the cache.
+
+    Args:
+    cache_path (str): Directory of the cache written by ``precompute_latents``.
+    prompt_dropout_prob (float): Probability of replacing each text encoding with
+        the encoding of the empty prompt.
+    dp_rank (int): Data parallel rank.
+    dp_world_size (int): Data parallel world size.
+    infinite (bool): Whether to loop over the dataset infinitely.
+    """
+
+    def __init__(
+        self,
+        cache_path: str,
+        prompt_dropout_prob: float,
+        dp_rank: int = 0,
+        dp_world_size: int = 1,
+        infinite: bool = False,
+    ) -> None:
+        logger.info(f"Preparing Flux latent cache from {cache_path}")
+        self._cache = LatentCache(cache_path)
+        self._positions = range(dp_rank, len(self._cache), dp_world_size)
+        self.prompt_dropout_prob = prompt_dropout_prob
+        self.infinite = infinite
+
+        # Variables for checkpointing
+        self._sample_idx = 0
+
+    def __iter__(self):
+        while True:
+            while self._sample_idx < len(self._positions):
+                sample = self._cache.get(self._positions[self._sample_idx])
+                self._sample_idx += 1
+
+                sample_dict = {
+                    "t5_encodings": sample["t5_encodings"],
+                    "clip_encodings": sample["clip_encodings"],
+                }
+                # Classifier-free guidance, see FluxDataset
+                dropout_prob = self.prompt_dropout_prob
+                if dropout_prob > 0.0:
+                    empty_encodings = self._cache.empty_encodings
+                    if torch.rand(1).item() < dropout_prob:
+                        sample_dict["t5_encodings"] = empty_encodings["t5_encodings"]
+                    if torch.rand(1).item() < dropout_prob:
+                        sample_dict["clip_encodings"] = empty_encodings[
+                            "clip_encodings"
+                        ]
+
+                yield sample_dict, sample["img_moments"]
+
+            if not self.infinite:
+                logger.warning(
+                    "Flux latent cache has run out of data. "
+                    "This might cause NCCL timeout if data parallelism is enabled."
+                )
+                break
+            self._sample_idx = 0
+            logger.warning("Flux latent cache is being re-looped.")
+
+    def load_state_dict(self, state_dict):
+        self._sample_idx = state_dict["sample_idx"]
+
+    def state_dict(self):
+        return {"sample_idx": self._sample_idx}
+
+
 class FluxDataLoader(ParallelAwareDataloader):
     """Configurable Flux dataloader for both training and validation.
 
     This dataloader wraps FluxDataset (or FluxValidationDataset when
     ``generate_timesteps`` is enabled) and can be used for both training
     and validation by configuring the appropriate dataset, batch_size, etc.
+    When ``latent_cache_path`` is set it wraps FluxCachedDataset instead and
+    yields precomputed encodings.
     """
 
     @dataclass(kw_only=True, slots=True)
@@ -379,12 +444,23 @@ class FluxDataLoader(ParallelAwareDataloader):
         generate_timesteps: bool = False
         """Generate stratified timesteps in round-robin style (for validation)"""
 
+        latent_cache_path: str | None = None
+        """Directory of precomputed T5/CLIP encodings and autoencoder latents, written by
+        `python -m torchtitan.models.flux.precompute_latents`. When set, the dataloader
+        reads the cache instead of the raw dataset, and the trainer does not load the
+        encoders unless validation needs them. Not supported for validation."""
+
         def __post_init__(self):
             if self.generate_timesteps and self.prompt_dropout_prob != 0.0:
                 raise ValueError(
                     f"prompt_dropout_prob must be 0.0 when generate_timesteps=True "
                     f"(for validation), but got {self.prompt_dropout_prob}."
                 )
+            if self.generate_timesteps and self.latent_cache_path is not None:
+                raise ValueError(
+                    "latent_cache_path is not supported for validation "
+                    "(generate_timesteps=True), which needs the raw prompts."
+                )
 
     def __init__(
         self,
@@ -397,13 +473,20 @@ class FluxDataLoader(ParallelAwareDataloader):
         **kwargs,
     ):
 
-        if not isinstance(tokenizer, FluxTokenizerContainer):
+        if config.latent_cache_path is not None:
+            ds = FluxCachedDataset(
+                cache_path=config.latent_cache_path,
+                prompt_dropout_prob=config.prompt_dropout_prob,
+                dp_rank=dp_rank,
+                dp_world_size=dp_world_size,
+                infinite=config.infinite,
+            )
+        elif not isinstance(tokenizer, FluxTokenizerContainer):
             raise ValueError(
                 "FluxDataLoader requires a FluxTokenizerContainer as tokenizer. "
                 "Set tokenizer=FluxTokenizerContainer.Config(...) in your trainer config."
             )
-
-        if config.generate_timesteps:
+        elif config.generate_timesteps:
             ds = FluxValidationDataset(
                 dataset_name=config.dataset,
                 dataset_path=config.dataset_path,
@@ -0,0 +1,154 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import glob
+import json
+import os
+
+import torch
+from torch import Tensor
+
+# Per-sample fields stored in the cache. ``img_moments`` is the output of the
+# autoencoder's encoder (mean and log-variance of the latent distribution)
+# before sampling, so that the latent is still re-sampled at every step.
+CACHE_FIELDS = ("t5_encodings", "clip_encodings", "img_moments")
+EMPTY_ENCODINGS_FILE = "empty_encodings.pt"
+
+
+def _index_file(path: str, rank: int) -> str:
+    return os.path.join(path, f"index-rank{rank:05d}.json")
+
+
+class LatentCacheWriter:
+    """Writes precomputed Flux encodings into sharded files under ``path``.
+
+    Samples are buffered and flushed every ``shard_size`` samples into one
+    ``torch.save`` file holding a stacked tensor per field. Each writer rank
+    owns its own shards and index file, so ranks can write concurrently
+    without coordination.
+
+    Args:
+        path (str): Directory of the cache.
+        rank (int): Rank of the writer, used to name its shards.
+        shard_size (int): Number of samples per shard.
+    """
+
+    def __init__(self, path: str, rank: int = 0, shard_size: int = 1024):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.rank = rank
+        self.shard_size = shard_size
+        self._shards: list[dict[str, str | list[str]]] = []
+        self._sample_ids: list[str] = []
+        self._buffer: dict[str, list[Tensor]] = {name: [] for name in CACHE_FIELDS}
+
+    def add(self, sample_ids: list[str], encodings: dict[str, Tensor]) -> None:
+        """Adds a batch of samples, ``encodings[field]`` has shape [bsz, ...]."""
+        for name in CACHE_FIELDS:
+            self._buffer[name].extend(encodings[name].detach().cpu().unbind(0))
+        self._sample_ids.extend(sample_ids)
+        while len(self._sample_ids) >= self.shard_size:
+            self._flush(self.shard_size)
+
+    def _flush(self, num_samples: int) -> None:
+        file_name = f"shard-rank{self.rank:05d}-{len(self._shards):05d}.pt"
+        shard = {
+            name: torch.stack(self._buffer[name][:num_samples]) for name in CACHE_FIELDS
+        }
+        tmp_path = os.path.join(self.path, f".{file_name}.tmp")
+        torch.save(shard, tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, file_name))
+
+        self._shards.append(
+            {"file": file_name, "sample_ids": self._sample_ids[:num_samples]}
+        )
+        self._sample_ids = self._sample_ids[num_samples:]
+        for name in CACHE_FIELDS:
+            self._buffer[name] = self._buffer[name][num_samples:]
+
+    def close(self) -> None:
+        """Flushes the last partial shard and writes the index of this rank."""
+        if self._sample_ids:
+            self._flush(len(self._sample_ids))
+        tmp_path = _index_file(self.path, self.rank) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"shards": self._shards}, f)
+        os.replace(tmp_path, _index_file(self.path, self.rank))
+
+
+def save_empty_encodings(path: str, t5_encodings: Tensor, clip_encodings: Tensor):
+    """Saves the encodings of the empty prompt, used for prompt dropout."""
+    os.makedirs(path, exist_ok=True)
+    torch.save(
+        {"t5_encodings": t5_encodings.cpu(), "clip_encodings": clip_encodings.cpu()},
+        os.path.join(path, EMPTY_ENCODINGS_FILE),
+    )
+
+
+class LatentCache:
+    """Read-only view of a cache written by :class:`LatentCacheWriter`.
+
+    Shards are opened lazily with ``torch.load(mmap=True)``, so only the rows
+    that are actually read are paged in from disk.
+
+    Args:
+        path (str): Directory of the cache.
+    """
+
+    def __init__(self, path: str):
+        index_files = sorted(glob.glob(os.path.join(path, "index-rank*.json")))
+        if not index_files:
+            raise FileNotFoundError(
+                f"No latent cache found at {path}. Precompute it first with "
+                "`python -m torchtitan.models.flux.precompute_latents`."
+            )
+        self.path = path
+        self._files: list[str] = []
+        self.sample_ids: list[str] = []
+        # (shard index, row) of every sample, in the order of ``sample_ids``
+        self._locations: list[tuple[int, int]] = []
+        for index_file in index_files:
+            with open(index_file) as f:
+                for shard in json.load(f)["shards"]:
+                    shard_idx = len(self._files)
+                    self._files.append(shard["file"])
+                    for row, sample_id in enumerate(shard["sample_ids"]):
+                        self.sample_ids.append(sample_id)
+                        self._locations.append((shard_idx, row))
+        self._positions = {
+            sample_id: pos for pos, sample_id in enumerate(self.sample_ids)
+        }
+        self._shards: dict[int, dict[str, Tensor]] = {}
+        self._empty_encodings: dict[str, Tensor] | None = None
+
+    def __len__(self) -> int:
+        return len(self.sample_ids)
+
+    def _shard(self, shard_idx: int) -> dict[str, Tensor]:
+        if shard_idx not in self._shards:
+            self._shards[shard_idx] = torch.load(
+                os.path.join(self.path, self._files[shard_idx]),
+                mmap=True,
+                weights_only=True,
+            )
+        return self._shards[shard_idx]
+
+    def get(self, pos: int) -> dict[str, Tensor]:
+        """Returns the fields of the ``pos``-th sample of the cache."""
+        shard_idx, row = self._locations[pos]
+        shard = self._shard(shard_idx)
+        return {name: shard[name][row] for name in CACHE_FIELDS}
+
+    def __getitem__(self, sample_id: str) -> dict[str, Tensor]:
+        return self.get(self._positions[sample_id])
+
+    @property
+    def empty_encodings(self) -> dict[str, Tensor]:
+        if self._empty_encodings is None:
+            self._empty_encodings = torch.load(
+                os.path.join(self.path, EMPTY_ENCODINGS_FILE), weights_only=True
+            )
+        return self._empty_encodings
@@ -0,0 +1,157 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Encode a Flux dataset once into a latent cache.
+
+Runs the T5 and CLIP text encoders and the autoencoder's encoder over the
+dataset configured in ``dataloader`` and writes the results with
+``LatentCacheWriter`` to ``dataloader.latent_cache_path``. Each rank encodes
+its own split of the dataset and writes its own shards. Training with the same
+``latent_cache_path`` then reads the cache instead of running the encoders.
+
+Example usage:
+    torchrun --nproc_per_node=8 -m torchtitan.models.flux.precompute_latents \
+        --module flux --config flux_schnell \
+        --dataloader.latent_cache_path outputs/flux_latent_cache
+"""
+
+import os
+
+import torch
+import torch.distributed as dist
+from datasets.distributed import split_dataset_by_node
+from torch.distributed.elastic.multiprocessing.errors import record
+
+from torchtitan.config import ConfigManager
+from torchtitan.models.flux.flux_datasets import _validate_dataset
+from torchtitan.models.flux.latent_cache import (
+    LatentCacheWriter,
+    save_empty_encodings,
+)
+from torchtitan.models.flux.model.autoencoder import load_ae
+from torchtitan.models.flux.model.hf_embedder import FluxEmbedder
+from torchtitan.models.flux.trainer import FluxTrainer
+from torchtitan.models.flux.utils import normalize_images
+from torchtitan.tools.logging import init_logger, logger
+
+
+@torch.no_grad()
+@record
+def precompute_latents(config: FluxTrainer.Config, shard_size: int = 1024):
+    # pyrefly: ignore [missing-attribute]
+    cache_path = config.dataloader.latent_cache_path
+    if cache_path is None:
+        raise ValueError("Set --dataloader.latent_cache_path to the output directory.")
+
+    world_size = int(os.environ.get("WORLD_SIZE", 1))
+    rank = int(os.environ.get("RANK", 0))
+    if world_size > 1:
+        dist.init_process_group()
+    if torch.cuda.is_available():
+        device = torch.device(f"cuda:{int(os.environ.get('LOCAL_RANK', 0))}")
+        torch.cuda.set_device(device)
+    else:
+        device = torch.device("cpu")
+    # Encodings are computed and stored in float32, the encoder dtype of
+    # FluxTrainer without FSDP. The trainer casts them to its own encoder dtype
+    # when reading the cache, which depends on the parallelism of the run.
+    dtype = torch.float32
+
+    assert config.model_spec is not None
+    autoencoder = load_ae(
+        config.encoder.autoencoder_path,
+        # pyrefly: ignore [missing-attribute]
+        config.model_spec.model.autoencoder_params,
+        device=device,
+        dtype=dtype,
+        random_init=config.encoder.random_init,
+    )
+    clip_encoder = FluxEmbedder(
+        version=config.encoder.clip_encoder,
+        random_init=config.encoder.random_init,
+    ).to(device=device, dtype=dtype)
+    t5_encoder = FluxEmbedder(
+        version=config.encoder.t5_encoder,
+        random_init=config.encoder.random_init,
+    ).to(device=device, dtype=dtype)
+    tokenizer = config.tokenizer.build(tokenizer_path=config.hf_assets_path)
+
+    def encode_text(tokens: dict[str, torch.Tensor]) -> dict[str, torch.Tensor]:
+        return {
+            "t5_encodings": t5_encoder(tokens["t5"].squeeze(1).to(device)).to(dtype),
+            "clip_encodings": clip_encoder(tokens["clip"].squeeze(1).to(device)).to(
+                dtype
+            ),
+        }
+
+    if rank == 0:
+        empty = encode_text(tokenizer.encode(""))
+        save_empty_encodings(
+            cache_path, empty["t5_encodings"][0], empty["clip_encodings"][0]
+        )
+
+    # pyrefly: ignore [missing-attribute]
+    dataset_name = config.dataloader.dataset.lower()
+    path, dataset_loader, data_processor = _validate_dataset(
+        dataset_name,
+        # pyrefly: ignore [missing-attribute]
+        config.dataloader.dataset_path,
+    )
+    dataset = split_dataset_by_node(dataset_loader(path), rank, world_size)
+    writer = LatentCacheWriter(cache_path, rank=rank, shard_size=shard_size)
+    bsz = config.training.local_batch_size
+
+    def flush(samples: list[dict]) -> None:
+        tokens = {
+            key: torch.stack([sample[key] for sample in samples])
+            for key in ("t5", "clip")
+        }
+        images = torch.stack([sample["image"] for sample in samples])
+        encodings = encode_text(tokens)
+        # Keep the moments rather than a sampled latent, so that training still
+        # samples a different latent every time the image is seen
+        encodings["img_moments"] = autoencoder.encoder(
+            normalize_images(images, device=device, dtype=dtype)
+        )
+        writer.add([sample["sample_id"] for sample in samples], encodings)
+
+    samples = []
+    num_samples = 0
+    for idx, sample in enumerate(dataset):
+        sample_dict = data_processor(
+            sample,
+            tokenizer,
+            # pyrefly: ignore [missing-attribute]
+            output_size=config.dataloader.img_size,
+        )
+        if sample_dict["image"] is None:
+            continue
+        sample_dict["sample_id"] = sample.get("__key__", f"{rank}-{idx}")
+        samples.append(sample_dict)
+        if len(samples) == bsz:
+            flush(samples)
+            num_samples += len(samples)
+            samples = []
+            if num_samples % (100 * bsz) == 0:
+                logger.info(f"Encoded {num_samples} samples")
+    if samples:
+        flush(samples)
+        num_samples += len(samples)
+    writer.close()
+    logger.info(f"Wrote {num_samples} samples to the latent cache at {cache_path}")
+
+    if world_size > 1:
+        dist.barrier()
+        dist.destroy_process_group()
+
+
+if __name__ == "__main__":
+    init_logger()
+    config_manager = ConfigManager()
+    config = config_manager.parse_args()
+    # pyrefly: ignore [bad-argument-type]
+    precompute_latents(config)
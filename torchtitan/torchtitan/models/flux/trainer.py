@@ -20,7 +20,9 @@ from torchtitan.models.flux.utils import (
     create_position_encoding_for_latents,
     pack_latents,
     preprocess_data,
+    sample_cached_latents,
 )
+from torchtitan.tools.logging import logger
 from torchtitan.trainer import Trainer
 
 
@@ -61,11 +63,22 @@ class FluxTrainer(Trainer):
         # load components
         assert config.model_spec is not None
         model_args = config.model_spec.model
+        # pyrefly: ignore [missing-attribute]
+        self._autoencoder_params = model_args.autoencoder_params
+
+        # With a latent cache the dataloader yields precomputed encodings, so the
+        # encoders are only needed when validation generates images from prompts.
+        self._use_latent_cache = (
+            getattr(config.dataloader, "latent_cache_path", None) is not None
+        )
+        self.autoencoder = self.clip_encoder = self.t5_encoder = None
+        if self._use_latent_cache and not config.validator.enable:
+            logger.info("Using Flux latent cache, skipping loading the encoders")
+            return
 
         self.autoencoder = load_ae(
             config.encoder.autoencoder_path,
-            # pyrefly: ignore [missing-attribute]
-            model_args.autoencoder_params,
+            self._autoencoder_params,
             device=self.device,
             dtype=self._dtype,
             random_init=config.encoder.random_init,
@@ -126,17 +139,33 @@ class FluxTrainer(Trainer):
             global_valid_tokens is None
         ), "FLUX model don't need to rescale loss by number of global valid tokens"
 
-        # generate t5 and clip embeddings
-        input_dict["image"] = labels
-        input_dict = preprocess_data(
-            device=self.device,
-            dtype=self._dtype,
-            autoencoder=self.autoencoder,
-            clip_encoder=self.clip_encoder,
-            t5_encoder=self.t5_encoder,
-            batch=input_dict,
-        )
-        labels = input_dict["img_encodings"]
+        if self._use_latent_cache:
+            # encodings were precomputed, labels hold the autoencoder moments
+            for key in ("clip_encodings", "t5_encodings"):
+                input_dict[key] = input_dict[key].to(
+                    device=self.device, dtype=self._dtype
+                )
+            labels = sample_cached_latents(
+                labels,
+                self._autoencoder_params,
+                device=self.device,
+                dtype=self._dtype,
+            )
+        else:
+            # generate t5 and clip embeddings
+            input_dict["image"] = labels
+            input_dict = preprocess_data(
+                device=self.device,
+                dtype=self._dtype,
+                # pyrefly: ignore [bad-argument-type]
+                autoencoder=self.autoencoder,
+                # pyrefly: ignore [bad-argument-type]
+                clip_encoder=self.clip_encoder,
+                # pyrefly: ignore [bad-argument-type]
+                t5_encoder=self.t5_encoder,
+                batch=input_dict,
+            )
+            labels = input_dict["img_encodings"]
 
         # rewrite the global_valid_tokens because the `labels` are reset after image encoder.
         local_valid_tokens = torch.tensor(
@@ -251,6 +280,7 @@ class FluxTrainer(Trainer):
         self.lr_schedulers.step()
 
         # log metrics
+        self.metrics_processor.log_step(self.step, {"lr": lr})
         if not self.metrics_processor.should_log(self.step):
             return
 
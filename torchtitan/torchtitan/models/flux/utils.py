@@ -8,10 +8,28 @@ import torch
 
 from torch import Tensor
 
-from .model.autoencoder import AutoEncoder
+from .model.autoencoder import AutoEncoder, AutoEncoderParams
 from .model.hf_embedder import FluxEmbedder
 
 
+def normalize_images(
+    images: Tensor, device: torch.device, dtype: torch.dtype
+) -> Tensor:
+    """
+    Move a batch of uint8 images to device and normalize them to [-1, 1] in `dtype`.
+
+    Args:
+        images (Tensor): uint8 images. Shape: [bsz, 3, height, width]
+        device (torch.device): The device to use.
+        dtype (torch.dtype): The dtype to use.
+
+    Returns:
+        Tensor: The normalized images. Shape: [bsz, 3, height, width]
+    """
+    images = images.to(device=device, non_blocking=True)
+    return (images.float() / 127.5 - 1.0).to(dtype)
+
+
 def preprocess_data(
     # arguments from the recipe
     device: torch.device,
@@ -45,7 +63,7 @@ def preprocess_data(
     t5_text_encodings = t5_encoder(t5_tokens)
 
     if autoencoder is not None:
-        images = batch["image"].to(device=device, dtype=dtype)
+        images = normalize_images(batch["image"], device=device, dtype=dtype)
         img_encodings = autoencoder.encode(images)
         batch["img_encodings"] = img_encodings.to(device=device, dtype=dtype)
 
@@ -55,6 +73,33 @@ def preprocess_data(
     return batch
 
 
+def sample_cached_latents(
+    img_moments: Tensor,
+    autoencoder_params: AutoEncoderParams,
+    device: torch.device,
+    dtype: torch.dtype,
+) -> Tensor:
+    """
+    Sample image latents from autoencoder moments read from the latent cache.
+    Equivalent to the sampling and scaling done by `AutoEncoder.encode` after the encoder.
+
+    Args:
+        img_moments (Tensor): Concatenated mean and log-variance of the latent distribution.
+            Shape: [bsz, 2 * z_channels, latent height, latent width]
+        autoencoder_params (AutoEncoderParams): Parameters holding the latent scale and shift.
+        device (torch.device): The device to use.
+        dtype (torch.dtype): The dtype to use.
+
+    Returns:
+        Tensor: The image latents.
+            Shape: [bsz, z_channels, latent height, latent width]
+    """
+    img_moments = img_moments.to(device=device, dtype=dtype)
+    mean, logvar = torch.chunk(img_moments, 2, dim=1)
+    z = mean + torch.exp(0.5 * logvar) * torch.randn_like(mean)
+    return autoencoder_params.scale_factor * (z - autoencoder_params.shift_factor)
+
+
 def generate_noise_latent(
     bsz: int,
     height: int,
@@ -295,8 +295,9 @@ class GptOssModel(Decoder):
             case "block_causal":
                 B = input_batch.shape[0]
                 assert tokenizer.eos_id is not None
+                document_ids = (extra_inputs or {}).get("document_ids")
                 basic_mask_mods.append(
-                    get_document_mask_mod(input_batch, tokenizer.eos_id)
+                    get_document_mask_mod(input_batch, tokenizer.eos_id, document_ids)
                 )
             case _:
                 raise ValueError(
@@ -239,7 +239,10 @@ class Llama4Model(Decoder):
                 B = 1
             case "block_causal":
                 assert tokenizer.eos_id is not None
-                mask_mods.append(get_document_mask_mod(input_batch, tokenizer.eos_id))
+                document_ids = (extra_inputs or {}).get("document_ids")
+                mask_mods.append(
+                    get_document_mask_mod(input_batch, tokenizer.eos_id, document_ids)
+                )
                 B = input_batch.shape[0]
             case _:
                 raise ValueError(
@@ -706,8 +706,12 @@ class Model(BaseModel):
                         f"attention mask type, got {self.attn_config.attn_mask_type}"
                     )
                 assert tokenizer.eos_id is not None
+                extra_inputs = extra_inputs or {}
                 return create_varlen_metadata_for_document(
-                    input_batch, tokenizer.eos_id
+                    input_batch,
+                    tokenizer.eos_id,
+                    cu_seqlens=extra_inputs.get("cu_seqlens"),
+                    max_seqlen=extra_inputs.get("max_seqlen"),
                 )
             case _:
                 raise TypeError(
@@ -0,0 +1,113 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Wall time of the startup phases of a training job, up to the first step."""
+
+import contextlib
+import socket
+import time
+
+import torch
+from torchtitan.tools.logging import logger
+
+# Phases in the order they run. Time not covered by any phase is reported as
+# "other", e.g. tokenizer, optimizer and logger setup.
+STARTUP_PHASES = (
+    "imports",
+    "config",
+    "init_distributed",
+    "data",
+    "build_model",
+    "parallelize",
+    "init_weights",
+    "checkpoint_load",
+    "first_step",
+)
+
+
+class StartupProfiler:
+    """Records per-phase wall time from process start to the end of the first step.
+
+    Phases are timed on every rank without synchronization. :meth:`summarize`
+    gathers them once, after the first step, and reports each phase's
+    median and maximum across ranks along with the slowest rank, so that
+    time-to-first-step regressions and slow ranks are visible from the logs.
+    """
+
+    def __init__(self) -> None:
+        self.start_time = time.perf_counter()
+        self.phase_times = dict.fromkeys(STARTUP_PHASES, 0.0)
+        self.summarized = False
+
+    def record(self, name: str, seconds: float) -> None:
+        if name not in self.phase_times:
+            raise ValueError(
+                f"Unknown startup phase {name!r}, expected one of {STARTUP_PHASES}"
+            )
+        self.phase_times[name] += seconds
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as (part of) startup phase ``name``."""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - begin)
+
+    def summarize(self, device: torch.device | None = None) -> dict[str, float]:
+        """Gather the phase times of all ranks and log them.
+
+        Must be called by all ranks when a process group is initialized.
+        Returns metrics of the maximum time of each phase across ranks, and
+        of the time to first step.
+
+        Args:
+            device: Device of the all-gather, which must be supported by the
+                default process group's backend.
+        """
+        local = list(self.phase_times.values())
+        local.append(time.perf_counter() - self.start_time)
+        local_times = torch.tensor(local, dtype=torch.float64, device=device)
+
+        if torch.distributed.is_initialized():
+            world_size = torch.distributed.get_world_size()
+            gathered = [torch.empty_like(local_times) for _ in range(world_size)]
+            torch.distributed.all_gather(gathered, local_times)
+            times = torch.stack(gathered).cpu()
+            hostnames: list[str | None] = [None] * world_size
+            torch.distributed.all_gather_object(hostnames, socket.gethostname())
+        else:
+            times = local_times.cpu().unsqueeze(0)
+            hostnames = [socket.gethostname()]
+        slowest = int(times[:, -1].argmax())
+
+        # [num_ranks, num_phases + 1]: add the unaccounted time before the total
+        other = times[:, -1] - times[:, :-1].sum(dim=1)
+        times = torch.cat([times[:, :-1], other.unsqueeze(1), times[:, -1:]], dim=1)
+        names = [*STARTUP_PHASES, "other", "time_to_first_step"]
+
+        medians = times.median(dim=0).values
+        maxima, argmax = times.max(dim=0)
+        lines = [f"{'phase':>20} {'median(s)':>10} {'max(s)':>10} {'slowest rank':>13}"]
+        for name, median, maximum, rank in zip(names, medians, maxima, argmax):
+            lines.append(
+                f"{name:>20} {median.item():>10.2f} {maximum.item():>10.2f} "
+                f"{rank.item():>13}"
+            )
+        logger.info(
+            f"Startup time across {times.shape[0]} ranks, slowest to first step: "
+            f"rank {slowest} on {hostnames[slowest]}\n" + "\n".join(lines)
+        )
+        self.summarized = True
+
+        return {
+            f"startup/{name}(s)": maximum.item() for name, maximum in zip(names, maxima)
+        }
+
+
+# Process-wide profiler, shared by the entry point and the trainer
+startup_profiler = StartupProfiler()
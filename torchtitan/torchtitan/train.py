@@ -4,13 +4,22 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-import os
+import time
 
-import torch
+_start_time = time.perf_counter()
 
-from torchtitan.config import ConfigManager
-from torchtitan.tools.logging import init_logger, logger
-from torchtitan.trainer import Trainer
+import os  # noqa: E402
+
+import torch  # noqa: E402
+
+from torchtitan.config import ConfigManager  # noqa: E402
+from torchtitan.tools.logging import init_logger, logger  # noqa: E402
+from torchtitan.tools.startup import startup_profiler  # noqa: E402
+from torchtitan.trainer import Trainer  # noqa: E402
+
+# Count the interpreter's imports towards time-to-first-step
+startup_profiler.start_time = _start_time
+startup_profiler.record("imports", time.perf_counter() - _start_time)
 
 
 def main() -> None:
@@ -24,8 +33,10 @@ def main() -> None:
         torchtitan.__version__,
     )
 
-    config_manager = ConfigManager()
-    config = config_manager.parse_args()
+    # Loading the config imports the model's config_registry and model code
+    with startup_profiler.phase("config"):
+        config_manager = ConfigManager()
+        config = config_manager.parse_args()
     trainer: Trainer | None = None
 
     try:
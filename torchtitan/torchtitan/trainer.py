@@ -17,6 +17,7 @@ import torch
 import torch.distributed.checkpoint.stateful
 import tyro
 from torch.distributed.elastic.multiprocessing.errors import record
+from torch.nn.attention.flex_attention import BlockMask
 
 from torchtitan.components.checkpoint import CheckpointManager
 from torchtitan.components.dataloader import BaseDataLoader, DataloaderExhaustedError
@@ -41,6 +42,10 @@ from torchtitan.config.configs import (
 )
 from torchtitan.distributed import ParallelDims, utils as dist_utils
 from torchtitan.distributed.context_parallel import prepare_context_parallel_input
+from torchtitan.models.common.attention import (
+    ATTENTION_METADATA_KEYS,
+    AttentionMasksType,
+)
 from torchtitan.models.common.decoder import Decoder
 from torchtitan.protocols import BaseModel
 from torchtitan.protocols.model_converter import ModelConvertersContainer
@@ -52,6 +57,23 @@ from torchtitan.tools.profiling import (
     maybe_enable_profiling,
     ProfilingConfig,
 )
+from torchtitan.tools.startup import startup_profiler
+
+
+def _record_stream(value: Any, stream: torch.cuda.Stream) -> None:
+    """Marks the tensors of ``value``, e.g. inputs and attention masks, as used
+    by ``stream``, so that the caching allocator does not reuse their memory
+    before ``stream`` is done with them."""
+    if isinstance(value, BlockMask):
+        value = value.as_tuple()
+    if isinstance(value, torch.Tensor):
+        value.record_stream(stream)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _record_stream(v, stream)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _record_stream(v, stream)
 
 
 class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
@@ -180,6 +202,7 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
     gc_handler: utils.GarbageCollection
     train_context: dist_utils.TrainContext
     gradient_accumulation_steps: int
+    attention_mask_stream: torch.cuda.Stream | None
     pp_has_first_stage: bool
     pp_has_last_stage: bool
 
@@ -205,7 +228,8 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
         device_module.set_device(self.device)
 
         # init distributed and build meshes
-        self.parallel_dims = parallel_dims = self.init_distributed()
+        with startup_profiler.phase("init_distributed"):
+            self.parallel_dims = parallel_dims = self.init_distributed()
 
         # Logging needs to happen after distributed initialized
         config.maybe_log()
@@ -230,17 +254,20 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
             distinct_seed_mesh_dims=["pp"],
         )
 
-        # build tokenizer
-        self.tokenizer = config.tokenizer.build(tokenizer_path=config.hf_assets_path)
+        with startup_profiler.phase("data"):
+            # build tokenizer
+            self.tokenizer = config.tokenizer.build(
+                tokenizer_path=config.hf_assets_path
+            )
 
-        # build dataloader
-        self.dataloader = config.dataloader.build(
-            dp_world_size=batch_degree,
-            dp_rank=batch_rank,
-            tokenizer=self.tokenizer,
-            seq_len=config.training.seq_len,
-            local_batch_size=config.training.local_batch_size,
-        )
+            # build dataloader
+            self.dataloader = config.dataloader.build(
+                dp_world_size=batch_degree,
+                dp_rank=batch_rank,
+                tokenizer=self.tokenizer,
+                seq_len=config.training.seq_len,
+                local_batch_size=config.training.local_batch_size,
+            )
 
         # build model (using meta init)
         model_config = model_spec.model
@@ -255,6 +282,7 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
             f"with {json.dumps(model_config.to_dict(), indent=2, ensure_ascii=False)}"
         )
         with (
+            startup_profiler.phase("build_model"),
             torch.device("meta"),
             utils.set_default_dtype(TORCH_DTYPE_MAP[config.training.dtype]),
         ):
@@ -264,11 +292,12 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
         model_compile_enabled = (
             config.compile.enable and "model" in config.compile.components
         )
-        model_converters = config.model_converters.build(
-            parallel_dims=parallel_dims,
-            model_compile_enabled=model_compile_enabled,
-        )
-        model_converters.convert(model)
+        with startup_profiler.phase("build_model"):
+            model_converters = config.model_converters.build(
+                parallel_dims=parallel_dims,
+                model_compile_enabled=model_compile_enabled,
+            )
+            model_converters.convert(model)
 
         # Verify all submodules satisfy the Module protocol
         # TODO: move this to module validate().
@@ -342,6 +371,17 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
         )
         assert self.gradient_accumulation_steps > 0
 
+        self.attention_mask_stream = None
+        self._last_backward_done: torch.cuda.Event | None = None
+        if config.training.prefetch_attention_masks:
+            if self.device.type == "cuda":
+                self.attention_mask_stream = torch.cuda.Stream(device=self.device)
+            else:
+                logger.warning(
+                    "prefetch_attention_masks requires a CUDA device, "
+                    "attention masks will be built inline."
+                )
+
         # apply parallelisms and initialization
         if parallel_dims.pp_enabled:
             if not model_spec.pipelining_fn:
@@ -351,34 +391,36 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
                 )
 
             # apply both Pipeline Parallel and SPMD-style scaling techniques
-            (
-                self.pp_schedule,
-                self.model_parts,
-                self.pp_has_first_stage,
-                self.pp_has_last_stage,
-            ) = model_spec.pipelining_fn(
-                model,
-                parallel_dims=parallel_dims,
-                training=config.training,
-                model_converters=config.model_converters,
-                parallelism=config.parallelism,
-                compile_config=config.compile,
-                ac_config=config.activation_checkpoint,
-                dump_folder=config.dump_folder,
-                device=self.device,
-                model_config=model_config,
-                parallelize_fn=model_spec.parallelize_fn,
-                loss_fn=self.loss_fn,
-            )
+            with startup_profiler.phase("parallelize"):
+                (
+                    self.pp_schedule,
+                    self.model_parts,
+                    self.pp_has_first_stage,
+                    self.pp_has_last_stage,
+                ) = model_spec.pipelining_fn(
+                    model,
+                    parallel_dims=parallel_dims,
+                    training=config.training,
+                    model_converters=config.model_converters,
+                    parallelism=config.parallelism,
+                    compile_config=config.compile,
+                    ac_config=config.activation_checkpoint,
+                    dump_folder=config.dump_folder,
+                    device=self.device,
+                    model_config=model_config,
+                    parallelize_fn=model_spec.parallelize_fn,
+                    loss_fn=self.loss_fn,
+                )
             # when PP is enabled, `model` obj is no longer used after this point,
             # model_parts is used instead
             del model
 
-            for m in self.model_parts:
-                m.to_empty(device=init_device)
-                with torch.no_grad():
-                    cast(Decoder, m).init_weights(buffer_device=buffer_device)
-                m.train()
+            with startup_profiler.phase("init_weights"):
+                for m in self.model_parts:
+                    m.to_empty(device=init_device)
+                    with torch.no_grad():
+                        cast(Decoder, m).init_weights(buffer_device=buffer_device)
+                    m.train()
 
             # confirm that user will be able to view loss metrics on the console
             ensure_pp_loss_visible(
@@ -388,21 +430,23 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
             )
         else:
             # apply Tensor/Context/Expert Parallel, activation checkpointing, torch.compile, Data Parallel
-            model = model_spec.parallelize_fn(
-                model,
-                parallel_dims=parallel_dims,
-                training=config.training,
-                model_converters=config.model_converters,
-                parallelism=config.parallelism,
-                compile_config=config.compile,
-                ac_config=config.activation_checkpoint,
-                dump_folder=config.dump_folder,
-            )
+            with startup_profiler.phase("parallelize"):
+                model = model_spec.parallelize_fn(
+                    model,
+                    parallel_dims=parallel_dims,
+                    training=config.training,
+                    model_converters=config.model_converters,
+                    parallelism=config.parallelism,
+                    compile_config=config.compile,
+                    ac_config=config.activation_checkpoint,
+                    dump_folder=config.dump_folder,
+                )
 
-            model.to_empty(device=init_device)
-            with torch.no_grad():
-                cast(BaseModel, model).init_weights(buffer_device=buffer_device)
-            model.train()
+            with startup_profiler.phase("init_weights"):
+                model.to_empty(device=init_device)
+                with torch.no_grad():
+                    cast(BaseModel, model).init_weights(buffer_device=buffer_device)
+                model.train()
 
             self.model_parts = [model]
 
@@ -455,6 +499,7 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
                 else None
             ),
             base_folder=config.dump_folder,
+            metrics_processor=self.metrics_processor,
         )
 
         loss_parallel_enabled = (
@@ -556,6 +601,55 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
             # Tensors stay on CPU; moved to GPU per-microbatch during training
             yield input_dict, labels
 
+    def _build_attention_masks(
+        self, inputs: torch.Tensor, extra_inputs: dict[str, Any]
+    ) -> AttentionMasksType | None:
+        """Builds the attention masks for flex/varlen attention, None otherwise."""
+        layer = getattr(self.model_config, "layer", None)
+        attn_config = getattr(layer, "attention", None) if layer else None
+        attn_backend = getattr(attn_config, "attn_backend", "sdpa")
+        if attn_backend not in ["flex", "varlen"]:
+            return None
+
+        assert (
+            self.tokenizer is not None
+        ), "tokenizer is required for flex/varlen attention"
+        model = cast(Decoder, self.model_parts[0])
+        return model.get_attention_masks(
+            input_batch=inputs,
+            tokenizer=self.tokenizer,
+            extra_inputs=extra_inputs,
+        )
+
+    def _prefetch_attention_masks(
+        self, microbatches: list[tuple[dict[str, Any], torch.Tensor]]
+    ) -> None:
+        """Moves the inputs of all microbatches to the device and builds their
+        attention masks on ``attention_mask_stream``.
+
+        The side stream only waits for the backward of the previous step, so
+        the work overlaps with its gradient clipping and optimizer step. The
+        tensors allocated here are recorded on the main stream, which consumes
+        them, so their memory is not reused before the main stream is done.
+        """
+        stream = self.attention_mask_stream
+        assert stream is not None
+        if self._last_backward_done is not None:
+            stream.wait_event(self._last_backward_done)
+        with torch.cuda.stream(stream):
+            for input_dict, _ in microbatches:
+                for k, v in input_dict.items():
+                    if isinstance(v, torch.Tensor):
+                        input_dict[k] = v.to(self.device, non_blocking=True)
+                extra_inputs = {k: v for k, v in input_dict.items() if k != "input"}
+                input_dict["attention_masks"] = self._build_attention_masks(
+                    input_dict["input"], extra_inputs
+                )
+        current_stream = torch.cuda.current_stream(self.device)
+        current_stream.wait_stream(stream)
+        for input_dict, _ in microbatches:
+            _record_stream(input_dict, current_stream)
+
     def post_dataloading_process(
         self, input_dict: dict[str, torch.Tensor], labels: torch.Tensor
     ) -> tuple[torch.Tensor, torch.Tensor, dict[str, torch.Tensor], dict[str, Any]]:
@@ -593,7 +687,9 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
             while extra_inputs are only available to the first stage.
         """
         inputs = input_dict["input"]
-        extra_inputs = {k: v for k, v in input_dict.items() if k != "input"}
+        extra_inputs = {
+            k: v for k, v in input_dict.items() if k not in ("input", "attention_masks")
+        }
         # For arguments, like attention_masks, we have to put them in a separate
         # dict as extra_inputs are not forwarded to other stages in PP, but
         # extra_kwargs are.
@@ -607,17 +703,21 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
         if attn_mask_type != "block_causal":
             extra_inputs.pop("positions", None)
 
-        attn_backend = getattr(attn_config, "attn_backend", "sdpa")
-        if attn_backend in ["flex", "varlen"]:
-            assert (
-                self.tokenizer is not None
-            ), "tokenizer is required for flex/varlen attention"
-            model = cast(Decoder, self.model_parts[0])
-            extra_kwargs["attention_masks"] = model.get_attention_masks(
-                input_batch=inputs,
-                tokenizer=self.tokenizer,
-                extra_inputs=extra_inputs,
+        # Attention metadata precomputed by the dataloader is only consumed
+        # by get_attention_masks, never by the model forward.
+        mask_inputs = {
+            k: extra_inputs.pop(k) for k in ATTENTION_METADATA_KEYS if k in extra_inputs
+        }
+
+        if input_dict.get("attention_masks") is not None:
+            # Built ahead of time by _prefetch_attention_masks
+            extra_kwargs["attention_masks"] = input_dict["attention_masks"]
+        else:
+            attention_masks = self._build_attention_masks(
+                inputs, {**extra_inputs, **mask_inputs}
             )
+            if attention_masks is not None:
+                extra_kwargs["attention_masks"] = attention_masks
 
         if self.parallel_dims.cp_enabled:
             inputs, labels, extra_kwargs = prepare_context_parallel_input(
@@ -645,9 +745,10 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
             input_dict, labels
         )
 
+        timeline = self.metrics_processor.step_timeline
         if parallel_dims.pp_enabled:
             # Pipeline Parallel forward / backward inside step() call
-            with self.train_context():
+            with self.train_context(), timeline.phase("forward_backward"):
                 targets, losses = (
                     (labels, []) if self.pp_has_last_stage else (None, None)
                 )
@@ -681,7 +782,7 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
             # Non-PP forward / backward
             assert len(model_parts) == 1
             with self.train_context():
-                with self.maybe_enable_amp:
+                with self.maybe_enable_amp, timeline.phase("forward"):
                     pred = model_parts[0](inputs, **extra_inputs, **extra_kwargs)
                     # Compute loss sum (reduction='sum')
                     loss_sum = self.loss_fn(pred, labels)
@@ -692,7 +793,8 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
 
                 # need to free pred before bwd to avoid peaking memory
                 del pred
-                loss.backward()
+                with timeline.phase("backward"):
+                    loss.backward()
 
         # The returned loss here is local SUM loss / global_valid_tokens
         return loss
@@ -707,32 +809,41 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
         # Keep these variables local to shorten the code as these are
         # the major variables that are used in the training loop.
         parallel_dims = self.parallel_dims
+        timeline = self.metrics_processor.step_timeline
 
         # Collect all microbatches on CPU and count total valid tokens
         microbatches = []
         local_valid_tokens = torch.tensor(0, dtype=torch.int64)
-        for _microbatch in range(self.gradient_accumulation_steps):
-            input_dict, labels = next(data_iterator)
-            local_valid_tokens += (labels != IGNORE_INDEX).sum()
-            microbatches.append((input_dict, labels))
+        with timeline.phase("data"):
+            for _microbatch in range(self.gradient_accumulation_steps):
+                input_dict, labels = next(data_iterator)
+                local_valid_tokens += (labels != IGNORE_INDEX).sum()
+                microbatches.append((input_dict, labels))
 
         # All-reduce to get global token count across DP ranks
         # Move to GPU for distributed communication
-        local_valid_tokens = local_valid_tokens.to(self.device)
-        if parallel_dims.dp_enabled:
-            batch_mesh = parallel_dims.get_mesh("batch")
-            global_valid_tokens = dist_utils.dist_sum(local_valid_tokens, batch_mesh)
-        else:
-            global_valid_tokens = local_valid_tokens.float()
+        with timeline.phase("comm"):
+            local_valid_tokens = local_valid_tokens.to(self.device)
+            if parallel_dims.dp_enabled:
+                batch_mesh = parallel_dims.get_mesh("batch")
+                global_valid_tokens = dist_utils.dist_sum(
+                    local_valid_tokens, batch_mesh
+                )
+            else:
+                global_valid_tokens = local_valid_tokens.float()
+
+        if self.attention_mask_stream is not None:
+            self._prefetch_attention_masks(microbatches)
 
         # Process each microbatch: move to GPU, forward/backward, then free
         accumulated_losses = []
         for input_dict, labels in microbatches:
             # Move tensors to GPU
-            for k, v in input_dict.items():
-                if isinstance(v, torch.Tensor):
-                    input_dict[k] = v.to(self.device)
-            labels = labels.to(self.device)
+            with timeline.phase("h2d"):
+                for k, v in input_dict.items():
+                    if isinstance(v, torch.Tensor):
+                        input_dict[k] = v.to(self.device)
+                labels = labels.to(self.device)
 
             loss = self.forward_backward_step(
                 input_dict=input_dict,
@@ -742,21 +853,29 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
             )
             accumulated_losses.append(loss.detach())
 
-        grad_norm = dist_utils.clip_grad_norm_(
-            [p for m in self.model_parts for p in m.parameters()],
-            self.config.training.max_norm,
-            foreach=True,
-            pp_mesh=parallel_dims.get_optional_mesh("pp"),
-            ep_enabled=parallel_dims.ep_enabled,
-        )
-        self.checkpointer.maybe_wait_for_staging()
-        self.optimizers.step()
-        self.lr_schedulers.step()
+        if self.attention_mask_stream is not None:
+            self._last_backward_done = torch.cuda.Event()
+            self._last_backward_done.record()
+
+        with timeline.phase("grad_clip"):
+            grad_norm = dist_utils.clip_grad_norm_(
+                [p for m in self.model_parts for p in m.parameters()],
+                self.config.training.max_norm,
+                foreach=True,
+                pp_mesh=parallel_dims.get_optional_mesh("pp"),
+                ep_enabled=parallel_dims.ep_enabled,
+            )
+        with timeline.phase("checkpoint_staging"):
+            self.checkpointer.maybe_wait_for_staging()
+        with timeline.phase("optimizer"):
+            self.optimizers.step()
+            self.lr_schedulers.step()
 
         # Reduce the data collected over gradient accumulation steps.
         loss = torch.sum(torch.stack(accumulated_losses))
 
         # log metrics
+        self.metrics_processor.log_step(self.step, {"lr": lr})
         if not self.metrics_processor.should_log(self.step):
             return
 
@@ -804,7 +923,8 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
     def train(self):
         config = self.config
 
-        self.checkpointer.load(step=config.checkpoint.load_step)
+        with startup_profiler.phase("checkpoint_load"):
+            self.checkpointer.load(step=config.checkpoint.load_step)
         logger.info(f"Training starts at step {self.step + 1}")
 
         with (
@@ -824,20 +944,34 @@ class Trainer(torch.distributed.checkpoint.stateful.Stateful, Configurable):
                 self.step += 1
                 self.gc_handler.run(self.step)
                 try:
-                    self.train_step(data_iterator)
+                    if startup_profiler.summarized:
+                        self.train_step(data_iterator)
+                    else:
+                        # The first step includes lazy initialization and compilation
+                        with startup_profiler.phase("first_step"):
+                            self.train_step(data_iterator)
                 except DataloaderExhaustedError:
                     logger.warning("Ran out of data; last step was canceled.")
                     break
 
-                self.checkpointer.save(
-                    self.step, last_step=(self.step == config.training.steps)
-                )
+                if not startup_profiler.summarized:
+                    self.metrics_processor.logger.log(
+                        startup_profiler.summarize(self.device), self.step
+                    )
+
+                timeline = self.metrics_processor.step_timeline
+                with timeline.phase("checkpoint"):
+                    self.checkpointer.save(
+                        self.step, last_step=(self.step == config.training.steps)
+                    )
 
                 # Run validation if validator is available
                 if self.config.validator.enable and self.validator.should_validate(
                     self.step
                 ):
-                    self.validator.validate(self.model_parts, self.step)
+                    with timeline.phase("validation"):
+                        self.validator.validate(self.model_parts, self.step)
+                timeline.step()
 
                 # signal the profiler that the next profiling step has started
                 if torch_profiler: